@@ -1,3 +1,5 @@
+import os
+import tempfile
 from datetime import timedelta
 from decimal import Decimal
 from tokenize import Double
@@ -13,21 +15,37 @@ from django.db.models.aggregates import Avg
 from django.utils.timezone import now
 from rest_framework.views import APIView
 from django.utils import timezone
-from django.db.models import Count, Sum
 from django.core.files.storage import default_storage
 
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from urllib3 import request
 
 from config.settings.common import DEBUG
 from db.models import Category, Product, Banner, Inventory, PinCode, Store, WebBanner, \
     FlashSaleBanner, Order, User, Cart, OrderProducts, UserOTP, StoreClient, UserSession, ProductMedia, Tag, \
-    OrderTimeLines, Coupons, CouponProduct, CouponCategory, CouponTag
+    OrderTimeLines, Coupons, CouponProduct, CouponCategory, CouponTag, ProductImportJob, ShippingRateCard, \
+    ShippingZone
 from enums.store import InventoryType, OrderStatus
 from mixins.drf_views import CustomResponse
+from mixins.pagination import keyset_paginate
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from utils.store import generate_lsin, generate_order_number
+from utils.coupons import invalidate_coupon_index
+from utils.inventory_import import apply_inventory_file
+from utils.inventory_ledger import EXPORT_FORMATS as LEDGER_EXPORT_FORMATS, export_chunks as ledger_export_chunks, \
+    ledger_queryset
+from utils.middleware.store_middleware import invalidate_identifiers, invalidate_store
+from utils.order_stats import rollup_orders, rollup_stats
+from utils.pincode_service import invalidate_pincodes
+from utils.product_card import refresh_product_cards
+from utils.product_export import EXPORT_FORMATS, export_chunks
+from utils.product_import import queue_product_import
+from utils.search import refresh_search_vectors
+from utils.shipping import invalidate_shipping_index
+from utils.stock import INBOUND_TYPES, OUTBOUND_TYPES, apply_stock_movements
+from utils.store import generate_lsin, generate_order_number, ensure_order_sequence
+from utils.streaming import streaming_file_response
 from utils.user import generate_otp, send_otp_to_mobile, get_storage_path_from_url
 
 
@@ -180,6 +198,7 @@ class ProductAPIView(APIView):
             gst_percentage=gst_percentage,
             gst_amount=gst_amount,
             current_stock=data["current_stock"],
+            weight_grams=data.get("weight_grams") or 0,
             is_active=data.get("is_active", True),
             created_by=request.user.mobile
         )
@@ -203,6 +222,8 @@ class ProductAPIView(APIView):
             )
             product.tags.set(tags)
 
+        refresh_search_vectors([product.id])
+
         media_list = data.get("media", [])
 
         for media in media_list:
@@ -216,6 +237,9 @@ class ProductAPIView(APIView):
                 position=media.get("position", 0),
                 created_by=request.user.mobile
             )
+
+        refresh_product_cards([product.id])
+
         return CustomResponse.successResponse(
             data={},
             description="Product created successfully"
@@ -293,6 +317,7 @@ class ProductAPIView(APIView):
                 "mrp": str(product.mrp),
                 "selling_price": str(product.selling_price),
                 "current_stock": product.current_stock,
+                "weight_grams": product.weight_grams,
 
                 "categories": [
                     {"id": str(c.id), "name": c.name}
@@ -348,15 +373,32 @@ class ProductAPIView(APIView):
         updatable_fields = [
             "name", "size", "colour", "mrp",
             "selling_price", "gst_percentage",
-            "gst_amount", "current_stock", "is_active"
+            "gst_amount", "weight_grams", "is_active"
         ]
 
-        for field in updatable_fields:
-            if field in data:
-                setattr(product, field, data.get(field))
+        changed_fields = [field for field in updatable_fields if field in data]
+        for field in changed_fields:
+            setattr(product, field, data.get(field))
 
         product.updated_by = request.user.mobile
-        product.save()
+        try:
+            with transaction.atomic():
+                # a stock count goes through the ledger as an adjustment
+                if "current_stock" in data:
+                    apply_stock_movements([{
+                        "product_id": product.id,
+                        "type": InventoryType.ADJUSTMENT,
+                        "quantity_after": data.get("current_stock"),
+                        "user": request.user.id,
+                        "remarks": "Stock updated from product",
+                        "created_by": request.user.mobile,
+                    }], store=store)
+
+                # only the edited fields, so stock and holds written concurrently survive
+                product.save(update_fields=changed_fields + ["updated_by", "updated_at"])
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e))
+        refresh_search_vectors([product.id])
 
         # ================== DELETE MEDIA (DB + S3) ==================
         media_to_delete = data.get("media_to_delete", [])
@@ -390,6 +432,8 @@ class ProductAPIView(APIView):
                 created_by=request.user.mobile
             )
 
+        refresh_product_cards([product.id])
+
         return CustomResponse.successResponse(
             data={},
             description="Product updated successfully"
@@ -422,6 +466,7 @@ class ProductAPIView(APIView):
         product.is_active = False
         product.updated_by = request.user.mobile
         product.save(update_fields=["is_active", "updated_by"])
+        refresh_product_cards([product.id])
 
         return CustomResponse.successResponse(
             data={},
@@ -432,6 +477,75 @@ class ProductAPIView(APIView):
 
 
 
+class ProductImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        store = request.store
+        file_obj = request.FILES.get("file")
+
+        if not file_obj:
+            return CustomResponse.errorResponse(
+                description="file is required"
+            )
+
+        extension = os.path.splitext(file_obj.name)[1].lower()
+        if extension not in (".csv", ".xlsx"):
+            return CustomResponse.errorResponse(
+                description="Only .csv and .xlsx files are supported"
+            )
+
+        job = queue_product_import(store, file_obj, created_by=request.user.mobile)
+
+        return CustomResponse.successResponse(
+            data={"job_id": str(job.id), "status": job.status},
+            description="Product import queued"
+        )
+
+    def get(self, request, id=None):
+        store = request.store
+
+        if not id:
+            jobs = ProductImportJob.objects.filter(store=store).values(
+                "id", "file_name", "status", "total_rows", "created_count",
+                "failed_count", "created_at", "finished_at"
+            )[:20]
+            return CustomResponse.successResponse(data=list(jobs))
+
+        job = ProductImportJob.objects.filter(id=id, store=store).values(
+            "id", "file_name", "status", "total_rows", "created_count",
+            "failed_count", "errors", "message", "created_at", "finished_at"
+        ).first()
+        if not job:
+            return CustomResponse.errorResponse(
+                description="Import job not found"
+            )
+
+        return CustomResponse.successResponse(data=job)
+
+
+class ProductExportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        store = request.store
+
+        # "format" is taken by DRF's renderer override, hence "type"
+        file_format = request.query_params.get("type", "csv").lower()
+        if file_format not in EXPORT_FORMATS:
+            return CustomResponse.errorResponse(
+                description=f"type must be one of {', '.join(EXPORT_FORMATS)}"
+            )
+
+        filename = f"products-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+        return streaming_file_response(
+            export_chunks(store, file_format),
+            file_format,
+            filename
+        )
+
+
 # class DisplayProductAPIView(APIView):
 #     permission_classes = [IsAuthenticated]
 #
@@ -942,6 +1056,9 @@ class CategoriesAPIView(APIView):
 
         category.updated_by = request.user.mobile
         category.save()
+        product_ids = list(category.display_products.values_list("id", flat=True))
+        refresh_search_vectors(product_ids)
+        refresh_product_cards(product_ids)
 
         return CustomResponse.successResponse(
             data={},
@@ -975,6 +1092,9 @@ class CategoriesAPIView(APIView):
         category.is_active = False
         category.updated_by = request.user.mobile
         category.save()
+        product_ids = list(category.display_products.values_list("id", flat=True))
+        refresh_search_vectors(product_ids)
+        refresh_product_cards(product_ids)
         # category.delete()
 
         return CustomResponse.successResponse(
@@ -1130,6 +1250,9 @@ class TagsAPIView(APIView):
         # 5. Audit
         tag.updated_by = request.user.mobile
         tag.save()
+        product_ids = list(tag.display_products.values_list("id", flat=True))
+        refresh_search_vectors(product_ids)
+        refresh_product_cards(product_ids)
 
         return CustomResponse.successResponse(
             data={},
@@ -1158,6 +1281,9 @@ class TagsAPIView(APIView):
         tag.is_active = False
         tag.updated_by = request.user.mobile
         tag.save(update_fields=["is_active", "updated_by"])
+        product_ids = list(tag.display_products.values_list("id", flat=True))
+        refresh_search_vectors(product_ids)
+        refresh_product_cards(product_ids)
 
         return CustomResponse.successResponse(
             data={},
@@ -1290,33 +1416,7 @@ class InventoryAPIView(APIView):
                 description="Quantity must be greater than zero"
             )
 
-        # Get last stock
-        last_inventory = (
-            Inventory.objects
-            .filter(product_id=product_id)
-            .order_by("-created_at")
-            .first()
-        )
-
-        quantity_before = last_inventory.quantity_after if last_inventory else 0
-
-        # Decide stock movement
-        if inv_type in [
-            InventoryType.PURCHASE,
-            InventoryType.SaleReturn,
-        ]:
-            quantity_after = quantity_before + quantity
-
-        elif inv_type in [
-            InventoryType.SELL,
-            InventoryType.PurchaseReturn,
-        ]:
-            if quantity > quantity_before:
-                return CustomResponse().errorResponse(
-                    description="Insufficient stock"
-                )
-            quantity_after = quantity_before - quantity
-        else:
+        if inv_type not in INBOUND_TYPES + OUTBOUND_TYPES:
             return CustomResponse().errorResponse(
                 description="Invalid inventory type"
             )
@@ -1355,47 +1455,48 @@ class InventoryAPIView(APIView):
         purchase_rate = purchase_rate or 0
         sale_rate = sale_rate or 0
 
+        if len(data.get("remarks") or "") > 100:
+            return CustomResponse().errorResponse(
+                description="remarks cannot be longer than 100 characters"
+            )
 
 
-
-        # 4️⃣ Save inventory atomically
-        with transaction.atomic():
-            inventory = Inventory.objects.create(
-                store_id=store.id,
-                product_id=product_id,
-                sku=sku,
-                type=inv_type,
-                date=data.get("date") or timezone.now(),
-                user=request.user.id,
-                quantity=quantity,
-                quantity_before=quantity_before,
-                quantity_after=quantity_after,
-
-                purchase_rate_per_item=purchase_rate,
-                purchase_price=purchase_price,
-
-                sale_rate_per_item=sale_rate,
-                sale_price=sale_price,
-
-                gst_input=data.get("gst_input", 0),
-                gst_output=data.get("gst_output", 0),
-                remarks=data.get("remarks"),
-            )
+        # 4️⃣ Lock the stock snapshot, append to the ledger, mirror into the product
+        try:
+            with transaction.atomic():
+                inventory = apply_stock_movements([{
+                    "product_id": product_id,
+                    "sku": sku,
+                    "type": inv_type,
+                    "quantity": quantity,
+                    "user": request.user.id,
+                    "date": data.get("date"),
+                    "purchase_rate_per_item": purchase_rate,
+                    "purchase_price": purchase_price,
+                    "sale_rate_per_item": sale_rate,
+                    "sale_price": sale_price,
+                    "gst_input": data.get("gst_input", 0),
+                    "gst_output": data.get("gst_output", 0),
+                    "remarks": data.get("remarks"),
+                }], store=store)[0]
+        except Exception as e:
+            return CustomResponse().errorResponse(description=str(e))
 
 
         return CustomResponse().successResponse(
             description="Inventory updated successfully",
             data={
                 "inventory_id": str(inventory.id),
-                "quantity_before": quantity_before,
-                "quantity_after": quantity_after,
+                "quantity_before": inventory.quantity_before,
+                "quantity_after": inventory.quantity_after,
                 "type": inv_type,
                 "purchase_rate_per_item":purchase_rate,
                 "purchase_price":purchase_price,
             }
         )
     def get(self, request, id=None):
-        queryset = Inventory.objects.all()
+        store = request.store
+        queryset = Inventory.objects.filter(store_id=store.id)
 
         # ---------- SINGLE INVENTORY ----------
         if id:
@@ -1421,36 +1522,61 @@ class InventoryAPIView(APIView):
                 total=1
             )
 
+        # ---------- FILTERS ----------
+        try:
+            queryset = ledger_queryset(store, request.query_params)
+        except ValueError as e:
+            return CustomResponse().errorResponse(description=str(e))
+
         # ---------- PAGINATION ----------
         page = int(request.query_params.get("page", 1))
         page_size = int(request.query_params.get("page_size", 10))
 
+        # cursor mode: "cursor=" (empty) for the first page, then the returned next_cursor
+        cursor = request.query_params.get("cursor")
+        include_total = request.query_params.get("include_total", "").lower() == "true"
+
         if page < 1 or page_size < 1:
             return CustomResponse().errorResponse(
                 description="page and page_size must be positive integers"
             )
 
-        queryset = queryset.order_by("-created_at")
+        rows = queryset.values(
+            "id", "product_id", "sku", "type", "quantity",
+            "quantity_before", "quantity_after", "created_at"
+        )
 
-        total = queryset.count()
-        offset = (page - 1) * page_size
-        queryset = queryset[offset: offset + page_size]
+        extra = {}
+        if cursor is not None:
+            # keyset on (created_at, id), newest first; COUNT(*) only on request
+            total = queryset.count() if include_total else None
+            try:
+                rows, extra["next_cursor"] = keyset_paginate(rows, cursor, page_size)
+            except ValueError:
+                return CustomResponse().errorResponse(description="Invalid cursor")
+        else:
+            total = queryset.count()
+            offset = (page - 1) * page_size
+            rows = rows.order_by("-created_at", "-id")[offset: offset + page_size]
 
         # ---------- LIST INVENTORY ----------
         data = []
-        for inv in queryset:
+        for inv in rows:
             data.append({
-                "id": str(inv.id),
-                "product_id": str(inv.product_id),
-                "type": inv.type,
-                "quantity": inv.quantity,
-                "quantity_after": inv.quantity_after,
-                "created_at": inv.created_at,
+                "id": str(inv["id"]),
+                "product_id": str(inv["product_id"]),
+                "sku": inv["sku"],
+                "type": inv["type"],
+                "quantity": inv["quantity"],
+                "quantity_before": inv["quantity_before"],
+                "quantity_after": inv["quantity_after"],
+                "created_at": inv["created_at"],
             })
 
         return CustomResponse().successResponse(
             data=data,
-            total=total
+            total=total,
+            **extra
         )
 
 
@@ -1461,7 +1587,7 @@ class InventoryAPIView(APIView):
                 description="Inventory id is required"
             )
 
-        inventory = Inventory.objects.filter(id=id).first()
+        inventory = Inventory.objects.filter(id=id, store_id=request.store.id).first()
         if not inventory:
             return CustomResponse().errorResponse(
                 description="Inventory not found"
@@ -1485,7 +1611,7 @@ class InventoryAPIView(APIView):
                 description="Inventory id is required"
             )
 
-        inventory = Inventory.objects.filter(id=id).first()
+        inventory = Inventory.objects.filter(id=id, store_id=request.store.id).first()
         if not inventory:
             return CustomResponse().errorResponse(
                 description="Inventory not found"
@@ -1497,6 +1623,89 @@ class InventoryAPIView(APIView):
             description="Inventory deleted successfully"
         )
 
+class InventoryExportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        store = request.store
+
+        # "format" is taken by DRF's renderer override and "type" filters movements
+        file_format = request.query_params.get("file_type", "csv").lower()
+        if file_format not in LEDGER_EXPORT_FORMATS:
+            return CustomResponse.errorResponse(
+                description=f"file_type must be one of {', '.join(LEDGER_EXPORT_FORMATS)}"
+            )
+
+        try:
+            queryset = ledger_queryset(store, request.query_params)
+        except ValueError as e:
+            return CustomResponse.errorResponse(description=str(e))
+
+        filename = f"inventory-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+        return streaming_file_response(
+            ledger_export_chunks(queryset, file_format),
+            file_format,
+            filename
+        )
+
+
+class InventoryBulkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        store = request.store
+        file_obj = request.FILES.get("file")
+
+        if not file_obj:
+            return CustomResponse.errorResponse(
+                description="file is required"
+            )
+
+        extension = os.path.splitext(file_obj.name)[1].lower()
+        if extension not in (".csv", ".xlsx"):
+            return CustomResponse.errorResponse(
+                description="Only .csv and .xlsx files are supported"
+            )
+
+        remarks = request.data.get("remarks") or f"Bulk upload {file_obj.name}"[:100]
+        if len(remarks) > 100:
+            return CustomResponse.errorResponse(
+                description="remarks cannot be longer than 100 characters"
+            )
+
+        with tempfile.NamedTemporaryFile(suffix=extension) as tmp:
+            for chunk in file_obj.chunks():
+                tmp.write(chunk)
+            tmp.flush()
+
+            # all-or-nothing: one ordered lock over the affected stock snapshots
+            try:
+                with transaction.atomic():
+                    errors, rows = apply_inventory_file(
+                        tmp.name,
+                        store,
+                        request.user.id,
+                        remarks=remarks
+                    )
+            except Exception as e:
+                return CustomResponse.errorResponse(description=str(e))
+
+        if errors:
+            return CustomResponse.errorResponse(
+                data={"errors": errors},
+                description=f"{len(errors)} rows have errors; nothing was applied"
+            )
+
+        return CustomResponse.successResponse(
+            data={
+                "movements": len(rows),
+                "products": len({row.product_id for row in rows}),
+            },
+            description="Inventory updated successfully"
+        )
+
+
 class PinCodeAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1516,6 +1725,7 @@ class PinCodeAPIView(APIView):
             city = data.get("city"),
             country = data.get("country")
             )
+            invalidate_pincodes()
             return CustomResponse.successResponse(data={},description="pincode created successfully")
 
         except IntegrityError as e:
@@ -1586,6 +1796,7 @@ class PinCodeAPIView(APIView):
                 setattr(pin,field,request.data.get(field))
 
         pin.save()
+        invalidate_pincodes()
         return CustomResponse.successResponse(data={},description="pincode updated successfully")
 
     def delete(self,request,id=None):
@@ -1597,6 +1808,7 @@ class PinCodeAPIView(APIView):
             return CustomResponse.errorResponse(description="pincode not found")
 
         pin.delete()
+        invalidate_pincodes()
         return CustomResponse.successResponse(data={},description="pincode deleted successfully")
 
 
@@ -1606,6 +1818,183 @@ class PinCodeAPIView(APIView):
 
 
 
+class ShippingRateCardAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    fields = [
+        "name", "base_weight_grams", "base_charge", "slab_weight_grams", "slab_charge",
+        "free_shipping_threshold", "cod_surcharge",
+    ]
+
+    def post(self, request):
+        store = request.store
+        data = request.data
+
+        if not data.get("name"):
+            return CustomResponse.errorResponse(description="name is required")
+
+        try:
+            card = ShippingRateCard.objects.create(
+                store=store,
+                created_by=str(request.user),
+                **{field: data[field] for field in self.fields if field in data}
+            )
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e) or "Failed to create rate card")
+
+        return CustomResponse.successResponse(
+            data={"id": str(card.id)},
+            description="rate card created successfully"
+        )
+
+    def get(self, request, id=None):
+        queryset = ShippingRateCard.objects.filter(store=request.store)
+
+        if id:
+            card = queryset.filter(id=id).values().first()
+            if not card:
+                return CustomResponse.errorResponse(description="rate card not found")
+            return CustomResponse.successResponse(data=[card], total=1)
+
+        data = list(queryset.order_by("name").values())
+        return CustomResponse.successResponse(data=data, total=len(data))
+
+    def put(self, request, id=None):
+        if not id:
+            return CustomResponse.errorResponse(description="rate card id required")
+
+        card = ShippingRateCard.objects.filter(store=request.store, id=id).first()
+        if not card:
+            return CustomResponse.errorResponse(description="rate card not found")
+
+        for field in self.fields:
+            if field in request.data:
+                setattr(card, field, request.data.get(field))
+        card.updated_by = str(request.user)
+
+        try:
+            card.save()
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e) or "Failed to update rate card")
+
+        invalidate_shipping_index(request.store.id)
+        return CustomResponse.successResponse(data={}, description="rate card updated successfully")
+
+    def delete(self, request, id=None):
+        if not id:
+            return CustomResponse.errorResponse(description="rate card id required")
+
+        card = ShippingRateCard.objects.filter(store=request.store, id=id).first()
+        if not card:
+            return CustomResponse.errorResponse(description="rate card not found")
+
+        # its zones go with it
+        card.delete()
+        invalidate_shipping_index(request.store.id)
+        return CustomResponse.successResponse(data={}, description="rate card deleted successfully")
+
+
+class ShippingZoneAPIView(APIView):
+    """
+    Zones map a pincode range (pin_from, pin_to), a state, or neither (the
+    store-wide default) to a rate card. Every change recompiles the store's
+    shipping index (utils.shipping).
+    """
+    permission_classes = [IsAuthenticated]
+
+    fields = ["name", "rate_card_id", "pin_from", "pin_to", "state", "priority", "is_active"]
+
+    @staticmethod
+    def validate(zone, store):
+        if not zone.name:
+            return "name is required"
+        if not ShippingRateCard.objects.filter(store=store, id=zone.rate_card_id).exists():
+            return "rate card not found"
+        if (zone.pin_from is None) != (zone.pin_to is None):
+            return "pin_from and pin_to must be given together"
+        if zone.pin_from is not None:
+            if zone.state:
+                return "a zone is either a pincode range or a state"
+            if int(zone.pin_from) > int(zone.pin_to):
+                return "pin_from cannot be greater than pin_to"
+        return None
+
+    def post(self, request):
+        store = request.store
+        data = request.data
+
+        zone = ShippingZone(
+            store=store,
+            created_by=str(request.user),
+            **{field: data.get(field) for field in self.fields if data.get(field) not in (None, "")}
+        )
+        try:
+            error = self.validate(zone, store)
+            if error:
+                return CustomResponse.errorResponse(description=error)
+            zone.save()
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e) or "Failed to create zone")
+
+        invalidate_shipping_index(store.id)
+        return CustomResponse.successResponse(
+            data={"id": str(zone.id)},
+            description="shipping zone created successfully"
+        )
+
+    def get(self, request, id=None):
+        queryset = ShippingZone.objects.filter(store=request.store)
+
+        if id:
+            zone = queryset.filter(id=id).values().first()
+            if not zone:
+                return CustomResponse.errorResponse(description="shipping zone not found")
+            return CustomResponse.successResponse(data=[zone], total=1)
+
+        if request.query_params.get("rate_card_id"):
+            queryset = queryset.filter(rate_card_id=request.query_params["rate_card_id"])
+
+        data = list(queryset.order_by("priority", "pin_from", "state").values())
+        return CustomResponse.successResponse(data=data, total=len(data))
+
+    def put(self, request, id=None):
+        if not id:
+            return CustomResponse.errorResponse(description="shipping zone id required")
+
+        store = request.store
+        zone = ShippingZone.objects.filter(store=store, id=id).first()
+        if not zone:
+            return CustomResponse.errorResponse(description="shipping zone not found")
+
+        for field in self.fields:
+            if field in request.data:
+                value = request.data.get(field)
+                setattr(zone, field, None if value == "" else value)
+        zone.updated_by = str(request.user)
+
+        try:
+            error = self.validate(zone, store)
+            if error:
+                return CustomResponse.errorResponse(description=error)
+            zone.save()
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e) or "Failed to update zone")
+
+        invalidate_shipping_index(store.id)
+        return CustomResponse.successResponse(data={}, description="shipping zone updated successfully")
+
+    def delete(self, request, id=None):
+        if not id:
+            return CustomResponse.errorResponse(description="shipping zone id required")
+
+        deleted, _ = ShippingZone.objects.filter(store=request.store, id=id).delete()
+        if not deleted:
+            return CustomResponse.errorResponse(description="shipping zone not found")
+
+        invalidate_shipping_index(request.store.id)
+        return CustomResponse.successResponse(data={}, description="shipping zone deleted successfully")
+
+
 class StoreAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -1645,6 +2034,10 @@ class StoreAPIView(APIView):
                 store_client.is_active = True
                 store_client.save()
 
+            # these identifiers may be negatively cached from earlier requests
+            invalidate_identifiers(item["identifier"] for item in clients)
+            ensure_order_sequence(store)
+
             return CustomResponse.successResponse(
                 data={},
                 description="store created successfully"
@@ -1712,6 +2105,7 @@ class StoreAPIView(APIView):
                 setattr(store, field, request.data.get(field))
 
         store.save()
+        invalidate_store(store.id)
 
         return CustomResponse.successResponse(
             data={},
@@ -1732,6 +2126,7 @@ class StoreAPIView(APIView):
             )
 
         store.delete()
+        invalidate_store(id)
 
         return CustomResponse.successResponse(
             data={},
@@ -1942,46 +2337,8 @@ class OrderStatsAPIView(APIView):
             from_date = request.query_params.get("from_date")
             to_date = request.query_params.get("to_date")
 
-            queryset = Order.objects.filter(store_id=store.id)
-
-            # -------- Date Filters --------
-            if from_date:
-                queryset = queryset.filter(created_at__date__gte=from_date)
-
-            if to_date:
-                queryset = queryset.filter(created_at__date__lte=to_date)
-
-            # -------- Total Orders --------
-            total_orders = queryset.count()
-
-            # -------- Status-wise Count --------
-            status_data = (
-                queryset.values("status")
-                .annotate(count=Count("id"))
-            )
-
-            status_counts = {
-                item["status"]: item["count"]
-                for item in status_data
-            }
-
-            # -------- amount Stats --------
-            revenue = queryset.aggregate(
-                total_amount=Sum("amount"),
-                paid_online=Sum("paid_online"),
-                cash_on_delivery=Sum("cash_on_delivery"),
-                wallet_paid=Sum("wallet_paid"),
-            )
-
-            response_data = {
-                "status_counts": status_counts,
-                "revenue": {
-                    "total_amount": revenue["total_amount"] or 0,
-                    "paid_online": revenue["paid_online"] or 0,
-                    "cash_on_delivery": revenue["cash_on_delivery"] or 0,
-                    "wallet_paid": revenue["wallet_paid"] or 0,
-                }
-            }
+            # pre-aggregated per (day, status); see utils.order_stats
+            response_data = rollup_stats(store, from_date, to_date)
 
             return CustomResponse().successResponse(
                 description="Order statistics fetched successfully",
@@ -2270,76 +2627,89 @@ class OrderListAPIView(APIView):
         subtotal = Decimal("0.00")
         order_items = []
 
-        with transaction.atomic():
+        try:
+            with transaction.atomic():
 
-            # ---------- Validate products ----------
-            for item in products:
-                product_id = item.get("product_id")
-                qty = int(item.get("qty", 0))
+                # ---------- Validate products ----------
+                for item in products:
+                    product_id = item.get("product_id")
+                    qty = int(item.get("qty", 0))
 
-                if qty <= 0:
-                    return CustomResponse.errorResponse("Invalid quantity")
+                    if qty <= 0:
+                        return CustomResponse.errorResponse("Invalid quantity")
 
-                try:
-                    product = Product.objects.select_for_update().get(
-                        id=product_id,
-                        store=store,
-                        is_active=True
-                    )
-                except Product.DoesNotExist:
-                    return CustomResponse.errorResponse(
-                        f"Invalid product {product_id}"
-                    )
+                    try:
+                        product = Product.objects.get(
+                            id=product_id,
+                            store=store,
+                            is_active=True
+                        )
+                    except Product.DoesNotExist:
+                        return CustomResponse.errorResponse(
+                            f"Invalid product {product_id}"
+                        )
 
-                if product.current_stock < qty:
-                    return CustomResponse.errorResponse(
-                        f"{product.name} out of stock"
-                    )
+                    if product.current_stock < qty:
+                        return CustomResponse.errorResponse(
+                            f"{product.name} out of stock"
+                        )
 
-                line_total = product.selling_price * qty
-                subtotal += line_total
+                    line_total = product.selling_price * qty
+                    subtotal += line_total
 
-                order_items.append((product, qty))
+                    order_items.append((product, qty))
 
-            # ---------- Create Order ----------
-            order_number = generate_order_number(store, "SRU")  # sequence-based
+                # ---------- Create Order ----------
+                order_number = generate_order_number(store, "SRU")  # sequence-based
 
-            order = Order.objects.create(
-                store=store,
-                user=user,
-                order_number=order_number,
-                address=address,
-                coupon_discount=Decimal("0.00"),
-                amount=subtotal,
-                wallet_paid=Decimal("0.00"),
-                paid_online=subtotal,
-                status=OrderStatus.CONFIRMED,
-                created_by=admin.id
-            )
-
-            # ---------- Create OrderProducts ----------
-            for product, qty in order_items:
-                OrderProducts.objects.create(
-                    order=order,
-                    product=product,
-                    sku=product.sku,
-                    qty=qty,
-                    mrp=product.mrp,
-                    selling_price=product.selling_price,
-                    apportioned_discount=Decimal("0.00"),
-                    apportioned_wallet=Decimal("0.00"),
-                    apportioned_online=Decimal("0.00"),
-                    apportioned_gst=Decimal("0.00")
+                order = Order.objects.create(
+                    store=store,
+                    user=user,
+                    order_number=order_number,
+                    address=address,
+                    coupon_discount=Decimal("0.00"),
+                    amount=subtotal,
+                    wallet_paid=Decimal("0.00"),
+                    paid_online=subtotal,
+                    status=OrderStatus.CONFIRMED,
+                    created_by=admin.id
                 )
+                rollup_orders(created=[order])
+
+                # ---------- Create OrderProducts ----------
+                for product, qty in order_items:
+                    OrderProducts.objects.create(
+                        order=order,
+                        product=product,
+                        sku=product.sku,
+                        qty=qty,
+                        mrp=product.mrp,
+                        selling_price=product.selling_price,
+                        apportioned_discount=Decimal("0.00"),
+                        apportioned_wallet=Decimal("0.00"),
+                        apportioned_online=Decimal("0.00"),
+                        apportioned_gst=Decimal("0.00")
+                    )
 
-                # Reduce stock immediately (admin confirmed)
-                product.current_stock -= qty
-                product.save(update_fields=["current_stock"])
-            OrderTimeLines.objects.create(
-                order=order,
-                status=OrderStatus.INITIATED,
-                remarks=data.get("remarks", "Order initiated")
-            )
+                # Reduce stock immediately (admin confirmed); the ledger re-checks under lock
+                apply_stock_movements([
+                    {
+                        "product_id": product.id,
+                        "type": InventoryType.SELL,
+                        "quantity": qty,
+                        "user": user.id,
+                        "remarks": f"Order {order.order_number}",
+                        "created_by": admin.id,
+                    }
+                    for product, qty in order_items
+                ], store=store)
+                OrderTimeLines.objects.create(
+                    order=order,
+                    status=OrderStatus.INITIATED,
+                    remarks=data.get("remarks", "Order initiated")
+                )
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e))
 
         return CustomResponse.successResponse(
             data={
@@ -2418,6 +2788,7 @@ class AdminOrderDetailAPIView(APIView):
                     "status": order.status,
                     "subtotal": str(order.subtotal),
                     "coupon_discount": str(order.coupon_discount),
+                    "shipping_charge": str(order.shipping_charge),
                     "amount": str(order.amount),
                     "wallet_paid": str(order.wallet_paid),
                     "paid_online": str(order.paid_online),
@@ -2512,6 +2883,7 @@ class AdminCreateCouponAPIView(APIView):
                     is_active=True,
                     created_by=admin.id
                 )
+                invalidate_coupon_index(store.id)
 
                 # ---------- Target mapping ----------
                 if target_type == "PRODUCT":
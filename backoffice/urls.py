@@ -3,7 +3,8 @@ from django.urls import path
 from backoffice.store import ProductAPIView, CategoriesAPIView, BannerAPIView, InventoryAPIView, \
     PinCodeAPIView, StoreAPIView, WebBannerAPIView, FlashSaleBannerAPIView, OrderStatsAPIView, \
     CartListView, OrderListAPIView, AbandonedOrderListAPIView, Login, SendOTP, TagsAPIView, AdminOrderDetailAPIView, \
-    AdminCreateCouponAPIView
+    AdminCreateCouponAPIView, ProductImportAPIView, ProductExportAPIView, InventoryBulkAPIView, \
+    InventoryExportAPIView, ShippingRateCardAPIView, ShippingZoneAPIView
 
 urlpatterns = [
 
@@ -14,6 +15,9 @@ urlpatterns = [
     path("store/<str:id>", StoreAPIView.as_view()),
 
     path("product", ProductAPIView.as_view()),
+    path("product/import", ProductImportAPIView.as_view()),
+    path("product/import/<str:id>", ProductImportAPIView.as_view()),
+    path("product/export", ProductExportAPIView.as_view()),
     path("product/<str:id>", ProductAPIView.as_view()),
 
     # path("product-variants",DisplayProductAPIView.as_view()),
@@ -26,11 +30,18 @@ urlpatterns = [
     path("banner/<str:id>",BannerAPIView.as_view()),
 
     path("inventory",InventoryAPIView.as_view()),
+    path("inventory/bulk",InventoryBulkAPIView.as_view()),
+    path("inventory/export",InventoryExportAPIView.as_view()),
     path("inventory/<str:id>",InventoryAPIView.as_view()),
 
     path("pin",PinCodeAPIView.as_view()),
     path("pin/<str:id>",PinCodeAPIView.as_view()),
 
+    path("shipping/rate-cards",ShippingRateCardAPIView.as_view()),
+    path("shipping/rate-cards/<str:id>",ShippingRateCardAPIView.as_view()),
+    path("shipping/zones",ShippingZoneAPIView.as_view()),
+    path("shipping/zones/<str:id>",ShippingZoneAPIView.as_view()),
+
 
 
     path("webbanner",WebBannerAPIView.as_view()),
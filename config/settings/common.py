@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # installed apps
     "db",
     "store",
@@ -186,6 +187,18 @@ CASHFREE_API_VERSION = "2025-01-01"
 # CASHFREE_CLIENT_SECRET = os.getenv("CASHFREE_CLIENT_SECRET")
 # CASHFREE_WEBHOOK = "https://dev-api.sru.ai/payment/paymentWebhook"
 
+# replaces every store's Cashfree orders URL, e.g. a local stub for load tests
+# (python manage.py run_cashfree_stub -> http://127.0.0.1:8700/pg/orders)
+CASHFREE_BASE_URL_OVERRIDE = os.getenv("CASHFREE_BASE_URL_OVERRIDE", "")
+
+# payment-gateway outbox (utils.payment_outbox)
+PAYMENT_DISPATCH_WORKERS = int(os.getenv("PAYMENT_DISPATCH_WORKERS", 4))
+PAYMENT_DISPATCH_WAIT_SECONDS = float(os.getenv("PAYMENT_DISPATCH_WAIT_SECONDS", 3))
+PAYMENT_GATEWAY_MAX_ATTEMPTS = int(os.getenv("PAYMENT_GATEWAY_MAX_ATTEMPTS", 5))
+
+# minutes an unpaid order holds its stock before the sweeper releases it
+STOCK_HOLD_MINUTES = int(os.getenv("STOCK_HOLD_MINUTES", 15))
+
 SIMPLE_JWT = {
     "BLACKLIST_DB_ALIAS": "default",
     "ACCESS_TOKEN_LIFETIME": timedelta(
@@ -274,7 +287,27 @@ CRONJOBS = [
     (f"0 */1 * * * cd {BASE_DIR} && ",
      "store.tasks.cron_run",
      f">> {BASE_DIR}/cron_run.log 2>&1 "
-     )
+     ),
+    (f"* * * * * cd {BASE_DIR} && ",
+     "store.tasks.release_expired_stock_holds",
+     f">> {BASE_DIR}/cron_run.log 2>&1 "
+     ),
+    (f"* * * * * cd {BASE_DIR} && ",
+     "store.tasks.retry_payment_gateway_calls",
+     f">> {BASE_DIR}/cron_run.log 2>&1 "
+     ),
+    (f"* * * * * cd {BASE_DIR} && ",
+     "store.tasks.drain_payment_events",
+     f">> {BASE_DIR}/cron_run.log 2>&1 "
+     ),
+    (f"* * * * * cd {BASE_DIR} && ",
+     "store.tasks.run_product_imports",
+     f">> {BASE_DIR}/cron_run.log 2>&1 "
+     ),
+    (f"30 3 * * * cd {BASE_DIR} && ",
+     "store.tasks.reconcile_badge_counters",
+     f">> {BASE_DIR}/cron_run.log 2>&1 "
+     ),
 
 
 ]
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
 application = get_wsgi_application()
+
+# load the pincode directory before the first request rather than during it
+from utils.pincode_service import pincode_service  # noqa: E402
+
+pincode_service.warm_up()
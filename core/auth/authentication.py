@@ -1,31 +1,70 @@
+import copy
+
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.utils import timezone
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
+from core.auth.session_cache import cache_session, ensure_revocation_listener, session_cache
 from db.models import UserSession
 
 
 class SessionJWTAuthentication(BaseAuthentication):
+    """
+    JWT authentication that also requires a live UserSession for the token.
+    Validated (user, session) pairs are cached per process for a few seconds,
+    keyed by the token's sha256, so warm requests make no queries; logouts
+    reach every worker through core.auth.session_cache.revoke_sessions.
+    """
+
     def authenticate(self, request):
         jwt_auth = JWTAuthentication()
-        auth_result = jwt_auth.authenticate(request)
 
-        if not auth_result:
+        header = jwt_auth.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = jwt_auth.get_raw_token(header)
+        if raw_token is None:
             return None
 
-        user, token = auth_result
-        raw_token = request.headers.get("Authorization").split(" ")[1]
+        # signature / expiry check, no DB
+        token = jwt_auth.get_validated_token(raw_token)
+
+        ensure_revocation_listener()
+
+        token_hash = UserSession.hash_token(raw_token.decode())
+        cached = session_cache.get(token_hash)
+
+        if cached is None:
+            now = timezone.now()
+            session = UserSession.objects.select_related("user").filter(
+                session_token_hash=token_hash,
+                is_active=True,
+                expires_at__gt=now
+            ).first()
+
+            if not session:
+                raise AuthenticationFailed("Session expired or logged out")
+
+            try:
+                user_id = token[api_settings.USER_ID_CLAIM]
+            except KeyError:
+                raise InvalidToken("Token contained no recognizable user identification")
+
+            if str(session.user_id) != str(user_id):
+                raise AuthenticationFailed("Session expired or logged out")
+
+            if not session.user.is_active:
+                raise AuthenticationFailed("User is inactive")
 
-        session = UserSession.objects.filter(
-            user=user,
-            session_token=raw_token,
-            is_active=True,
-            expires_at__gt=timezone.now()
-        ).first()
+            cached = (session.user, session)
+            cache_session(token_hash, session.user, session, now)
 
-        if not session:
-            raise AuthenticationFailed("Session expired or logged out")
+        # views may mutate request.user, keep the cached instances clean
+        user, session = (copy.copy(obj) for obj in cached)
 
         request.session = session
         return user, token
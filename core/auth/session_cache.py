@@ -0,0 +1,114 @@
+import logging
+import select
+import threading
+import time
+
+from django.db import connection, connections
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger("default")
+
+SESSION_CACHE_TTL = 30
+REVOKE_CHANNEL = "user_session_revoked"
+# payloads are a session_token_hash, or USER_PREFIX + user id
+USER_PREFIX = "user:"
+LISTEN_RECONNECT_SECONDS = 5
+
+# session_token_hash -> (User, UserSession) of a validated, active session
+session_cache = TTLCache(ttl=SESSION_CACHE_TTL, maxsize=10000)
+
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+def cache_session(token_hash, user, session, now):
+    """Cache a validated session, never past its own expiry."""
+    ttl = min(SESSION_CACHE_TTL, (session.expires_at - now).total_seconds())
+    if ttl > 0:
+        session_cache.set(token_hash, (user, session), ttl=ttl)
+
+
+def revoke_sessions(token_hashes):
+    """
+    Drop sessions from the cache of every worker. The NOTIFY is delivered
+    when the surrounding transaction commits, so call it next to the write
+    that deactivates the sessions.
+    """
+    token_hashes = [h for h in token_hashes if h]
+    for token_hash in token_hashes:
+        session_cache.delete(token_hash)
+
+    with connection.cursor() as cursor:
+        for token_hash in token_hashes:
+            cursor.execute("SELECT pg_notify(%s, %s)", [REVOKE_CHANNEL, token_hash])
+
+
+def evict_user(user_id):
+    """
+    Forget every cached session of a user in all workers, e.g. after a
+    profile write, so the next request loads the fresh User row.
+    """
+    _evict_user_locally(user_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [REVOKE_CHANNEL, f"{USER_PREFIX}{user_id}"])
+
+
+def _evict_user_locally(user_id):
+    session_cache.delete_where(lambda entry: str(entry[0].id) == str(user_id))
+
+
+def ensure_revocation_listener():
+    """Start the LISTEN thread once per process (after the gunicorn fork)."""
+    global _listener_started
+    if _listener_started:
+        return
+
+    with _listener_lock:
+        if _listener_started:
+            return
+        threading.Thread(
+            target=_listen,
+            name="session-revocation-listener",
+            daemon=True
+        ).start()
+        _listener_started = True
+
+
+def _listen():
+    db = connections["default"]
+
+    while True:
+        conn = None
+        try:
+            conn = db.get_new_connection(db.get_connection_params())
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {REVOKE_CHANNEL}")
+
+            # revocations sent while we were not listening are lost
+            session_cache.clear()
+
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    if payload.startswith(USER_PREFIX):
+                        _evict_user_locally(payload[len(USER_PREFIX):])
+                    else:
+                        session_cache.delete(payload)
+
+        except Exception:
+            logger.exception("Session revocation listener failed, reconnecting")
+            session_cache.clear()
+            time.sleep(LISTEN_RECONNECT_SECONDS)
+
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.pincodes import PINCODE_COUNTRY, PINCODE_IMPORT_USER, load_pincodes
+
+
+class Command(BaseCommand):
+    help = "Refresh the pincode table from the India Post directory CSV (COPY + upsert, one transaction)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=str(settings.BASE_DIR.parent / "data" / "PINCODES.csv")
+        )
+        parser.add_argument("--country", default=PINCODE_COUNTRY)
+        parser.add_argument(
+            "--remove-missing",
+            action="store_true",
+            help="Remove previously imported pincodes of --country that are not in the file"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = load_pincodes(
+                options["path"],
+                remove_missing=options["remove_missing"],
+                country=options["country"],
+                user=PINCODE_IMPORT_USER
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Pincodes refreshed | rows: {rows}, skipped: {skipped}, duplicates: {duplicates}, "
+            "inserted: {inserted}, updated: {updated}, removed: {removed}".format(**stats)
+        ))
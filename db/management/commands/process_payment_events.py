@@ -0,0 +1,33 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from utils.payments import EVENT_BATCH_SIZE, run_payment_event_worker
+
+
+class Command(BaseCommand):
+    help = "Apply queued payment webhooks (payment_event) to orders and payments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=EVENT_BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payment-events") as pool:
+            while True:
+                handled = sum(pool.map(
+                    lambda shard: run_payment_event_worker(shard, workers, options["batch_size"]),
+                    range(workers)
+                ))
+                if handled:
+                    self.stdout.write(f"Processed {handled} payment events")
+
+                if options["once"]:
+                    break
+                if not handled:
+                    time.sleep(options["interval"])
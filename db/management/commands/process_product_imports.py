@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.product_import import process_product_imports
+
+
+class Command(BaseCommand):
+    help = "Run queued bulk product imports (product_import_job)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when idle")
+        parser.add_argument("--once", action="store_true", help="Run the queued jobs once and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            handled = process_product_imports()
+            if handled:
+                self.stdout.write(f"Ran {handled} product imports")
+
+            if options["once"]:
+                break
+            if not handled:
+                time.sleep(options["interval"])
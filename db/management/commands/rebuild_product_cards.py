@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from db.models import Product
+from utils.product_card import refresh_product_cards
+
+
+class Command(BaseCommand):
+    help = "Rebuild the storefront product cards (all stores, or one with --store)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", help="Store id")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.order_by("id")
+        if options["store"]:
+            queryset = queryset.filter(store_id=options["store"])
+
+        batch_size = options["batch_size"]
+        batch = []
+        total = 0
+
+        for product_id in queryset.values_list("id", flat=True).iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) == batch_size:
+                total += len(refresh_product_cards(batch))
+                batch = []
+
+        if batch:
+            total += len(refresh_product_cards(batch))
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} product cards"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from utils.badges import reconcile_badges
+
+
+class Command(BaseCommand):
+    help = "Recount cart and wishlist badge counters (all stores, or one with --store)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", help="Store id")
+
+    def handle(self, *args, **options):
+        repaired = reconcile_badges(options["store"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(repaired)} badge counters"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from utils.cashfree_stub import CashfreeStubServer
+
+
+class Command(BaseCommand):
+    help = "Run a local Cashfree orders API stub (use with CASHFREE_BASE_URL_OVERRIDE)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8700)
+        parser.add_argument("--latency-ms", type=int, default=0)
+        parser.add_argument("--jitter-ms", type=int, default=0)
+        parser.add_argument("--failure-rate", type=float, default=0.0)
+        parser.add_argument("--order-status", default="ACTIVE", help="order_status returned by GET")
+        parser.add_argument("--verbose", action="store_true")
+
+    def handle(self, *args, **options):
+        server = CashfreeStubServer(
+            (options["host"], options["port"]),
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            failure_rate=options["failure_rate"],
+            order_status=options["order_status"],
+            verbose=options["verbose"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Cashfree stub on {server.url} (CASHFREE_BASE_URL_OVERRIDE={server.url})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# the search document as utils.search.SEARCH_VECTOR_SQL built it when this
+# migration was written; frozen here so later edits there do not change it
+SEARCH_VECTOR_SQL = """
+    UPDATE products AS p
+    SET search_vector =
+        setweight(to_tsvector('english', coalesce(p.name, '')), 'A')
+        || setweight(to_tsvector('english', array_to_string(coalesce(p.search_tags, '{}'), ' ')), 'A')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(c.name, ' ')
+            FROM products_categories pc
+            JOIN categories c ON c.id = pc.category_id
+            WHERE pc.product_id = p.id AND c.is_active
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(t.name, ' ')
+            FROM products_tags pt
+            JOIN tags t ON t.id = pt.tag_id
+            WHERE pt.product_id = p.id AND t.is_active
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(p.highlights, '')), 'C')
+        || setweight(to_tsvector('english', coalesce(p.description, '')), 'D')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0002_alter_pincode_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_search__7bdc4d_gin'),
+        ),
+        # backfill the search document for the existing catalog
+        migrations.RunSQL(SEARCH_VECTOR_SQL, migrations.RunSQL.noop),
+    ]
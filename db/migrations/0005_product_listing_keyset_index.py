@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0004_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['store', 'is_active', 'created_at', 'id'], name='products_store_i_b3a8e0_idx'),
+        ),
+    ]
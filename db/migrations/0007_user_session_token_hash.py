@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0006_product_card'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='usersession',
+            name='user_sessio_session_dc67ad_idx',
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='session_token_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE user_session "
+            "SET session_token_hash = encode(sha256(convert_to(session_token, 'UTF8')), 'hex')",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='usersession',
+            name='session_token',
+            field=models.CharField(max_length=500),
+        ),
+    ]
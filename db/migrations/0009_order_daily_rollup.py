@@ -0,0 +1,51 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# days are bucketed in settings.TIME_ZONE, as utils.order_stats rolls up new orders
+ROLLUP_BACKFILL_SQL = """
+    INSERT INTO order_daily_rollup
+        (store_id, day, status, order_count, amount, paid_online, cash_on_delivery, wallet_paid)
+    SELECT
+        store_id,
+        (created_at AT TIME ZONE %s)::date,
+        status,
+        count(*),
+        coalesce(sum(amount), 0),
+        coalesce(sum(paid_online), 0),
+        coalesce(sum(cash_on_delivery), 0),
+        coalesce(sum(wallet_paid), 0)
+    FROM "order"
+    GROUP BY 1, 2, 3
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0008_product_import_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('INITIATED', 'Initiated'), ('CREATED', 'Placed'), ('FAILED', 'Failed'), ('CONFIRMED', 'Confirmed'), ('PACKED', 'Packed'), ('SHIPPED', 'Shipped'), ('OUT_FOR_DELIVERY', 'Out For Delivery'), ('DELIVERED', 'Delivered'), ('RETURN_REQUESTED', 'Return Requested'), ('RETURNED', 'Returned'), ('REFUNDED', 'Refunded'), ('UNFULFILLED', 'Unfulfilled'), ('CANCELLED', 'Cancelled')], max_length=30)),
+                ('order_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_online', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cash_on_delivery', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('wallet_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='db.store')),
+            ],
+            options={
+                'db_table': 'order_daily_rollup',
+                'constraints': [models.UniqueConstraint(fields=('store', 'day', 'status'), name='order_daily_rollup_store_day_status')],
+            },
+        ),
+        migrations.RunSQL([(ROLLUP_BACKFILL_SQL, [settings.TIME_ZONE])], migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:14
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0010_stock_reservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentGatewayCall',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('operation', models.CharField(max_length=30)),
+                ('request', models.JSONField(default=dict)),
+                ('response', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gateway_calls', to='db.order')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gateway_calls', to='db.payment')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gateway_calls', to='db.store')),
+            ],
+            options={
+                'db_table': 'payment_gateway_call',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='payment_gat_status_ed5a27_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+# duplicate webhook deliveries could record a coupon usage twice for one order
+DEDUPE_COUPON_USAGE_SQL = """
+    DELETE FROM coupon_usage AS a
+    USING coupon_usage AS b
+    WHERE a.order_id = b.order_id
+      AND (a.used_at, a.id) > (b.used_at, b.id)
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0011_payment_gateway_call'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('gateway', models.CharField(max_length=20)),
+                ('event_id', models.CharField(max_length=128)),
+                ('event_type', models.CharField(blank=True, default='', max_length=50)),
+                ('order_number', models.CharField(blank=True, default='', max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSED', 'Processed'), ('IGNORED', 'Ignored'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'payment_event',
+            },
+        ),
+        migrations.RunSQL(DEDUPE_COUPON_USAGE_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='couponusage',
+            constraint=models.UniqueConstraint(fields=('order',), name='unique_coupon_usage_per_order'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentevent',
+            index=models.Index(fields=['status', 'id'], name='payment_eve_status_33badd_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentevent',
+            constraint=models.UniqueConstraint(fields=('gateway', 'event_id'), name='unique_payment_event_per_gateway'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:40
+
+from django.db import migrations
+
+
+def create_order_number_sequences(apps, schema_editor):
+    """One sequence per store that already has orders, continuing its counter."""
+    OrderSequence = apps.get_model("db", "OrderSequence")
+    for store_id, last_number in OrderSequence.objects.values_list("store_id", "order_number"):
+        schema_editor.execute(
+            f'CREATE SEQUENCE IF NOT EXISTS "order_number_seq_{store_id.hex}" START WITH {int(last_number) + 1}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0013_payment_reconciliation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_order_number_sequences, migrations.RunPython.noop),
+    ]
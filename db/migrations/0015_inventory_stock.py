@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# every product starts from the stock the storefront currently sells against
+SEED_INVENTORY_STOCK_SQL = """
+    INSERT INTO inventory_stock (product_id, store_id, quantity, updated_at)
+    SELECT id, store_id, current_stock, now() FROM products
+    ON CONFLICT (product_id) DO NOTHING
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0014_order_number_sequences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryStock',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock', serialize=False, to='db.product')),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'inventory_stock',
+            },
+        ),
+        migrations.AlterField(
+            model_name='inventory',
+            name='type',
+            field=models.CharField(choices=[('Purchase', 'Purchase'), ('Sell', 'Sell'), ('Purchase_return', 'Purchasereturn'), ('Sale_return', 'Salereturn'), ('Adjustment', 'Adjustment')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['product_id', 'created_at'], name='inventory_product_1a8920_idx'),
+        ),
+        migrations.AddField(
+            model_name='inventorystock',
+            name='store',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_stocks', to='db.store'),
+        ),
+        migrations.RunSQL(SEED_INVENTORY_STOCK_SQL, migrations.RunSQL.noop),
+    ]
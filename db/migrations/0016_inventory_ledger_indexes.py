@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0015_inventory_stock'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inventory',
+            name='inventory_product_1a8920_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['store_id', 'created_at', 'id'], name='inventory_store_i_ce833b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['store_id', 'product_id', 'created_at', 'id'], name='inventory_store_i_a7b150_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+# re-runs of scripts/import_pincodes.py left copies of the same post office
+DEDUPE_PINCODE_SQL = """
+    DELETE FROM pincode AS a
+    USING pincode AS b
+    WHERE (a.pin, a.area, a.city) = (b.pin, b.area, b.city)
+      AND (a.created_at, a.id) > (b.created_at, b.id)
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0016_inventory_ledger_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPE_PINCODE_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='pincode',
+            constraint=models.UniqueConstraint(fields=('pin', 'area', 'city'), name='unique_pincode_pin_area_city'),
+        ),
+    ]
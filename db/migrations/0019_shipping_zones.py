@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0018_dataset_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shipping_charge',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='weight_grams',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ShippingRateCard',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Last Modified At')),
+                ('created_by', models.CharField(max_length=255, null=True, verbose_name='Created By')),
+                ('updated_by', models.CharField(max_length=255, null=True, verbose_name='Updated By')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('base_weight_grams', models.PositiveIntegerField(default=500)),
+                ('base_charge', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('slab_weight_grams', models.PositiveIntegerField(default=500)),
+                ('slab_charge', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('free_shipping_threshold', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('cod_surcharge', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shipping_rate_cards', to='db.store')),
+            ],
+            options={
+                'db_table': 'shipping_rate_card',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShippingZone',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Last Modified At')),
+                ('created_by', models.CharField(max_length=255, null=True, verbose_name='Created By')),
+                ('updated_by', models.CharField(max_length=255, null=True, verbose_name='Updated By')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('pin_from', models.PositiveIntegerField(blank=True, null=True)),
+                ('pin_to', models.PositiveIntegerField(blank=True, null=True)),
+                ('state', models.CharField(blank=True, max_length=50, null=True)),
+                ('priority', models.PositiveIntegerField(default=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('rate_card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='zones', to='db.shippingratecard')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shipping_zones', to='db.store')),
+            ],
+            options={
+                'db_table': 'shipping_zone',
+                'indexes': [models.Index(fields=['store', 'is_active'], name='shipping_zo_store_i_9e649f_idx')],
+            },
+        ),
+    ]
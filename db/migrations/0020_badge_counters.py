@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# every shopper with items starts from what CartTotalAPIView used to count
+SEED_BADGE_COUNTERS_SQL = """
+    INSERT INTO user_badge_counter (user_id, store_id, cart_items, wishlist_items, updated_at)
+    SELECT u.id, u.store_id,
+        (SELECT count(*) FROM cart AS c WHERE c.user_id = u.id AND c.store_id = u.store_id),
+        (SELECT count(*) FROM wishlist AS w WHERE w.user_id = u.id AND w.store_id = u.store_id),
+        now()
+    FROM "user" AS u
+    WHERE EXISTS (SELECT 1 FROM cart AS c WHERE c.user_id = u.id AND c.store_id = u.store_id)
+       OR EXISTS (SELECT 1 FROM wishlist AS w WHERE w.user_id = u.id AND w.store_id = u.store_id)
+    ON CONFLICT (user_id) DO NOTHING
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0019_shipping_zones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBadgeCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='badge_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('cart_items', models.PositiveIntegerField(default=0)),
+                ('wishlist_items', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='badge_counters', to='db.store')),
+            ],
+            options={
+                'db_table': 'user_badge_counter',
+            },
+        ),
+        migrations.RunSQL(SEED_BADGE_COUNTERS_SQL, migrations.RunSQL.noop),
+    ]
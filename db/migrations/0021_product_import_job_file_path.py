@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0020_badge_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimportjob',
+            name='file_path',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0021_product_import_job_file_path'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventory',
+            name='sku',
+            field=models.CharField(max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='orderproducts',
+            name='sku',
+            field=models.CharField(max_length=30),
+        ),
+    ]
@@ -1,10 +1,13 @@
 import uuid
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from db.mixins import AuditModel
 from django.db import models
 
 from db.models import Store, User
-from enums.store import BannerScreen, InventoryType, AddressType, OrderStatus, PaymentStatus
+from enums.store import BannerScreen, InventoryType, AddressType, OrderStatus, PaymentStatus, ImportJobStatus, \
+    ReservationStatus, GatewayCallStatus, PaymentEventStatus
 
 
 class Tag(AuditModel):
@@ -21,6 +24,9 @@ class Tag(AuditModel):
     class Meta:
         db_table = "tags"
         unique_together = ("store", "slug")
+        indexes = [
+            GinIndex(fields=["name"], name="tags_name_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
 
 class Category(AuditModel):
@@ -56,6 +62,7 @@ class Category(AuditModel):
         indexes = [
             models.Index(fields=["store", "is_active"]),
             models.Index(fields=["name"]),
+            GinIndex(fields=["name"], name="categories_name_trgm", opclasses=["gin_trgm_ops"]),
         ]
 
     def __str__(self):
@@ -102,6 +109,10 @@ class Product(AuditModel):
 
     # Inventory
     current_stock = models.PositiveIntegerField(default=0)
+    # units held by unpaid orders (StockReservation); available = current - reserved
+    reserved_stock = models.PositiveIntegerField(default=0)
+    # shipping weight of one unit, priced by the zone's rate card
+    weight_grams = models.PositiveIntegerField(default=0)
 
     # Discovery / PDP
     description = models.TextField(null=True, blank=True)
@@ -128,18 +139,48 @@ class Product(AuditModel):
     total_rating = models.PositiveIntegerField(default=0)
     number_of_reviews = models.PositiveIntegerField(default=0)
 
+    # Full-text search document, maintained by utils.search.refresh_search_vectors
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         db_table = "products"
         unique_together = ("store", "group_code", "sku")
         indexes = [
             models.Index(fields=["store", "is_active"]),
             models.Index(fields=["store", "group_code"]),
+            models.Index(fields=["store", "is_active", "created_at", "id"]),
             models.Index(fields=["name"]),
+            GinIndex(fields=["search_vector"]),
+            GinIndex(fields=["name"], name="products_name_trgm", opclasses=["gin_trgm_ops"]),
         ]
 
     def __str__(self):
         return f"{self.name} - {self.colour} ({self.sku})"
 
+class ProductCard(models.Model):
+    """
+    Denormalized storefront snapshot of a product (the product dict served by
+    listing, detail, wishlist and cart), rebuilt by utils.product_card.
+    Fast-changing counters (stock, rating) are read from the product row.
+    """
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="card"
+    )
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="product_cards"
+    )
+    data = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "product_card"
+
+
 class ProductMedia(AuditModel):
     IMAGE = "image"
     VIDEO = "video"
@@ -164,11 +205,40 @@ class ProductMedia(AuditModel):
         ordering = ["position"]
 
 
+class ProductImportJob(AuditModel):
+    """One bulk catalog upload, run by the process_product_imports command (utils.product_import)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="product_import_jobs"
+    )
+    file_name = models.CharField(max_length=255)
+    # the upload in default_storage until the job has run
+    file_path = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=ImportJobStatus.choices,
+        default=ImportJobStatus.PENDING
+    )
+    total_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    # [{"row": <sheet row number>, "sku": ..., "errors": [...]}]
+    errors = models.JSONField(default=list)
+    message = models.TextField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "product_import_job"
+        ordering = ["-created_at"]
+
+
 class Inventory(AuditModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     store_id = models.UUIDField()
     product_id = models.UUIDField()
-    sku = models.CharField(max_length=20)
+    sku = models.CharField(max_length=30)
     type = models.CharField(max_length=20,choices=InventoryType.choices)
     date = models.DateTimeField()
     user = models.UUIDField()
@@ -186,6 +256,34 @@ class Inventory(AuditModel):
     class Meta:
         db_table = "inventory"
         ordering = ["-created_at"]
+        indexes = [
+            # ledger queries are store-scoped and keyset-paginated on (created_at, id)
+            models.Index(fields=["store_id", "created_at", "id"]),
+            models.Index(fields=["store_id", "product_id", "created_at", "id"]),
+        ]
+
+
+class InventoryStock(models.Model):
+    """
+    Current stock of a product: the row every inventory ledger append locks.
+    Mirrored into Product.current_stock; see utils.stock.apply_stock_movements.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stock"
+    )
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="inventory_stocks"
+    )
+    quantity = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "inventory_stock"
 
 
 
@@ -275,6 +373,71 @@ class PinCode(AuditModel):
 
     class Meta:
         db_table = "pincode"
+        constraints = [
+            # one row per post office; the key utils.pincodes.load_pincodes upserts on
+            models.UniqueConstraint(fields=["pin", "area", "city"], name="unique_pincode_pin_area_city"),
+        ]
+
+class ShippingRateCard(AuditModel):
+    """
+    How a zone charges for shipping: base_charge covers the first
+    base_weight_grams, every further slab_weight_grams (or part) adds
+    slab_charge. Orders at or above free_shipping_threshold ship free;
+    cash on delivery adds cod_surcharge.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="shipping_rate_cards"
+    )
+    name = models.CharField(max_length=100)
+    base_weight_grams = models.PositiveIntegerField(default=500)
+    base_charge = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    slab_weight_grams = models.PositiveIntegerField(default=500)
+    slab_charge = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    free_shipping_threshold = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    cod_surcharge = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "shipping_rate_card"
+
+
+class ShippingZone(AuditModel):
+    """
+    Maps destinations to a rate card: a pincode range (pin_from..pin_to), a
+    state, or neither (the store-wide default). Lower priority wins where
+    zones overlap; see utils.shipping for how zones are resolved.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="shipping_zones"
+    )
+    rate_card = models.ForeignKey(
+        ShippingRateCard,
+        on_delete=models.CASCADE,
+        related_name="zones"
+    )
+    name = models.CharField(max_length=100)
+    pin_from = models.PositiveIntegerField(null=True, blank=True)
+    pin_to = models.PositiveIntegerField(null=True, blank=True)
+    state = models.CharField(max_length=50, null=True, blank=True)
+    priority = models.PositiveIntegerField(default=100)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "shipping_zone"
+        indexes = [
+            models.Index(fields=["store", "is_active"]),
+        ]
+
 
 class Coupons(AuditModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -402,11 +565,78 @@ class Order(AuditModel):
     wallet_paid = models.DecimalField(decimal_places=2, max_digits=10, default=0)
     paid_online = models.DecimalField(decimal_places=2, max_digits=10, default=0)
     cash_on_delivery = models.DecimalField(decimal_places=2, max_digits=10, default=0)
+    shipping_charge = models.DecimalField(decimal_places=2, max_digits=10, default=0)
     status = models.CharField(choices=OrderStatus.choices, max_length=30, default=OrderStatus.INITIATED)
 
     class Meta:
         db_table = "order"
 
+class StockReservation(models.Model):
+    """
+    Stock held for an order while its payment is pending. Held units are
+    counted in Product.reserved_stock; see utils.stock for the lifecycle.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations"
+    )
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    qty = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=ReservationStatus.choices,
+        default=ReservationStatus.HELD
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "stock_reservation"
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+        ]
+
+
+class OrderDailyRollup(models.Model):
+    """
+    Per store, day and status totals of orders, maintained incrementally by
+    utils.order_stats in the same transaction as every order write.
+    """
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="order_rollups"
+    )
+    day = models.DateField()
+    status = models.CharField(choices=OrderStatus.choices, max_length=30)
+    order_count = models.IntegerField(default=0)
+    amount = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+    paid_online = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+    cash_on_delivery = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+    wallet_paid = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+
+    class Meta:
+        db_table = "order_daily_rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store", "day", "status"],
+                name="order_daily_rollup_store_day_status"
+            )
+        ]
+
+
 class OrderProducts(AuditModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     order = models.ForeignKey(
@@ -420,7 +650,7 @@ class OrderProducts(AuditModel):
         on_delete=models.PROTECT,
         related_name="order_items"
     )
-    sku = models.CharField(max_length=20)
+    sku = models.CharField(max_length=30)
     qty = models.PositiveIntegerField(default=0)
     mrp = models.DecimalField(decimal_places=2, max_digits=10)
     selling_price = models.DecimalField(decimal_places=2, max_digits=10)
@@ -491,6 +721,86 @@ class Payment(AuditModel):
 
     class Meta:
         db_table = "payment"
+        indexes = [
+            # stale-payment scan of the reconciliation job
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+
+class PaymentGatewayCall(models.Model):
+    """
+    Outbox row for a payment-gateway request. Written in the same transaction
+    as the order and payment, dispatched afterwards by utils.payment_outbox.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="gateway_calls"
+    )
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="gateway_calls"
+    )
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.CASCADE,
+        related_name="gateway_calls"
+    )
+    operation = models.CharField(max_length=30)
+    request = models.JSONField(default=dict)
+    response = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=GatewayCallStatus.choices,
+        default=GatewayCallStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "payment_gateway_call"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+
+class PaymentEvent(models.Model):
+    """
+    Inbound gateway webhook, stored as received and acknowledged at once;
+    utils.payments.process_payment_events applies it to the order later.
+    """
+    id = models.BigAutoField(primary_key=True)
+    gateway = models.CharField(max_length=20)
+    event_id = models.CharField(max_length=128)
+    event_type = models.CharField(max_length=50, blank=True, default="")
+    order_number = models.CharField(max_length=50, blank=True, default="")
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20,
+        choices=PaymentEventStatus.choices,
+        default=PaymentEventStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "payment_event"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["gateway", "event_id"],
+                name="unique_payment_event_per_gateway"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
 
 
 
@@ -556,6 +866,32 @@ class Wishlist(AuditModel):
         ]
 
 
+class UserBadgeCounter(models.Model):
+    """
+    A shopper's cart and wishlist item counts, for the app badges. A user
+    belongs to one store, so the user id is the (store, user) key. Kept in
+    step with F() updates by utils.badges; reconcile_badge_counters repairs
+    drift (e.g. rows removed by a cascade).
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="badge_counter"
+    )
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name="badge_counters"
+    )
+    cart_items = models.PositiveIntegerField(default=0)
+    wishlist_items = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_badge_counter"
+
+
 class ProductReviews(AuditModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     store = models.ForeignKey(Store, on_delete=models.CASCADE)
@@ -695,7 +1031,36 @@ class CouponUsage(models.Model):
 
     class Meta:
         db_table = "coupon_usage"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order"],
+                name="unique_coupon_usage_per_order"
+            )
+        ]
         indexes = [
             models.Index(fields=["coupon", "user"]),
             models.Index(fields=["user"]),
-        ]
\ No newline at end of file
+        ]
+
+
+class JobCheckpoint(models.Model):
+    """Resume point of a long-running batch job, saved after every batch."""
+    name = models.CharField(max_length=100, primary_key=True)
+    cursor = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "job_checkpoint"
+
+
+class DatasetVersion(models.Model):
+    """
+    Bumped whenever a reference dataset (e.g. pincodes) changes, so workers
+    holding an in-memory copy know to reload it.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "dataset_version"
@@ -1,3 +1,4 @@
+import hashlib
 import uuid
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
@@ -181,7 +182,9 @@ class UserSession(AuditModel):
         related_name="sessions"
     )
 
-    session_token = models.CharField(max_length=500, unique=True)
+    session_token = models.CharField(max_length=500)
+    # sha256 hex of session_token; sessions are looked up by this fixed-width key
+    session_token_hash = models.CharField(max_length=64, unique=True, null=True, editable=False)
     refresh_token = models.CharField(max_length=500, unique=True)
 
     device_id = models.CharField(max_length=100, null=True, blank=True)
@@ -205,10 +208,17 @@ class UserSession(AuditModel):
         db_table = "user_session"
         indexes = [
             models.Index(fields=["user", "store"]),
-            models.Index(fields=["session_token"]),
             models.Index(fields=["refresh_token"]),
             models.Index(fields=["is_active"]),
         ]
 
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.session_token_hash = self.hash_token(self.session_token)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user_id} | {self.device_type}"
\ No newline at end of file
@@ -12,6 +12,7 @@ class InventoryType(models.TextChoices):
     SELL = "Sell"
     PurchaseReturn = "Purchase_return"
     SaleReturn = "Sale_return"
+    ADJUSTMENT = "Adjustment"
 
 
 class AddressType(models.TextChoices):
@@ -40,3 +41,30 @@ class OrderStatus(models.TextChoices):
     REFUNDED = "REFUNDED"
     UNFULFILLED = "UNFULFILLED"
     CANCELLED = "CANCELLED"
+
+
+class ImportJobStatus(models.TextChoices):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ReservationStatus(models.TextChoices):
+    HELD = "HELD"
+    CONVERTED = "CONVERTED"
+    RELEASED = "RELEASED"
+
+
+class GatewayCallStatus(models.TextChoices):
+    PENDING = "PENDING"
+    IN_PROGRESS = "IN_PROGRESS"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class PaymentEventStatus(models.TextChoices):
+    PENDING = "PENDING"
+    PROCESSED = "PROCESSED"
+    IGNORED = "IGNORED"
+    FAILED = "FAILED"
@@ -1,3 +1,9 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
 from rest_framework.pagination import PageNumberPagination
 
 
@@ -6,3 +12,94 @@ class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
     page_query_param = "page"
+
+
+########################
+#   KEYSET PAGINATION  #
+########################
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Returns (created_at, id); raises ValueError for malformed or tampered tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_paginate(queryset, cursor, page_size, field="created_at"):
+    """
+    Newest-first page that seeks past `cursor` on (field, id) instead of OFFSET,
+    so every page costs the same index range scan.
+    An empty cursor is the first page. Returns (rows, next_cursor); next_cursor
+    is None on the last page. Rows may be model instances or .values() dicts.
+    """
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f"{field}__lt": value}) |
+            Q(**{field: value, "id__lt": pk})
+        )
+
+    rows = list(queryset.order_by(f"-{field}", "-id")[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last[field], last["id"])
+        else:
+            next_cursor = encode_cursor(getattr(last, field), last.id)
+
+    return rows, next_cursor
+
+
+def encode_rank_cursor(rank, created_at, pk):
+    raw = json.dumps([rank, created_at.isoformat(), str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(token):
+    """Returns (rank, created_at, id); raises ValueError for malformed or tampered tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        rank, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def ranked_keyset_paginate(queryset, cursor, page_size):
+    """
+    keyset_paginate for search results: best match first, seeking on
+    (rank, created_at, id) so pages follow the same order as page mode.
+    The queryset must be annotated with `rank`.
+    """
+    if cursor:
+        rank, created_at, pk = decode_rank_cursor(cursor)
+        queryset = queryset.filter(
+            Q(rank__lt=rank) |
+            Q(rank=rank, created_at__lt=created_at) |
+            Q(rank=rank, created_at=created_at, id__lt=pk)
+        )
+
+    rows = list(queryset.order_by("-rank", "-created_at", "-id")[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_rank_cursor(last["rank"], last["created_at"], last["id"])
+        else:
+            next_cursor = encode_rank_cursor(last.rank, last.created_at, last.id)
+
+    return rows, next_cursor
@@ -25,6 +25,7 @@ GUNICORN_THREADS_PER_WORKER=${GUNICORN_THREADS_PER_WORKER:-8}
 PROJECT_ROOT_DIR=${PROJECT_ROOT_DIR:-"/project"}
 LOG_DIR=${LOG_DIR:-"/logs"}
 DEPLOYMENT_MODE=${DEPLOYMENT_MODE:-"FULL"}
+PAYMENT_EVENT_WORKERS=${PAYMENT_EVENT_WORKERS:-2}
 
 
 # Parse named arguments
@@ -95,6 +96,7 @@ echo "Gunicorn threads per worker: $GUNICORN_THREADS_PER_WORKER"
 echo "Project root directory: $PROJECT_ROOT_DIR"
 echo "Log directory: $LOG_DIR"
 echo "Deployment mode: $DEPLOYMENT_MODE"
+echo "Payment event workers: $PAYMENT_EVENT_WORKERS"
 
 # Running migrations and collecting static files
 cd $PROJECT_ROOT_DIR
@@ -144,6 +146,14 @@ if [ "$DEPLOYMENT_MODE" == "CRON" ]; then
 fi
 
 
+# WORKER deployment mode: applies queued payment webhooks as they arrive
+if [ "$DEPLOYMENT_MODE" == "WORKER" ]; then
+    echo "Starting payment event worker..."
+    cd $PROJECT_ROOT_DIR
+    exec python manage.py process_payment_events --workers $PAYMENT_EVENT_WORKERS
+fi
+
+
 # API deployment mode
 if [ "$DEPLOYMENT_MODE" == "API" ]; then
     echo "Starting Gunicorn..."
@@ -172,6 +182,11 @@ if [ "$DEPLOYMENT_MODE" == "FULL" ]; then
     cd $PROJECT_ROOT_DIR
     python manage.py crontab add
 
+    # webhooks are applied here within a second; the drain_payment_events cron is the safety net
+    echo "Starting payment event worker..."
+    python manage.py process_payment_events --workers $PAYMENT_EVENT_WORKERS &
+    echo "Payment event worker started with PID: $!"
+
     echo "Starting Gunicorn..."
     exec gunicorn \
         --bind 0.0.0.0:$PORT \
@@ -1,7 +1,38 @@
+from utils.badges import reconcile_badges
+from utils.payment_outbox import dispatch_due_calls
+from utils.payments import process_payment_events
+from utils.product_import import process_product_imports
+from utils.reconciliation import reconcile_stale_payments
+from utils.stock import release_expired_reservations
 
 
+def cron_run():
+    stats = reconcile_stale_payments()
+    print(f"payment reconciliation: {stats}")
 
 
+def release_expired_stock_holds():
+    released = release_expired_reservations()
+    print(f"released {released} expired stock holds")
 
-def cron_run():
-    print("cron running")
+
+def retry_payment_gateway_calls():
+    calls = dispatch_due_calls()
+    print(f"dispatched {len(calls)} payment gateway calls")
+
+
+def drain_payment_events():
+    # safety net behind the process_payment_events worker
+    handled = process_payment_events()
+    print(f"processed {handled} payment events")
+
+
+def run_product_imports():
+    # jobs already claimed by another run (or the command) are skipped
+    handled = process_product_imports()
+    print(f"ran {handled} product imports")
+
+
+def reconcile_badge_counters():
+    repaired = reconcile_badges()
+    print(f"repaired {len(repaired)} badge counters")
@@ -1,3 +1,212 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase, TransactionTestCase
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from db.models import Order, Payment, Store, User
+from enums.store import GatewayCallStatus, OrderStatus, PaymentStatus
+from utils.cashfree_stub import serve_in_thread
+from utils.payment_gateway import CircuitBreaker, CircuitOpenError, GatewayError, PaymentGatewayClient
+from utils.payment_outbox import dispatch_gateway_call, enqueue_create_order
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PaymentGatewayClientTests(SimpleTestCase):
+    """PaymentGatewayClient against the local Cashfree stub (utils.cashfree_stub)."""
+
+    def setUp(self):
+        self.stub = serve_in_thread()
+        self.addCleanup(self.stub.server_close)
+        self.addCleanup(self.stub.shutdown)
+
+        self.metrics = InMemoryMetricReader()
+        self.clock = FakeClock()
+        self.client = PaymentGatewayClient(
+            "client-id",
+            "client-secret",
+            self.stub.url,
+            api_version="2025-01-01",
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=self.clock),
+            meter=MeterProvider(metric_readers=[self.metrics]).get_meter("test"),
+            sleep=lambda seconds: None
+        )
+        self.addCleanup(self.client.close)
+
+    def payload(self, order_id="ORD-1"):
+        return {
+            "order_currency": "INR",
+            "order_amount": 100.0,
+            "order_id": order_id,
+            "customer_details": {"customer_id": "c1", "customer_phone": "9999999999"},
+        }
+
+    def metric_points(self, name):
+        data = self.metrics.get_metrics_data()
+        return [
+            point
+            for resource in data.resource_metrics
+            for scope in resource.scope_metrics
+            for metric in scope.metrics if metric.name == name
+            for point in metric.data.data_points
+        ]
+
+    def test_create_order_returns_session(self):
+        data = self.client.create_order(self.payload())
+
+        self.assertTrue(data["payment_session_id"])
+        self.assertTrue(data["cf_order_id"])
+        self.assertEqual(self.client.get_order("ORD-1")["cf_order_id"], data["cf_order_id"])
+
+    def test_connection_is_reused(self):
+        for i in range(5):
+            self.client.create_order(self.payload(f"ORD-{i}"))
+
+        self.assertEqual(self.stub.requests, 5)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_retries_server_errors(self):
+        self.stub.fail_next = 2
+
+        data = self.client.create_order(self.payload())
+
+        self.assertTrue(data["payment_session_id"])
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_retry_budget_is_bounded(self):
+        self.stub.fail_next = 10
+
+        with self.assertRaises(GatewayError) as ctx:
+            self.client.create_order(self.payload())
+
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertEqual(self.stub.requests, self.client.max_retries + 1)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(GatewayError) as ctx:
+            self.client.get_order("missing")
+
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_duplicate_create_returns_existing_order(self):
+        first = self.client.create_order(self.payload())
+        second = self.client.create_order(self.payload())
+
+        self.assertEqual(first["payment_session_id"], second["payment_session_id"])
+
+    def test_read_timeout_is_retryable(self):
+        self.stub.latency_ms = 300
+
+        with self.assertRaises(GatewayError) as ctx:
+            self.client.create_order(self.payload(), read_timeout=0.05)
+
+        self.assertTrue(ctx.exception.retryable)
+        self.assertIsNone(ctx.exception.status_code)
+
+    def test_breaker_opens_and_fails_fast(self):
+        self.stub.fail_next = 3
+
+        with self.assertRaises(GatewayError):
+            self.client.create_order(self.payload())
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            self.client.create_order(self.payload("ORD-2"))
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_breaker_half_open_probe_closes_it(self):
+        self.stub.fail_next = 3
+        with self.assertRaises(GatewayError):
+            self.client.create_order(self.payload())
+
+        self.clock.now += 30
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.HALF_OPEN)
+
+        self.assertTrue(self.client.create_order(self.payload("ORD-2"))["payment_session_id"])
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens_breaker(self):
+        self.stub.fail_next = 4
+        with self.assertRaises(GatewayError):
+            self.client.create_order(self.payload())
+
+        self.clock.now += 30
+        with self.assertRaises(GatewayError):
+            self.client.create_order(self.payload("ORD-2"))
+
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.stub.requests, 4)
+
+    def test_latency_and_error_metrics(self):
+        self.stub.fail_next = 1
+        self.client.create_order(self.payload())
+
+        durations = self.metric_points("payment_gateway.request.duration")
+        self.assertEqual(sum(point.count for point in durations), 2)
+        self.assertEqual(
+            {point.attributes["outcome"] for point in durations},
+            {"200", "500"}
+        )
+
+        errors = self.metric_points("payment_gateway.request.errors")
+        self.assertEqual([(p.attributes["error"], p.value) for p in errors], [("500", 1)])
+
+
+class PaymentOutboxTests(TransactionTestCase):
+    """utils.payment_outbox dispatching to the local Cashfree stub."""
+
+    def setUp(self):
+        self.stub = serve_in_thread()
+        self.addCleanup(self.stub.server_close)
+        self.addCleanup(self.stub.shutdown)
+
+        self.store = Store.objects.create(
+            name="Test store",
+            mobile=9999999999,
+            address="Test address",
+            logo="logo.png",
+            client_id="outbox-client-id",
+            client_secret="outbox-client-secret",
+            webhook="http://127.0.0.1/webhook",
+            url=self.stub.url
+        )
+        self.user = User.objects.create(store=self.store, username="outbox-user", mobile=9999999999)
+
+    def initiate_order(self):
+        order = Order.objects.create(
+            store=self.store,
+            user=self.user,
+            order_number="ORD-1",
+            address={},
+            coupon_discount=Decimal("0.00"),
+            amount=Decimal("100.00")
+        )
+        payment = Payment.objects.create(
+            store=self.store,
+            user=self.user,
+            order=order,
+            amount=order.amount,
+            status=PaymentStatus.INITIATED
+        )
+        return enqueue_create_order(order, payment, self.user)
+
+    def test_rejected_call_fails_order_without_retrying(self):
+        self.stub.reject_next = 1
+
+        call = dispatch_gateway_call(self.initiate_order().id)
+
+        self.assertEqual(call.status, GatewayCallStatus.FAILED)
+        self.assertEqual(call.attempts, 1)
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(call.payment.status, PaymentStatus.FAILED)
+        self.assertEqual(Order.objects.get(id=call.order_id).status, OrderStatus.FAILED)
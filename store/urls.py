@@ -4,13 +4,15 @@ from store.views import PinListView, AddressAPIView, ProductDetailAPIView, Produ
     BannerListView, CategoryListView, AddToCartAPIView, CartListAPIView, UpdateCartAPIView, RemoveFromCartAPIView, \
     AddToWishlistAPIView, WishlistListAPIView, RemoveFromWishlistAPIView, CartTotalAPIView, \
     FlashSaleBannerListView, WebBannerListView, Webhook, PaymentStatusAPIView, Reviews, ContactMessageAPIView, \
-    TagsListView, UserCouponListAPIView, CheckoutPreview
+    TagsListView, UserCouponListAPIView, CheckoutPreview, ProductSuggestAPIView, PaymentSessionAPIView, \
+    CartSyncAPIView
 
 urlpatterns = [
     path("category", CategoryListView.as_view()),
     path("tags", TagsListView.as_view()),
 
     path("products", ProductListAPIView.as_view()),
+    path("products/suggest", ProductSuggestAPIView.as_view()),
     path("product/<str:id>", ProductDetailAPIView.as_view()),
 
     path("add/wishlist",AddToWishlistAPIView.as_view()),
@@ -24,12 +26,14 @@ urlpatterns = [
 
     path("checkout-preview", CheckoutPreview.as_view()),
     path("order/initiate", InitiateOrder.as_view()),
+    path("order/payment-session", PaymentSessionAPIView.as_view()),
     path("payment/status/update", PaymentStatusAPIView.as_view()),
     path("paymentWebhook", Webhook.as_view()),
 
 
     path("orders",OrderView.as_view()),
     path("cart/total",CartTotalAPIView.as_view()),
+    path("cart/sync",CartSyncAPIView.as_view()),
 
     path("productreview",Reviews.as_view()),
     path("contact/message",ContactMessageAPIView.as_view()),
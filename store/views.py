@@ -1,25 +1,37 @@
 import uuid
 from tokenize import Double
 from unicodedata import category
-import requests
 from django.contrib.admin.templatetags.admin_list import results
 from django.db import transaction
-from django.db import IntegrityError
-from django.db.models import Q, Count, Avg
+from django.db import IntegrityError, OperationalError
+from django.db.models import Q, Count, Avg, Subquery
 from decimal import Decimal
 
 from django.utils.timezone import now
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated,AllowAny
 
-from django.conf import settings
-
 from db import models
-from db.models import AddressMaster, PinCode, Product, Order, OrderProducts, Payment, OrderTimeLines, \
-    Banner, Category, Cart, CouponUsage, Wishlist, CouponProduct, CouponCategory, CouponTag, WebBanner, FlashSaleBanner, \
-    ProductReviews, ContactMessage, Tag, Coupons, ProductReviewMedia
-from enums.store import OrderStatus, PaymentStatus
+from db.models import AddressMaster, Product, Order, OrderProducts, Payment, OrderTimeLines, \
+    Banner, Category, Cart, CouponUsage, Wishlist, WebBanner, FlashSaleBanner, \
+    ProductReviews, ContactMessage, Tag, Coupons, ProductReviewMedia, PaymentGatewayCall
+from enums.store import OrderStatus, PaymentStatus, GatewayCallStatus
 from mixins.drf_views import CustomResponse
+from mixins.pagination import keyset_paginate, ranked_keyset_paginate
+from utils.badges import adjust_badges, get_badges
+from utils.cart import sync_cart
+from utils.checkout import load_checkout_lines
+from utils.coupons import find_coupon
+from utils.order_stats import rollup_orders
+from utils.payment_gateway import GatewayError, gateway_client
+from utils.payment_outbox import CREATE_ORDER, dispatch_and_wait, enqueue_create_order, payment_session_data, \
+    submit_gateway_call
+from utils.product_card import card_values, cards_from_rows
+from utils.search import search_products, suggest, SUGGEST_MIN_LENGTH, SUGGEST_MAX_LIMIT
+from utils.payments import CASHFREE, apply_payment_status, map_cashfree_status, record_payment_event
+from utils.pincode_service import pincode_service
+from utils.shipping import quote_shipping
+from utils.stock import reserve_stock
 from utils.store import generate_order_number, time_ago
 
 
@@ -79,22 +91,19 @@ class ProductListAPIView(APIView):
         page = int(request.query_params.get("page", 1))
         page_size = int(request.query_params.get("page_size", 12))
 
+        # cursor mode: "cursor=" (empty) for the first page, then the returned next_cursor
+        cursor = request.query_params.get("cursor")
+        include_total = request.query_params.get("include_total", "").lower() == "true"
+
         # ---------- Base queryset ----------
         queryset = Product.objects.filter(
             store=store,
             is_active=True
-        ).prefetch_related(
-            "categories",
-            "tags",
-            "media"
         ).order_by("-created_at")
 
-        # ---------- Search ----------
+        # ---------- Search (ranked full-text) ----------
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(search_tags__icontains=search)
-            )
+            queryset = search_products(queryset, search)
 
         # ---------- Category filter ----------
         if category_id:
@@ -110,56 +119,54 @@ class ProductListAPIView(APIView):
             )
 
         queryset = queryset.distinct()
+        cards = queryset.values(*card_values(), "created_at", *(["rank"] if search else []))
 
         # ---------- Pagination ----------
-        total = queryset.count()
-        offset = (page - 1) * page_size
-        queryset = queryset[offset: offset + page_size]
+        extra = {}
+        if cursor is not None:
+            # keyset on (created_at, id), newest first, or (rank, created_at, id)
+            # for a search so pages keep relevance order; COUNT(*) only on request
+            total = queryset.count() if include_total else None
+            paginate = ranked_keyset_paginate if search else keyset_paginate
+            try:
+                cards, extra["next_cursor"] = paginate(cards, cursor, page_size)
+            except ValueError:
+                return CustomResponse.errorResponse(description="Invalid cursor")
+        else:
+            total = queryset.count()
+            offset = (page - 1) * page_size
+            cards = cards[offset: offset + page_size]
 
         # ---------- Response ----------
-        data = []
+        data = cards_from_rows(cards)
 
-        for p in queryset:
-            data.append({
-                "id": str(p.id),
-                "lsin": p.lsin,
-                "group_code": p.group_code,
-                "sku": p.sku,
-
-                "name": p.name,
-                "colour": p.colour,
-                "size": p.size,
+        return CustomResponse.successResponse(
+            data=data,
+            total=total,
+            description="Products fetched successfully",
+            **extra
+        )
 
-                "selling_price": str(p.selling_price),
-                "mrp": str(p.mrp),
-                "current_stock": p.current_stock,
+class ProductSuggestAPIView(APIView):
+    permission_classes = [AllowAny]
 
-                "description": p.description,
-                "highlights": p.highlights,
+    def get(self, request):
+        store = request.store
+        q = (request.query_params.get("q") or "").strip()
+        limit = min(int(request.query_params.get("limit", 8)), SUGGEST_MAX_LIMIT)
 
-                "rating": float(p.rating),
-                "total_rating": p.total_rating,
-                "number_of_reviews": p.number_of_reviews,
+        data = {"products": [], "categories": [], "tags": []}
 
-                "categories": [
-                    {"id": str(c.id), "name": c.name}
-                    for c in p.categories.all()
-                ],
-                "tags": [
-                    {"id": str(t.id), "name": t.name}
-                    for t in p.tags.all()
-                ],
-                "search_tags": p.search_tags,
-                "gst_percentage": p.gst_percentage,
-                "gst_amount": p.gst_amount,
-                "images": [m.url for m in p.media.all()],
-                "is_active": p.is_active
-            })
+        if len(q) >= SUGGEST_MIN_LENGTH and limit > 0:
+            try:
+                data = suggest(store, q, limit)
+            except OperationalError:
+                # latency budget exceeded -> empty suggestions, never a slow keystroke
+                pass
 
         return CustomResponse.successResponse(
             data=data,
-            total=total,
-            description="Products fetched successfully"
+            description="Suggestions fetched successfully"
         )
 
 class ProductDetailAPIView(APIView):
@@ -169,66 +176,33 @@ class ProductDetailAPIView(APIView):
         store = request.store
 
         try:
-            current = Product.objects.prefetch_related(
-                "categories",
-                "tags",
-                "media"
-            ).get(
-                id=id,
-                store=store,
-                is_active=True
-            )
-        except Product.DoesNotExist:
+            product_id = uuid.UUID(str(id))
+        except ValueError:
             return CustomResponse.errorResponse(
                 description="Product not found"
             )
 
-        related_products = Product.objects.filter(
+        # the product and its same-LSIN variants in one query
+        lsin = Product.objects.filter(
+            id=product_id,
             store=store,
-            lsin=current.lsin,
             is_active=True
-        ).exclude(
-            id=current.id
-        ).prefetch_related("media")
-
-        def serialize_product(p):
-            return {
-                "id": str(p.id),
-                "lsin": p.lsin,
-                "group_code": p.group_code,
-                "sku": p.sku,
-
-                "name": p.name,
-                "colour": p.colour,
-                "size": p.size,
-
-                "selling_price": str(p.selling_price),
-                "mrp": str(p.mrp),
-                "current_stock": p.current_stock,
-
-                "description": p.description,
-                "highlights": p.highlights,
-
-                "rating": float(p.rating),
-                "total_rating": p.total_rating,
-                "number_of_reviews": p.number_of_reviews,
-
-                "categories": [
-                    {"id": str(c.id), "name": c.name}
-                    for c in p.categories.all()
-                ],
-                "tags": [
-                    {"id": str(t.id), "name": t.name}
-                    for t in p.tags.all()
-                ],
-                "search_tags": p.search_tags,
-                "gst_percentage": p.gst_percentage,
-                "gst_amount": p.gst_amount,
-                "images": [m.url for m in p.media.all()],
-                "is_active": p.is_active
-            }
-        products = [serialize_product(current)]
-        products += [serialize_product(p) for p in related_products]
+        ).values("lsin")[:1]
+
+        rows = Product.objects.filter(
+            Q(id=product_id) | Q(lsin=Subquery(lsin)),
+            store=store,
+            is_active=True
+        ).values(*card_values())
+
+        cards = cards_from_rows(rows)
+        current = [c for c in cards if c["id"] == str(product_id)]
+        if not current:
+            return CustomResponse.errorResponse(
+                description="Product not found"
+            )
+
+        products = current + [c for c in cards if c["id"] != str(product_id)]
         return CustomResponse.successResponse(
             data=products,
             description="Product details fetched successfully"
@@ -257,12 +231,15 @@ class AddToWishlistAPIView(APIView):
                 description="product variant not found"
             )
 
-        wishlist, created = Wishlist.objects.get_or_create(
-            store=store,
-            user=user,
-            product=product_variant,
-            # defaults={"is_active": True}
-        )
+        with transaction.atomic():
+            wishlist, created = Wishlist.objects.get_or_create(
+                store=store,
+                user=user,
+                product=product_variant,
+                # defaults={"is_active": True}
+            )
+            if created:
+                adjust_badges(store, user, wishlist_items=1)
 
         if not created:
             return CustomResponse().successResponse(data={},
@@ -287,11 +264,13 @@ class RemoveFromWishlistAPIView(APIView):
             return CustomResponse.errorResponse(
                 description="product variant not found"
             )
-        deleted, _ = Wishlist.objects.filter(
-            store=request.store,
-            user=request.user,
-            product=product_variant
-        ).delete()
+        with transaction.atomic():
+            deleted, _ = Wishlist.objects.filter(
+                store=request.store,
+                user=request.user,
+                product=product_variant
+            ).delete()
+            adjust_badges(request.store, request.user, wishlist_items=-deleted)
 
         if not deleted:
             return CustomResponse().errorResponse(
@@ -309,58 +288,13 @@ class WishlistListAPIView(APIView):
         store = request.store
         user = request.user
 
-        wishlists = Wishlist.objects.filter(
+        rows = Wishlist.objects.filter(
             store=store,
             user=user,
             is_active=True
-        ).select_related(
-            "product",
-        ).prefetch_related(
-            "product__media",
-            "product__categories",
-            "product__tags"
-        ).order_by("-created_at")
-
-        data = []
-
-        for w in wishlists:
-            p = w.product
+        ).order_by("-created_at").values(*card_values("product__"))
 
-            data.append({
-                "id": str(p.id),
-                "lsin": p.lsin,
-                "group_code": p.group_code,
-                "sku": p.sku,
-
-                "name": p.name,
-                "colour": p.colour,
-                "size": p.size,
-
-                "selling_price": str(p.selling_price),
-                "mrp": str(p.mrp),
-                "current_stock": p.current_stock,
-
-                "description": p.description,
-                "highlights": p.highlights,
-
-                "rating": float(p.rating),
-                "total_rating": p.total_rating,
-                "number_of_reviews": p.number_of_reviews,
-
-                "categories": [
-                    {"id": str(c.id), "name": c.name}
-                    for c in p.categories.all()
-                ],
-                "tags": [
-                    {"id": str(t.id), "name": t.name}
-                    for t in p.tags.all()
-                ],
-                "search_tags": p.search_tags,
-                "gst_percentage": p.gst_percentage,
-                "gst_amount": p.gst_amount,
-                "images": [m.url for m in p.media.all()],
-                "is_active": p.is_active
-            })
+        data = cards_from_rows(rows, prefix="product__")
 
         return CustomResponse.successResponse(
             data=data,
@@ -485,16 +419,14 @@ class PinListView(APIView):
         if not pin:
             return CustomResponse.errorResponse(description="pin required")
 
-        pin = PinCode.objects.filter(pin=pin).first()
-        if not pin:
+        # in-memory directory, no query; see utils.pincode_service
+        offices = pincode_service.lookup(pin)
+        if not offices:
             return CustomResponse.errorResponse(description="pin not found")
 
         data = {
-            "pin":pin.pin,
-            "state":pin.state,
-            "city":pin.city,
-            "area":pin.area,
-            "country":pin.country
+            **offices[0],
+            "areas": [{"area": o["area"], "city": o["city"]} for o in offices],
         }
 
         return CustomResponse.successResponse(data=data,total=1)
@@ -514,46 +446,24 @@ class CheckoutPreview(APIView):
         if not items:
             return CustomResponse.errorResponse("Products are required")
 
-        products_data = []
-
-        mrp_total = Decimal("0.00")
-        subtotal = Decimal("0.00")
-
-        # ---------- Validate & prepare products ----------
-        for item in items:
-            product_id = item.get("product_id")
-            qty = int(item.get("qty", 0))
-
-            if not product_id or qty <= 0:
-                return CustomResponse.errorResponse("Invalid product or qty")
-
-            product = Product.objects.filter(
-                id=product_id,
-                store=store,
-                is_active=True
-            ).first()
-            if not product:
-                return CustomResponse.errorResponse(
-                    "Product not found or inactive"
-                )
-
-            if product.current_stock < qty:
-                return CustomResponse.errorResponse(
-                    f"{product.name} is out of stock"
-                )
-
-            line_mrp = product.mrp * qty
-            line_subtotal = product.selling_price * qty
-
-            mrp_total += line_mrp
-            subtotal += line_subtotal
+        # ---------- Validate & prepare products (one query) ----------
+        try:
+            lines = load_checkout_lines(store, items, with_media=True)
+        except Exception as e:
+            return CustomResponse.errorResponse(str(e))
+
+        products_data = [
+            {
+                "product": line["product"],
+                "qty": line["qty"],
+                "line_mrp": line["line_mrp"],
+                "line_subtotal": line["line_total"]
+            }
+            for line in lines
+        ]
 
-            products_data.append({
-                "product": product,
-                "qty": qty,
-                "line_mrp": line_mrp,
-                "line_subtotal": line_subtotal
-            })
+        mrp_total = sum((line["line_mrp"] for line in lines), Decimal("0.00"))
+        subtotal = sum((line["line_total"] for line in lines), Decimal("0.00"))
 
         price_drop_discount = mrp_total - subtotal
 
@@ -581,8 +491,17 @@ class CheckoutPreview(APIView):
             except Exception as e:
                 return CustomResponse.errorResponse(str(e))
 
-        # ---------- Charges (future ready) ----------
-        shipping_charge = Decimal("0.00")  # later based on pin_code
+        # ---------- Charges ----------
+        # priced once an address is chosen; COD only adds the rate card's surcharge
+        shipping_charge = Decimal("0.00")
+        if address:
+            try:
+                shipping_charge = quote_shipping(
+                    store, lines, address, subtotal - coupon_discount,
+                    cod=data.get("payment_mode") == "COD"
+                )
+            except Exception as e:
+                return CustomResponse.errorResponse(description=str(e))
         platform_fee = Decimal("0.00")  # later config-based
 
         final_payable = (
@@ -668,17 +587,11 @@ def calculate_coupon_discount(
     if not coupon_code:
         return Decimal("0.00"), {}, None
 
-    # ---------- Fetch coupon ----------
-    try:
-        coupon = Coupons.objects.get(
-            store=store,
-            code__iexact=coupon_code,
-            is_active=True,
-            start_date__lte=now(),
-            end_date__gte=now()
-        )
-    except Coupons.DoesNotExist:
+    # ---------- Fetch coupon (compiled per-store index) ----------
+    compiled = find_coupon(store.id, coupon_code)
+    if compiled is None:
         raise Exception("Invalid or expired coupon code")
+    coupon = compiled.coupon
 
     # ---------- First order check ----------
     if coupon.first_order_only:
@@ -694,38 +607,13 @@ def calculate_coupon_discount(
         raise Exception("Order amount not eligible for this coupon")
 
     # ---------- Identify eligible products ----------
-    eligible_items = []
-
-    for item in products:
-        product = item["product"]
-
-        if coupon.target_type == "ORDER":
-            eligible_items.append(item)
-
-        elif coupon.target_type == "PRODUCT":
-            if CouponProduct.objects.filter(
-                coupon=coupon,
-                product=product
-            ).exists():
-                eligible_items.append(item)
-
-        elif coupon.target_type == "CATEGORY":
-            if CouponCategory.objects.filter(
-                coupon=coupon,
-                category__in=product.categories.all()
-            ).exists():
-                eligible_items.append(item)
-
-        elif coupon.target_type == "TAG":
-            if CouponTag.objects.filter(
-                coupon=coupon,
-                tag__in=product.tags.all()
-            ).exists():
-                eligible_items.append(item)
-
-        elif coupon.target_type == "SHIPPING":
-            # Handled outside (shipping engine)
-            eligible_items.append(item)
+    eligible_ids = compiled.eligible_product_ids(
+        item["product"].id for item in products
+    )
+    eligible_items = [
+        item for item in products
+        if item["product"].id in eligible_ids
+    ]
 
     if not eligible_items:
         raise Exception("Coupon not applicable to selected products")
@@ -868,45 +756,15 @@ class InitiateOrder(APIView):
 
         if not address:
             return CustomResponse.errorResponse("address is required")
-        products_data = []
-
-        subtotal = Decimal("0.00")
-        mrp_total = Decimal("0.00")
-        product_map = {} # not used yet
         try:
             with transaction.atomic():
-                # ---------- Validate products & lock stock ----------
-                for item in items:
-                    product_id = item.get("product_id")
-                    qty = int(item.get("qty", 0))
-
-                    if not product_id or qty <= 0:
-                        return CustomResponse.errorResponse(
-                            "Invalid product or quantity"
-                        )
-
-                    product = Product.objects.select_for_update().get(
-                        id=product_id,
-                        store=store,
-                        is_active=True
-                    )
+                # ---------- Validate products (one query) ----------
+                products_data = load_checkout_lines(store, items)
 
-                    if product.current_stock < qty:
-                        return CustomResponse.errorResponse(
-                            f"{product.name} is out of stock"
-                        )
-                    line_mrp = product.mrp * qty
-                    line_subtotal = product.selling_price * qty
-
-                    mrp_total += line_mrp
-                    subtotal += line_subtotal
-                    products_data.append({
-                        "product": product,
-                        "qty": qty,
-                        "line_total": line_subtotal,
-                        "line_mrp": line_mrp
-                    })
+                mrp_total = sum((p["line_mrp"] for p in products_data), Decimal("0.00"))
+                subtotal = sum((p["line_total"] for p in products_data), Decimal("0.00"))
                 price_drop_discount = mrp_total - subtotal
+
                 # ---------- Coupon ----------
                 coupon_discount = Decimal("0.00")
                 apportioned_map = {}
@@ -915,67 +773,69 @@ class InitiateOrder(APIView):
                     coupon_discount, apportioned_map, coupon = calculate_coupon_discount(
                         store=store,
                         user=user,
-                        products=[
-                            {
-                                "product": p["product"],
-                                "qty": p["qty"],
-                                "line_total": p["line_total"]
-                            }
-                            for p in products_data
-                        ],
+                        products=products_data,
                         subtotal=subtotal,
                         coupon_code=coupon_code
                     )
-            # ---------- Charges (future ready) ----------
-            shipping_charge = Decimal("0.00")
-            platform_fee = Decimal("0.00")
 
-            final_amount = subtotal - coupon_discount + shipping_charge + platform_fee
-            order_number = generate_order_number(store, "ORD")
-            order = Order.objects.create(
-                store=store,
-                user=user,
-                order_number=order_number,
-                address=data.get("address"),
-
-                mrp=mrp_total,
-                selling_price=subtotal,
-                coupon_discount=coupon_discount,
-                coupon_code=coupon_code,
-                coupon=coupon,
-                amount=final_amount,
+                # ---------- Charges ----------
+                shipping_charge = quote_shipping(store, products_data, address, subtotal - coupon_discount)
+                platform_fee = Decimal("0.00")
 
-                paid_online=final_amount,
-                wallet_paid=Decimal("0.00"),
+                final_amount = subtotal - coupon_discount + shipping_charge + platform_fee
+                order_number = generate_order_number(store, "ORD")
+                order = Order.objects.create(
+                    store=store,
+                    user=user,
+                    order_number=order_number,
+                    address=data.get("address"),
+
+                    mrp=mrp_total,
+                    selling_price=subtotal,
+                    coupon_discount=coupon_discount,
+                    coupon_code=coupon_code,
+                    coupon=coupon,
+                    shipping_charge=shipping_charge,
+                    amount=final_amount,
 
-                status=OrderStatus.INITIATED,
-                created_by=user.mobile
-            )
-            # ---------- Create Order Products ----------
-            for item in products_data:
-                product = item["product"]
-                qty = item["qty"]
+                    paid_online=final_amount,
+                    wallet_paid=Decimal("0.00"),
 
-                discount = apportioned_map.get(
-                    product.id, Decimal("0.00")
+                    status=OrderStatus.INITIATED,
+                    created_by=user.mobile
                 )
 
-                OrderProducts.objects.create(
-                    order=order,
-                    product=product,
-                    sku=product.sku,
-                    qty=qty,
-
-                    mrp=product.mrp,
-                    selling_price=product.selling_price,
-
-                    apportioned_discount=discount,
-                    apportioned_online=(
-                            product.selling_price * qty - discount
-                    ),
-                    apportioned_wallet=Decimal("0.00"),
-                    apportioned_gst=product.gst_amount
-                )
+                # ---------- Hold stock until payment (released by the sweeper if unpaid) ----------
+                reserve_stock(order, products_data)
+
+                # ---------- Create Order Products ----------
+                order_products = []
+                for item in products_data:
+                    product = item["product"]
+                    qty = item["qty"]
+
+                    discount = apportioned_map.get(
+                        product.id, Decimal("0.00")
+                    )
+
+                    order_products.append(OrderProducts(
+                        order=order,
+                        product=product,
+                        sku=product.sku,
+                        qty=qty,
+
+                        mrp=product.mrp,
+                        selling_price=product.selling_price,
+
+                        apportioned_discount=discount,
+                        apportioned_online=(
+                                product.selling_price * qty - discount
+                        ),
+                        apportioned_wallet=Decimal("0.00"),
+                        apportioned_gst=product.gst_amount
+                    ))
+                OrderProducts.objects.bulk_create(order_products)
+
                 # ---------- Order Timeline ----------
                 OrderTimeLines.objects.create(
                     order=order,
@@ -992,178 +852,80 @@ class InitiateOrder(APIView):
                     amount=final_amount,
                     status=PaymentStatus.INITIATED
                 )
-                payment_resp = initiateOrder(
-                    user=user,
-                    amount=final_amount,
-                    order=order,
-                    store=store
+                rollup_orders(created=[order])
+
+                # ---------- Gateway call (outbox, sent after commit) ----------
+                call = enqueue_create_order(order, payment, user)
+
+            # short wait only: a slow gateway leaves the call to the poll endpoint / retry cron
+            dispatched = dispatch_and_wait(call.id)
+            if dispatched is None:
+                return CustomResponse.successResponse(
+                    data=payment_session_data(call),
+                    description="Order initiated, payment session pending"
                 )
-                payment.session_id = payment_resp["payment_session_id"]
-                payment.cf_order_id = payment_resp["cf_order_id"]
-                payment.save(
-                    update_fields=["session_id", "cf_order_id"]
+            if dispatched.status == GatewayCallStatus.FAILED:
+                return CustomResponse().errorResponse(
+                    description=dispatched.last_error or "Failed to initiate order"
                 )
-                return CustomResponse.successResponse(
-                    data={
-                        "order_number": order.order_number,
-                        "payment_session_id": payment.session_id,
-                        "cf_order_id": payment.cf_order_id,
-                        "amount": str(final_amount)
-                    },
-                    description="Order initiated successfully"
+            return CustomResponse.successResponse(
+                data=payment_session_data(dispatched),
+                description=(
+                    "Order initiated successfully"
+                    if dispatched.status == GatewayCallStatus.SUCCEEDED
+                    else "Order initiated, payment session pending"
                 )
+            )
         except Exception as e:
             return CustomResponse().errorResponse(
                 description=str(e) or "Failed to initiate order"
             )
 
-def initiateOrder(user, amount, order, store):
+class Webhook(APIView):
     """
-    Initiate payment using school-specific CashFree credentials from the database.
+    Cashfree webhook: stored in payment_event and acknowledged; the
+    process_payment_events worker applies it. A failed insert raises, and the
+    non-2xx answer makes Cashfree deliver it again.
     """
-    print("DEBUG CASHFREE CLIENT ID:", store.client_id)
-    print("DEBUG CASHFREE CLIENT SECRET:", store.client_secret)
-    print("DEBUG CASHFREE URL:", store.url)
-    print("DEBUG CASHFREE WEBHOOK:", store.webhook)
-
-    # --- Prepare payload ---
-    payload = {
-        "order_currency": "INR",
-        "order_amount": float(amount),
-        "order_id": str(order.order_number),
-        "customer_details": {
-            "customer_id": str(user.id),
-            "customer_phone": str(user.mobile),
-            "customer_name": str(user.username),
-        },
-        "order_meta": {
-            "notify_url": store.webhook,
-        },
-    }
-
-    # --- Prepare headers ---
-    headers = {
-        "x-api-version": settings.CASHFREE_API_VERSION,
-        "x-client-id": store.client_id,
-        "x-client-secret": store.client_secret,
-        "Content-Type": "application/json",
-    }
-    print("headers",headers)
-    print("payload",payload)
-
-
-    try:
-        # --- Send request to CashFree ---
-        response = requests.post(store.url, json=payload, headers=headers, timeout=15)
-
-
-        # --- Validate response ---
-        if response.status_code == 200:
-            resp_json = response.json()
-            order_id = resp_json.get("cf_order_id")
-            session_id = resp_json.get("payment_session_id")
-
-            if order_id and session_id:
-                return {
-                    "cf_order_id": order_id,
-                    "payment_session_id": session_id,
-                    "order_number":order.order_number
-                }
-            else:
-                raise Exception("Could not found cf_order_id and payment_session_id")
-        else:
-            raise Exception(
-                f"Cashfree response code {response.status_code}: {response.text}"
-            )
-    except Exception as e:
-        raise Exception(e)
-
-
-SYSTEM_UPDATED_BY = "CASHFREE_WEBHOOK"
-
-def remove_cart_items(user, store):
-    Cart.objects.filter(user=user, store=store).delete()
-
-class Webhook(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        try:
-            data = request.data
-
-            event_type = data.get("type")
-            order_id = data.get("data", {}).get("order", {}).get("order_id")
-            order_amount = data.get("data", {}).get("order", {}).get("order_amount")
+        record_payment_event(CASHFREE, request.body, request.headers)
+        return CustomResponse().successResponse(data={},
+            description="Webhook received"
+        )
+#
+class PaymentSessionAPIView(APIView):
+    """Poll target while InitiateOrder's gateway call is still pending."""
+    permission_classes = [IsAuthenticated]
 
-            print("Webhook received:", data)
+    def get(self, request):
+        order_number = request.GET.get("order_number")
+        if not order_number:
+            return CustomResponse().errorResponse(
+                description="order number  required"
+            )
 
-            # Cashfree test webhook may not have real order_id
-            if not order_id:
-                print("Webhook test / invalid payload")
-                return CustomResponse().successResponse(data={},
-                    description="Webhook received"
-                )
-            order = Order.objects.filter(order_number=order_id).first()
-            if not order:
-                return CustomResponse().successResponse(data={},
-                                                        description="No Order Found with Order Number"
-                                                        )
-
-            payment = Payment.objects.filter(order=order).first()
-
-            # If no DB records → still return 200
-            if not payment:
-                print("Order/Payment not found for order_id:", order_id)
-                return CustomResponse().successResponse(data={},
-                    description="Webhook received"
-                )
+        call = PaymentGatewayCall.objects.select_related("payment").filter(
+            store=request.store,
+            order__order_number=order_number,
+            order__user=request.user,
+            operation=CREATE_ORDER
+        ).order_by("-created_at").first()
+        if not call:
+            return CustomResponse().errorResponse(
+                description="Order not found"
+            )
 
-            with transaction.atomic():
+        # a due retry is sent now rather than waiting for the cron
+        if call.status == GatewayCallStatus.PENDING and call.next_attempt_at <= now():
+            submit_gateway_call(call.id)
 
-                if event_type == "PAYMENT_SUCCESS_WEBHOOK":
-                    payment.status = PaymentStatus.COMPLETED
-                    payment.updated_by = event_type
-                    payment.save(update_fields=["status", "updated_by"])
-
-                    order.status = OrderStatus.PLACED
-                    order.paid_online = order_amount
-                    order.updated_by = event_type
-                    order.save(update_fields=["status", "paid_online", "updated_by"])
-                    CouponUsage.objects.create(
-                        coupon=order.coupon,
-                        user=order.user,
-                        order=order
-                    )
-                    remove_cart_items(order.user, order.store)
-                elif event_type == "PAYMENT_FAILED_WEBHOOK":
-                    payment.status = PaymentStatus.FAILED
-                    order.updated_by = event_type
-                    order.save(update_fields=["status", "paid_online", "updated_by"])
-
-                    order.status = OrderStatus.FAILED
-                    order.updated_by = event_type
-                    order.save(update_fields=["status", "updated_by"])
-
-                elif event_type == "PAYMENT_USER_DROPPED_WEBHOOK":
-                    payment.status = PaymentStatus.CANCELLED
-                    payment.updated_by = event_type
-                    payment.save(update_fields=["status", "updated_by"])
-
-                    order.status = OrderStatus.CANCELLED
-                    order.updated_by = event_type
-                    order.save(update_fields=["status", "updated_by"])
-                else:
-                    print("Unhandled webhook type:", event_type)
+        return CustomResponse.successResponse(
+            data=payment_session_data(call),
+            description="Payment session status"
+        )
 
-            return CustomResponse().successResponse(data={},
-                description="Webhook processed"
-            )
-        except Exception as e:
-            print("Webhook exception:", str(e))
-            return CustomResponse().successResponse(data={},
-                description="Webhook received"
-            )
-#
 class PaymentStatusAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -1199,34 +961,9 @@ class PaymentStatusAPIView(APIView):
         cf_order_status = cf_response.get("order_status")  # PAID / ACTIVE / FAILED
         verified_status = map_cashfree_status(cf_order_status)
 
-        with transaction.atomic():
-
-            payment.status = verified_status
-            payment.save(update_fields=["status"])
-
-            if verified_status == PaymentStatus.COMPLETED:
-                order.status = OrderStatus.PLACED
-                order.paid_online = payment.amount
-                order.updated_by = "PAYMENT STATUS BY FE"
-                order.save(update_fields=["status", "paid_online"])
-                CouponUsage.objects.create(
-                    coupon=order.coupon,
-                    user=order.user,
-                    order=order
-                )
-                remove_cart_items(order.user, order.store)
-
-            elif verified_status == PaymentStatus.FAILED:
-                order.status = OrderStatus.FAILED
-                order.updated_by = "PAYMENT STATUS BY FE"
-                order.save(update_fields=["status", "updated_by"])
-
-
-            elif verified_status == PaymentStatus.CANCELLED:
-                order.status = OrderStatus.CANCELLED
-                order.updated_by = "PAYMENT STATUS BY FE"
-                order.save(update_fields=["status", "updated_by"])
-
+        order, payment, _ = apply_payment_status(
+            order, verified_status, updated_by="PAYMENT STATUS BY FE"
+        )
 
         return CustomResponse().successResponse(
             data={
@@ -1238,31 +975,11 @@ class PaymentStatusAPIView(APIView):
             description="Payment status verified with Cashfree and updated"
         )
 
-def map_cashfree_status(cf_status):
-    mapping = {
-        "PAID": PaymentStatus.COMPLETED,
-        "ACTIVE": PaymentStatus.PENDING,
-        "FAILED": PaymentStatus.FAILED,
-        "CANCELLED": PaymentStatus.CANCELLED,
-    }
-    return mapping.get(cf_status, PaymentStatus.PENDING)
-
 def fetch_cashfree_payment_status(order_number, cashfree):
-    url = f"{cashfree.url}/{order_number}"
-
-    headers = {
-        "x-api-version": settings.CASHFREE_API_VERSION,
-        "x-client-id": cashfree.client_id,
-        "x-client-secret": cashfree.client_secret,
-        "Content-Type": "application/json",
-    }
-
-    response = requests.get(url, headers=headers, timeout=10)
-
-    if response.status_code != 200:
-        raise Exception("Failed to fetch order status from Cashfree")
-
-    return response.json()
+    try:
+        return gateway_client(cashfree).get_order(order_number)
+    except GatewayError as e:
+        raise Exception("Failed to fetch order status from Cashfree") from e
 
 class OrderedProducts(APIView):
     permission_classes = [IsAuthenticated]
@@ -1360,6 +1077,7 @@ class OrderView(APIView):
                     "status": order.status,
 
                     "coupon_discount": str(order.coupon_discount),
+                    "shipping_charge": str(order.shipping_charge),
                     "amount": str(order.amount),
 
                     "wallet_paid": str(order.wallet_paid),
@@ -1563,86 +1281,72 @@ class AddToCartAPIView(APIView):
                 description="Product not found",
             )
 
-        cart_item, created = Cart.objects.get_or_create(
-            store=store,
-            user=user,
-            product=product,
-            defaults={"quantity": quantity}
-        )
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save(update_fields=["quantity"])
-        else:
-            cart_item.is_active = True
-            cart_item.save(update_fields=["is_active"])
+        with transaction.atomic():
+            cart_item, created = Cart.objects.get_or_create(
+                store=store,
+                user=user,
+                product=product,
+                defaults={"quantity": quantity}
+            )
+            if not created:
+                cart_item.quantity += quantity
+                cart_item.save(update_fields=["quantity"])
+            else:
+                cart_item.is_active = True
+                cart_item.save(update_fields=["is_active"])
+                adjust_badges(store, user, cart_items=1)
 
         return CustomResponse.successResponse(
             data={},
             description="Product added to cart"
         )
 
-class CartListAPIView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        store = request.store
-        user = request.user
+def cart_cards(store, user):
+    """The user's cart as product cards with quantities, newest first (one query)."""
+    rows = list(Cart.objects.filter(
+        store=store,
+        user=user,
+        is_active=True,
+        product__isnull=False
+    ).order_by("-created_at").values("quantity", *card_values("product__")))
 
-        cart_items = Cart.objects.filter(
-            store=store,
-            user=user,
-            is_active=True
-        ).select_related(
-            "product",
-        ).prefetch_related(
-            "product__media",
-            "product__categories",
-            "product__tags"
-        ).order_by("-created_at")
+    quantities = {str(row["product__id"]): row["quantity"] for row in rows}
+    data = cards_from_rows(rows, prefix="product__")
+    for card in data:
+        card["quantity"] = quantities[card["id"]]
+    return data
 
-        data = []
 
-        for w in cart_items:
-            p = w.product
-            data.append({
-                "id": str(p.id),
-                "lsin": p.lsin,
-                "group_code": p.group_code,
-                "sku": p.sku,
+class CartListAPIView(APIView):
+    permission_classes = [IsAuthenticated]
 
-                "name": p.name,
-                "colour": p.colour,
-                "size": p.size,
+    def get(self, request):
+        return CustomResponse.successResponse(
+            data=cart_cards(request.store, request.user),
+            description="Cart items fetched successfully"
+        )
 
-                "selling_price": str(p.selling_price),
-                "mrp": str(p.mrp),
-                "current_stock": p.current_stock,
 
-                "description": p.description,
-                "highlights": p.highlights,
+class CartSyncAPIView(APIView):
+    """
+    Applies a batch of cart operations from a client's local cart (after
+    login or an app restore) in one transaction and returns the cart:
+        {"operations": [{"op": "add" | "update" | "remove", "product_id": ..., "quantity": 1}]}
+    """
+    permission_classes = [IsAuthenticated]
 
-                "rating": float(p.rating),
-                "total_rating": p.total_rating,
-                "number_of_reviews": p.number_of_reviews,
+    def post(self, request):
+        try:
+            skipped = sync_cart(request.store, request.user, request.data.get("operations"))
+        except Exception as e:
+            return CustomResponse.errorResponse(description=str(e) or "Failed to sync cart")
 
-                "categories": [
-                    {"id": str(c.id), "name": c.name}
-                    for c in p.categories.all()
-                ],
-                "tags": [
-                    {"id": str(t.id), "name": t.name}
-                    for t in p.tags.all()
-                ],
-                "search_tags": p.search_tags,
-                "gst_percentage": p.gst_percentage,
-                "gst_amount": p.gst_amount,
-                "images": [m.url for m in p.media.all()],
-                "is_active": p.is_active,
-                "quantity": w.quantity
-            })
         return CustomResponse.successResponse(
-            data=data,
-            description="Cart items fetched successfully"
+            data={
+                "cart": cart_cards(request.store, request.user),
+                "skipped": [str(product_id) for product_id in skipped],
+            },
+            description="Cart synced successfully"
         )
 
 
@@ -1697,10 +1401,12 @@ class RemoveFromCartAPIView(APIView):
             return CustomResponse().errorResponse(
                 description="Product not found"
             )
-        deleted, _ = Cart.objects.filter(
-            product=product,
-            user=request.user
-        ).delete()
+        with transaction.atomic():
+            deleted, _ = Cart.objects.filter(
+                product=product,
+                user=request.user
+            ).delete()
+            adjust_badges(request.store, request.user, cart_items=-deleted)
 
         if not deleted:
             return CustomResponse().errorResponse(
@@ -1725,16 +1431,12 @@ class CartTotalAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        store = request.store
-
-        cart_items = Cart.objects.filter(user=user,store=store).count()
-        wishlist_items = Wishlist.objects.filter(user=user,store=store).count()
+        badges = get_badges(request.store, request.user)
 
         return CustomResponse().successResponse(
             data={
-                "wishlist_items": wishlist_items,
-                "cart_items": cart_items
+                "wishlist_items": badges["wishlist_items"],
+                "cart_items": badges["cart_items"]
             },
 
         )
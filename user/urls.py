@@ -1,7 +1,8 @@
 
 from django.urls import path
 
-from user.views import MobileSendOTPView, MobileVerifyOTPView, FileUploadView, CreateAdmin, AdminLogin, ProfileUpdate
+from user.views import MobileSendOTPView, MobileVerifyOTPView, FileUploadView, CreateAdmin, AdminLogin, ProfileUpdate, \
+    Logout
 
 urlpatterns = [
     path("send-otp", MobileSendOTPView.as_view()),
@@ -10,4 +11,5 @@ urlpatterns = [
     path("admin-login", AdminLogin.as_view()),
     path("storage/upload", FileUploadView.as_view()),
     path("profile", ProfileUpdate.as_view()),
+    path("logout", Logout.as_view()),
 ]
\ No newline at end of file
@@ -14,6 +14,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 import random
 
 from config.settings.common import DEBUG
+from core.auth.session_cache import evict_user, revoke_sessions
 from db.models import User, UserOTP, TempUser, Store, UserSession
 from mixins.drf_views import CustomResponse
 from serializers.user import UserMasterSerializer
@@ -334,17 +335,20 @@ class ProfileUpdate(APIView):
     def post(self, request):
         user = request.user
         data = request.data
-        if "name" in data:
-            user.name = data["name"]
-        if "email" in data:
-            user.email = data["email"]
-        if "profile_pic" in data:
-            user.profile_image = data["profile_pic"]
-        if "dob" in data:
-            user.dob = data["dob"]
-        if "gender" in data:
-            user.gender = data["gender"]
-        user.save()
+        fields = {
+            "name": "name",
+            "email": "email",
+            "profile_pic": "profile_image",
+            "dob": "dob",
+            "gender": "gender",
+        }
+        updated = [field for key, field in fields.items() if key in data]
+        for key, field in fields.items():
+            if key in data:
+                setattr(user, field, data[key])
+        # request.user may come from the session cache; write only what changed
+        user.save(update_fields=updated)
+        evict_user(user.id)
         return CustomResponse().successResponse(data={
             "name":user.name,
             "gender":user.gender,
@@ -355,6 +359,20 @@ class ProfileUpdate(APIView):
         })
 
 
+class Logout(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        session = request.session
+        UserSession.objects.filter(id=session.id).update(is_active=False)
+        revoke_sessions([session.session_token_hash])
+
+        return CustomResponse().successResponse(
+            data={},
+            description="Logged out successfully"
+        )
+
+
 class FileUploadView(APIView):
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
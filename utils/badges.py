@@ -0,0 +1,126 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from db.models import Cart, UserBadgeCounter, Wishlist
+from utils.cache import TTLCache
+
+# other workers may show a badge this many seconds old; the writing worker never does
+BADGE_CACHE_TTL = 5
+
+# user_id -> {"cart_items", "wishlist_items"}
+badge_cache = TTLCache(ttl=BADGE_CACHE_TTL, maxsize=10000)
+
+# a user's items in their own store, upserted where the counter disagrees
+_RECONCILE_SQL = """
+    WITH items AS (
+        SELECT c.user_id, u.store_id, count(*) AS cart_items, 0 AS wishlist_items
+        FROM cart AS c JOIN "user" AS u ON u.id = c.user_id AND u.store_id = c.store_id
+        WHERE %(store_id)s::uuid IS NULL OR u.store_id = %(store_id)s::uuid
+        GROUP BY c.user_id, u.store_id
+        UNION ALL
+        SELECT w.user_id, u.store_id, 0, count(*)
+        FROM wishlist AS w JOIN "user" AS u ON u.id = w.user_id AND u.store_id = w.store_id
+        WHERE %(store_id)s::uuid IS NULL OR u.store_id = %(store_id)s::uuid
+        GROUP BY w.user_id, u.store_id
+    )
+    INSERT INTO user_badge_counter (user_id, store_id, cart_items, wishlist_items, updated_at)
+    SELECT user_id, store_id, sum(cart_items), sum(wishlist_items), now()
+    FROM items
+    GROUP BY user_id, store_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET store_id = EXCLUDED.store_id,
+        cart_items = EXCLUDED.cart_items,
+        wishlist_items = EXCLUDED.wishlist_items,
+        updated_at = now()
+    WHERE (user_badge_counter.store_id, user_badge_counter.cart_items, user_badge_counter.wishlist_items)
+        IS DISTINCT FROM (EXCLUDED.store_id, EXCLUDED.cart_items, EXCLUDED.wishlist_items)
+    RETURNING user_id
+"""
+
+# counters of users left with no items at all
+_RECONCILE_EMPTY_SQL = """
+    UPDATE user_badge_counter AS b
+    SET cart_items = 0, wishlist_items = 0, updated_at = now()
+    WHERE (b.cart_items, b.wishlist_items) <> (0, 0)
+      AND (%(store_id)s::uuid IS NULL OR b.store_id = %(store_id)s::uuid)
+      AND NOT EXISTS (SELECT 1 FROM cart AS c WHERE c.user_id = b.user_id AND c.store_id = b.store_id)
+      AND NOT EXISTS (SELECT 1 FROM wishlist AS w WHERE w.user_id = b.user_id AND w.store_id = b.store_id)
+    RETURNING b.user_id
+"""
+
+
+def _forget(user_ids):
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: [badge_cache.delete(user_id) for user_id in user_ids])
+
+
+def adjust_badges(store, user, cart_items=0, wishlist_items=0):
+    """
+    Adds to the user's counters with one F() update inside the caller's
+    transaction; the first change creates the row. Items added in another
+    store than the user's own are not counted (see CartTotalAPIView).
+    """
+    if store.id != user.store_id:
+        return
+    deltas = {"cart_items": cart_items, "wishlist_items": wishlist_items}
+    changes = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items() if delta
+    }
+    if not changes:
+        return
+
+    counters = UserBadgeCounter.objects.filter(user_id=user.id)
+    if not counters.update(**changes):
+        try:
+            with transaction.atomic():
+                UserBadgeCounter.objects.create(
+                    user_id=user.id,
+                    store_id=store.id,
+                    **{field: max(delta, 0) for field, delta in deltas.items()}
+                )
+        except IntegrityError:
+            # created by a concurrent request in the meantime
+            counters.update(**changes)
+    _forget([user.id])
+
+
+def clear_cart_badges(user_ids):
+    """After a user's whole cart is deleted (e.g. once an order is paid)."""
+    UserBadgeCounter.objects.filter(user_id__in=user_ids).update(cart_items=0)
+    _forget(user_ids)
+
+
+def get_badges(store, user):
+    """
+    {"cart_items", "wishlist_items"}: a cache hit, else one primary-key read.
+    Falls back to counting for a user outside their own store.
+    """
+    if store.id != user.store_id:
+        return {
+            "cart_items": Cart.objects.filter(user=user, store=store).count(),
+            "wishlist_items": Wishlist.objects.filter(user=user, store=store).count(),
+        }
+
+    badges = badge_cache.get(user.id)
+    if badges is None:
+        row = UserBadgeCounter.objects.filter(user_id=user.id).values("cart_items", "wishlist_items").first()
+        badges = row or {"cart_items": 0, "wishlist_items": 0}
+        badge_cache.set(user.id, badges)
+    return dict(badges)
+
+
+def reconcile_badges(store_id=None):
+    """
+    Recounts every user's cart and wishlist (or one store's) and fixes the
+    counters that drifted. Returns the ids of the repaired users.
+    """
+    params = {"store_id": str(store_id) if store_id else None}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_RECONCILE_SQL, params)
+        repaired = [row[0] for row in cursor.fetchall()]
+        cursor.execute(_RECONCILE_EMPTY_SQL, params)
+        repaired += [row[0] for row in cursor.fetchall()]
+        _forget(repaired)
+    return repaired
@@ -0,0 +1,108 @@
+import uuid
+
+from django.db import transaction
+
+from db.models import Cart, Product
+from utils.badges import adjust_badges
+
+CART_SYNC_MAX_OPERATIONS = 200
+CART_SYNC_OPS = ("add", "update", "remove")
+
+
+def _fold_operations(operations):
+    """
+    Collapses the operations into one final action per product, applied in
+    order: {product_id: ("add", qty) | ("set", qty) | ("remove", None)}.
+    Raises Exception with a client-facing message on invalid input.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise Exception("operations are required")
+    if len(operations) > CART_SYNC_MAX_OPERATIONS:
+        raise Exception(f"At most {CART_SYNC_MAX_OPERATIONS} operations can be synced at once")
+
+    actions = {}
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get("op") not in CART_SYNC_OPS:
+            raise Exception("op must be one of add, update, remove")
+        try:
+            product_id = uuid.UUID(str(operation.get("product_id")))
+            qty = int(operation.get("quantity", 1)) if operation["op"] != "remove" else None
+        except (TypeError, ValueError):
+            raise Exception("Invalid product or quantity")
+        if qty is not None and qty <= 0:
+            raise Exception("Invalid product or quantity")
+
+        previous = actions.get(product_id)
+        if operation["op"] == "remove":
+            actions[product_id] = ("remove", None)
+        elif operation["op"] == "update":
+            actions[product_id] = ("set", qty)
+        elif previous is None:
+            actions[product_id] = ("add", qty)
+        elif previous[0] == "remove":
+            actions[product_id] = ("set", qty)
+        else:
+            actions[product_id] = (previous[0], previous[1] + qty)
+    return actions
+
+
+def sync_cart(store, user, operations):
+    """
+    Applies a client's cart operations in one transaction:
+        [{"op": "add" | "update" | "remove", "product_id": ..., "quantity": int}]
+    "add" adds to the quantity in the cart, "update" sets it. One query
+    validates the products, one locks the user's existing rows, then a
+    single upsert and a single delete. Products that are unknown, inactive
+    or from another store are skipped; returns their ids.
+    """
+    actions = _fold_operations(operations)
+
+    with transaction.atomic():
+        upserts = {pid: action for pid, action in actions.items() if action[0] != "remove"}
+        valid = set(
+            Product.objects.filter(
+                id__in=list(upserts),
+                store=store,
+                is_active=True
+            ).values_list("id", flat=True)
+        ) if upserts else set()
+        skipped = [pid for pid in upserts if pid not in valid]
+
+        # quantities that "add" builds on, locked against a concurrent add
+        existing = dict(
+            Cart.objects.select_for_update().filter(
+                store=store,
+                user=user,
+                product_id__in=list(actions)
+            ).order_by("id").values_list("product_id", "quantity")
+        )
+
+        rows = [
+            Cart(
+                store=store,
+                user=user,
+                product_id=pid,
+                quantity=qty + existing.get(pid, 0) if action == "add" else qty,
+                is_active=True,
+                created_by=str(user.id),
+                updated_by=str(user.id),
+            )
+            for pid, (action, qty) in upserts.items() if pid in valid
+        ]
+        if rows:
+            Cart.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["store", "user", "product"],
+                update_fields=["quantity", "is_active", "updated_at", "updated_by"],
+            )
+
+        removals = [pid for pid, (action, _) in actions.items() if action == "remove"]
+        deleted = 0
+        if removals:
+            deleted, _ = Cart.objects.filter(store=store, user=user, product_id__in=removals).delete()
+
+        added = sum(1 for row in rows if row.product_id not in existing)
+        adjust_badges(store, user, cart_items=added - deleted)
+
+    return skipped
@@ -0,0 +1,147 @@
+"""
+Local stand-in for the Cashfree orders API (create + fetch order), for load
+tests and offline runs. Point the backend at it with
+
+    python manage.py run_cashfree_stub --port 8700 --latency-ms 300
+    CASHFREE_BASE_URL_OVERRIDE=http://127.0.0.1:8700/pg/orders
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ORDERS_PATH = "/pg/orders"
+
+
+class CashfreeStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, failure_rate=0.0,
+                 order_status="ACTIVE", verbose=False):
+        super().__init__(address, CashfreeStubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.order_status = order_status
+        self.verbose = verbose
+        self.orders = {}
+        self.lock = threading.Lock()
+        # counters and scripted failures, for tests
+        self.connections = 0
+        self.requests = 0
+        self.fail_next = 0
+        self.reject_next = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{ORDERS_PATH}"
+
+    def simulate_latency(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+    def handle_error(self, request, client_address):
+        # clients that timed out and hung up are expected under load tests
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return True
+        return random.random() < self.failure_rate
+
+    def should_reject(self):
+        with self.lock:
+            if self.reject_next > 0:
+                self.reject_next -= 1
+                return True
+        return False
+
+
+class CashfreeStubHandler(BaseHTTPRequestHandler):
+    # keep-alive, like the real gateway
+    protocol_version = "HTTP/1.1"
+    server: CashfreeStubServer
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        # read the body first so the kept-alive connection stays in sync
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.rstrip("/") != ORDERS_PATH:
+            return self._send(404, {"message": "not found"})
+
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(400, {"message": "invalid json", "code": "request_invalid"})
+
+        self.server.simulate_latency()
+        if self.server.should_fail():
+            return self._send(500, {"message": "stub failure", "code": "internal_error"})
+        if self.server.should_reject():
+            return self._send(400, {"message": "customer_phone is invalid", "code": "request_invalid"})
+
+        order_id = str(body.get("order_id") or uuid.uuid4().hex)
+        with self.server.lock:
+            if order_id in self.server.orders:
+                return self._send(409, {
+                    "message": "order with same id is already present",
+                    "code": "order_already_exists",
+                })
+            order = {
+                "cf_order_id": str(random.randint(10 ** 9, 10 ** 10 - 1)),
+                "order_id": order_id,
+                "order_amount": body.get("order_amount"),
+                "order_currency": body.get("order_currency", "INR"),
+                "order_status": self.server.order_status,
+                "payment_session_id": f"session_{uuid.uuid4().hex}",
+                "customer_details": body.get("customer_details", {}),
+                "order_meta": body.get("order_meta", {}),
+            }
+            self.server.orders[order_id] = order
+        self._send(200, order)
+
+    def do_GET(self):
+        prefix = ORDERS_PATH + "/"
+        if not self.path.startswith(prefix):
+            return self._send(404, {"message": "not found"})
+
+        self.server.simulate_latency()
+        if self.server.should_fail():
+            return self._send(500, {"message": "stub failure", "code": "internal_error"})
+
+        order = self.server.orders.get(self.path[len(prefix):].rstrip("/"))
+        if not order:
+            return self._send(404, {"message": "order not found", "code": "order_not_found"})
+        self._send(200, order)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve_in_thread(host="127.0.0.1", port=0, **options):
+    """Starts a stub on a daemon thread (port 0 picks a free one); call .shutdown() to stop."""
+    server = CashfreeStubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="cashfree-stub", daemon=True).start()
+    return server
@@ -0,0 +1,61 @@
+import uuid
+
+from db.models import Product
+
+
+def load_checkout_lines(store, items, lock=False, with_media=False):
+    """
+    Loads every product of a checkout request in one query.
+
+    items = [{"product_id": ..., "qty": ...}] as posted by the client.
+    Lines for the same product are merged. With lock=True the products are
+    locked with a single SELECT ... FOR UPDATE ORDER BY id, so concurrent
+    checkouts always lock rows in the same order (call inside atomic()).
+
+    Returns lines in request order:
+        [{"product": Product, "qty": int, "line_mrp": Decimal, "line_total": Decimal}]
+    Raises Exception with a client-facing message on invalid input.
+    """
+    quantities = {}
+    for item in items:
+        try:
+            product_id = uuid.UUID(str(item.get("product_id")))
+            qty = int(item.get("qty", 0))
+        except (TypeError, ValueError):
+            raise Exception("Invalid product or quantity")
+
+        if qty <= 0:
+            raise Exception("Invalid product or quantity")
+
+        quantities[product_id] = quantities.get(product_id, 0) + qty
+
+    queryset = Product.objects.filter(
+        id__in=list(quantities),
+        store=store,
+        is_active=True
+    )
+    if with_media:
+        queryset = queryset.prefetch_related("media")
+    if lock:
+        queryset = queryset.select_for_update().order_by("id")
+
+    products = {p.id: p for p in queryset}
+
+    lines = []
+    for product_id, qty in quantities.items():
+        product = products.get(product_id)
+        if not product:
+            raise Exception("Product not found or inactive")
+
+        # stock held by other unpaid orders is not available
+        if product.current_stock - product.reserved_stock < qty:
+            raise Exception(f"{product.name} is out of stock")
+
+        lines.append({
+            "product": product,
+            "qty": qty,
+            "line_mrp": product.mrp * qty,
+            "line_total": product.selling_price * qty,
+        })
+
+    return lines
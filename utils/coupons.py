@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+from django.utils.timezone import now
+
+from db.models import Coupons, CouponProduct, CouponCategory, CouponTag, Product
+from utils.dataset_versions import StoreVersionedCache
+
+COUPON_INDEX_TTL = 300
+COUPON_DATASET = "coupons"
+
+
+class CompiledCoupon:
+    """An active coupon with its targets resolved to frozen id sets."""
+    __slots__ = ("coupon", "product_ids", "category_ids", "tag_ids")
+
+    def __init__(self, coupon, product_ids=(), category_ids=(), tag_ids=()):
+        self.coupon = coupon
+        self.product_ids = frozenset(product_ids)
+        self.category_ids = frozenset(category_ids)
+        self.tag_ids = frozenset(tag_ids)
+
+    def is_live(self, at):
+        return self.coupon.start_date <= at <= self.coupon.end_date
+
+    def eligible_product_ids(self, product_ids):
+        """
+        Subset of the cart's product ids the coupon applies to.
+        CATEGORY / TAG coupons cost one query for the cart's memberships.
+        """
+        product_ids = set(product_ids)
+        target_type = self.coupon.target_type
+
+        if target_type in ("ORDER", "SHIPPING"):
+            return product_ids
+
+        if target_type == "PRODUCT":
+            return product_ids & self.product_ids
+
+        if target_type == "CATEGORY":
+            through, column, targets = Product.categories.through, "category_id", self.category_ids
+        elif target_type == "TAG":
+            through, column, targets = Product.tags.through, "tag_id", self.tag_ids
+        else:
+            return set()
+
+        if not targets:
+            return set()
+
+        memberships = through.objects.filter(
+            product_id__in=product_ids
+        ).values_list("product_id", column)
+
+        return {product_id for product_id, target_id in memberships if target_id in targets}
+
+
+def build_coupon_index(store_id):
+    """Four queries for every active, unexpired coupon of the store."""
+    coupons = {
+        c.id: c for c in Coupons.objects.filter(
+            store_id=store_id,
+            is_active=True,
+            end_date__gte=now()
+        )
+    }
+
+    targets = {
+        "product_ids": defaultdict(list),
+        "category_ids": defaultdict(list),
+        "tag_ids": defaultdict(list),
+    }
+    for model, column, key in (
+        (CouponProduct, "product_id", "product_ids"),
+        (CouponCategory, "category_id", "category_ids"),
+        (CouponTag, "tag_id", "tag_ids"),
+    ):
+        for coupon_id, target_id in model.objects.filter(
+            coupon_id__in=list(coupons)
+        ).values_list("coupon_id", column):
+            targets[key][coupon_id].append(target_id)
+
+    return {
+        c.code.upper(): CompiledCoupon(
+            c,
+            product_ids=targets["product_ids"][c.id],
+            category_ids=targets["category_ids"][c.id],
+            tag_ids=targets["tag_ids"][c.id],
+        )
+        for c in coupons.values()
+    }
+
+
+# store_id -> {CODE: CompiledCoupon}; a coupon edit reaches every worker within
+# the cache's version check interval, and coupon lookups add no queries
+coupon_index_cache = StoreVersionedCache(COUPON_DATASET, build_coupon_index, ttl=COUPON_INDEX_TTL)
+
+
+def get_coupon_index(store_id):
+    return coupon_index_cache.get(store_id)
+
+
+def find_coupon(store_id, code):
+    """CompiledCoupon for a code that is live right now, else None."""
+    compiled = get_coupon_index(store_id).get((code or "").strip().upper())
+    if compiled is None or not compiled.is_live(now()):
+        return None
+    return compiled
+
+
+def invalidate_coupon_index(store_id):
+    """After the current transaction commits: this worker rebuilds on next use, others at their next version check."""
+    coupon_index_cache.invalidate(store_id)
@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+
+from django.db import connection, transaction
+
+from db.models import DatasetVersion
+from utils.cache import TTLCache
+
+logger = logging.getLogger("default")
+
+# how often a worker asks whether another worker edited a store's cached data
+VERSION_CHECK_SECONDS = 10
+
+_BUMP_VERSION_SQL = """
+    INSERT INTO dataset_version (name, version, updated_at) VALUES (%s, 1, now())
+    ON CONFLICT (name) DO UPDATE SET version = dataset_version.version + 1, updated_at = now()
+"""
+
+
+def bump_version(name):
+    """Moves a dataset to a new version; other workers see it when the transaction commits."""
+    with connection.cursor() as cursor:
+        cursor.execute(_BUMP_VERSION_SQL, [name])
+
+
+def current_version(name):
+    return DatasetVersion.objects.filter(name=name).values_list("version", flat=True).first() or 0
+
+
+class StoreVersionedCache:
+    """
+    Per-store data compiled by `build(store_id)` and cached in every worker,
+    tagged with the store's DatasetVersion row ("<dataset>:<store_id>").
+    A warm entry is served without a query; every `check_interval` seconds
+    one request thread compares the version (one primary-key read) and
+    rebuilds when it moved, as PincodeService does. An edit made through
+    invalidate() is seen at once by the worker that made it and within
+    `check_interval` by the others. The TTL only bounds edits made behind
+    the app's back.
+    """
+
+    def __init__(self, dataset, build, ttl=300, maxsize=1024, check_interval=VERSION_CHECK_SECONDS):
+        self.dataset = dataset
+        self.build = build
+        self.check_interval = check_interval
+        # store_id -> [version, data, checked_at]
+        self.cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def version_name(self, store_id):
+        return f"{self.dataset}:{store_id}"
+
+    def _load(self, store_id):
+        # read the version before the data: an edit committed in between only
+        # causes one extra rebuild, never a stale entry under the new version
+        version = current_version(self.version_name(store_id))
+        entry = [version, self.build(store_id), time.monotonic()]
+        self.cache.set(store_id, entry)
+        return entry
+
+    def get(self, store_id):
+        entry = self.cache.get(store_id)
+        if entry is None:
+            return self._load(store_id)[1]
+
+        if time.monotonic() - entry[2] >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                entry[2] = time.monotonic()
+                if current_version(self.version_name(store_id)) != entry[0]:
+                    entry = self._load(store_id)
+            except Exception:
+                logger.exception("%s version check failed; serving the cached data", self.dataset)
+            finally:
+                self._lock.release()
+
+        return entry[1]
+
+    def invalidate(self, store_id):
+        """Call inside the transaction that edits the store's data."""
+        bump_version(self.version_name(store_id))
+        transaction.on_commit(lambda: self.cache.delete(store_id))
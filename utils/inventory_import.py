@@ -0,0 +1,161 @@
+import pandas as pd
+
+from db.models import Product
+from enums.store import InventoryType
+from utils.product_import import read_chunks
+from utils.stock import OUTBOUND_TYPES, apply_stock_movements
+
+BULK_MAX_ROWS = 50000
+
+REQUIRED_COLUMNS = ("sku", "type", "quantity")
+OPTIONAL_COLUMNS = ("purchase_price", "sale_price", "gst_input", "gst_output")
+AMOUNT_COLUMNS = OPTIONAL_COLUMNS
+
+# spreadsheet spellings (lower case, "_" as space) -> InventoryType
+TYPE_ALIASES = {
+    **{t.value.lower().replace("_", " "): t.value for t in InventoryType},
+    "sale": InventoryType.SELL.value,
+    "count": InventoryType.ADJUSTMENT.value,
+}
+PURCHASE_TYPES = (InventoryType.PURCHASE, InventoryType.PurchaseReturn)
+SALE_TYPES = (InventoryType.SELL, InventoryType.SaleReturn)
+
+
+# ---------- Reading ----------
+
+def read_movements(path):
+    """The whole sheet as one DataFrame of stripped strings, blank lines dropped."""
+    df = pd.concat(list(read_chunks(path)))
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    if len(df) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} rows can be uploaded at once")
+
+    for column in OPTIONAL_COLUMNS:
+        if column not in df.columns:
+            df[column] = ""
+    return df[(df != "").any(axis=1)]
+
+
+# ---------- Validation ----------
+
+def validate_movements(df, store):
+    """
+    Column-wise checks over the whole sheet. Returns (errors, parsed) where
+    errors is a list of {"row", "sku", "errors"} and parsed is a typed frame
+    with the store product id of every row.
+    """
+    errors = {}
+
+    def fail(mask, message):
+        for idx in df.index[mask]:
+            errors.setdefault(idx, []).append(message)
+
+    for column in REQUIRED_COLUMNS:
+        fail(df[column] == "", f"{column} is required")
+
+    parsed = pd.DataFrame({"sku": df["sku"]}, index=df.index)
+    parsed["type"] = df["type"].str.lower().str.replace("_", " ").map(TYPE_ALIASES)
+    fail((df["type"] != "") & parsed["type"].isna(), "Invalid inventory type")
+
+    for column in ("quantity",) + AMOUNT_COLUMNS:
+        values = pd.to_numeric(df[column], errors="coerce")
+        fail((df[column] != "") & values.isna(), f"{column} must be a number")
+        fail(values < 0, f"{column} cannot be negative")
+        parsed[column] = values
+
+    counted = parsed["type"] == InventoryType.ADJUSTMENT
+    fail(parsed["quantity"] % 1 > 0, "quantity must be a whole number")
+    # a stock count may be zero, a movement may not
+    fail(~counted & (parsed["quantity"] == 0), "quantity must be greater than zero")
+    fail(
+        parsed["type"].isin(PURCHASE_TYPES) & (df["purchase_price"] == ""),
+        "purchase_price is required for purchase"
+    )
+    fail(
+        parsed["type"].isin(SALE_TYPES) & (df["sale_price"] == ""),
+        "sale_price is required for sale"
+    )
+
+    # a stock count sets the level, so it cannot be combined with movements of the same SKU
+    fail(counted & parsed["sku"].where(counted).duplicated(keep=False), "SKU counted more than once")
+    fail(
+        ~counted & parsed["sku"].isin(set(parsed.loc[counted, "sku"])),
+        "SKU has both a stock count and movements"
+    )
+
+    product_ids = dict(
+        Product.objects.filter(store=store, sku__in=df["sku"].unique().tolist()).values_list("sku", "id")
+    )
+    parsed["product_id"] = parsed["sku"].map(product_ids)
+    fail((df["sku"] != "") & parsed["product_id"].isna(), "SKU not found")
+
+    parsed[list(AMOUNT_COLUMNS)] = parsed[list(AMOUNT_COLUMNS)].fillna(0)
+
+    # idx runs from 0; +2 for the 1-based header line
+    row_errors = [
+        {"row": int(idx) + 2, "sku": df.at[idx, "sku"], "errors": messages}
+        for idx, messages in sorted(errors.items())
+    ]
+    return row_errors, parsed
+
+
+def aggregate_movements(parsed, user, remarks=None):
+    """
+    One ledger movement per (SKU, type): quantities and amounts are summed.
+    Inbound movements come first, so a SKU's returns can draw on its receipts.
+    """
+    grouped = parsed.groupby(["product_id", "type"], sort=False).agg(
+        sku=("sku", "first"),
+        quantity=("quantity", "sum"),
+        **{column: (column, "sum") for column in AMOUNT_COLUMNS}
+    ).reset_index()
+    grouped = grouped.sort_values(
+        "type", key=lambda types: types.isin(OUTBOUND_TYPES), kind="stable"
+    )
+
+    movements = []
+    for row in grouped.itertuples(index=False):
+        quantity = int(row.quantity)
+        movement = {
+            "product_id": row.product_id,
+            "sku": row.sku,
+            "type": row.type,
+            "user": user,
+            "remarks": remarks,
+        }
+        if row.type == InventoryType.ADJUSTMENT:
+            movement["quantity_after"] = quantity
+        else:
+            movement.update({
+                "quantity": quantity,
+                "purchase_price": round(row.purchase_price, 2),
+                "purchase_rate_per_item": round(row.purchase_price / quantity, 2),
+                "sale_price": round(row.sale_price, 2),
+                "sale_rate_per_item": round(row.sale_price / quantity, 2),
+                "gst_input": round(row.gst_input, 2),
+                "gst_output": round(row.gst_output, 2),
+            })
+        movements.append(movement)
+    return movements
+
+
+# ---------- Apply ----------
+
+def apply_inventory_file(path, store, user, remarks=None):
+    """
+    Validates a movements sheet and applies it all-or-nothing through the
+    inventory ledger. Call inside transaction.atomic().
+    Returns (errors, ledger rows); nothing is written when errors is non-empty.
+    """
+    df = read_movements(path)
+    if df.empty:
+        raise ValueError("File has no rows")
+
+    errors, parsed = validate_movements(df, store)
+    if errors:
+        return errors, []
+
+    movements = aggregate_movements(parsed, user, remarks=remarks)
+    return [], apply_stock_movements(movements, store=store)
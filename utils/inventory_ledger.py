@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from db.models import Inventory, Product
+from enums.store import InventoryType
+from utils.streaming import csv_lines, ndjson_lines, xlsx_chunks
+
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FORMATS = ("csv", "xlsx", "ndjson")
+
+LEDGER_COLUMNS = (
+    "id", "created_at", "date", "product_id", "sku", "type", "quantity",
+    "quantity_before", "quantity_after", "purchase_rate_per_item", "purchase_price",
+    "sale_rate_per_item", "sale_price", "gst_input", "gst_output", "user", "remarks",
+    "created_by",
+)
+DECIMAL_COLUMNS = (
+    "purchase_rate_per_item", "purchase_price", "sale_rate_per_item", "sale_price",
+    "gst_input", "gst_output",
+)
+
+
+# ---------- Filters ----------
+
+def _day_start(value, name):
+    day = parse_date(value or "")
+    if day is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def ledger_queryset(store, params):
+    """
+    The store's ledger filtered by product_id, sku, type (comma-separated) and
+    from_date / to_date (inclusive days). Dates become created_at ranges so
+    the (store_id, [product_id,] created_at, id) indexes serve the scan.
+    Raises ValueError for malformed filters.
+    """
+    queryset = Inventory.objects.filter(store_id=store.id)
+
+    product_ids = []
+    if params.get("product_id"):
+        try:
+            product_ids.append(uuid.UUID(params["product_id"]))
+        except ValueError:
+            raise ValueError("Invalid product_id")
+
+    if params.get("sku"):
+        product = Product.objects.filter(store=store, sku=params["sku"]).values_list("id", flat=True).first()
+        if product is None:
+            return queryset.none()
+        product_ids.append(product)
+
+    if len(set(product_ids)) > 1:
+        return queryset.none()
+    if product_ids:
+        queryset = queryset.filter(product_id=product_ids[0])
+
+    if params.get("type"):
+        types = [t.strip() for t in params["type"].split(",") if t.strip()]
+        invalid = [t for t in types if t not in InventoryType.values]
+        if invalid:
+            raise ValueError(f"Invalid type: {', '.join(invalid)}")
+        queryset = queryset.filter(type__in=types)
+
+    if params.get("from_date"):
+        queryset = queryset.filter(created_at__gte=_day_start(params["from_date"], "from_date"))
+    if params.get("to_date"):
+        queryset = queryset.filter(
+            created_at__lt=_day_start(params["to_date"], "to_date") + timedelta(days=1)
+        )
+
+    return queryset
+
+
+# ---------- Export ----------
+
+def _tabular(queryset, for_xlsx=False):
+    for row in queryset.values_list(*LEDGER_COLUMNS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = list(row)
+        for i, column in enumerate(LEDGER_COLUMNS):
+            value = row[i]
+            if column in ("created_at", "date"):
+                row[i] = value.replace(tzinfo=None) if for_xlsx else value.isoformat()
+            elif column in ("id", "product_id", "user"):
+                row[i] = str(value)
+            elif for_xlsx and column in DECIMAL_COLUMNS:
+                row[i] = float(value)
+        yield row
+
+
+def export_chunks(queryset, file_format):
+    """
+    Chunks of the filtered ledger, oldest first, read through a server-side
+    cursor so a year of movements streams in flat memory.
+    """
+    queryset = queryset.order_by("created_at", "id")
+
+    if file_format == "ndjson":
+        return ndjson_lines(
+            dict(zip(LEDGER_COLUMNS, row)) for row in _tabular(queryset)
+        )
+    if file_format == "xlsx":
+        return xlsx_chunks(LEDGER_COLUMNS, _tabular(queryset, for_xlsx=True), sheet_title="Inventory")
+    return csv_lines(LEDGER_COLUMNS, _tabular(queryset))
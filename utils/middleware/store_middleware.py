@@ -4,6 +4,49 @@ from urllib.parse import urlparse
 from django.http import JsonResponse
 from django.apps import apps
 
+from utils.cache import TTLCache
+
+STORE_CLIENT_CACHE_TTL = 60
+UNKNOWN_CLIENT_CACHE_TTL = 10
+
+# identifier -> (Store, StoreClient), or None for identifiers that matched nothing
+store_client_cache = TTLCache(ttl=STORE_CLIENT_CACHE_TTL, maxsize=4096)
+
+
+def invalidate_store(store_id):
+    """Drop cached clients of a store after it is updated or deleted."""
+    store_client_cache.delete_where(
+        lambda entry: entry is not None and str(entry[0].id) == str(store_id)
+    )
+
+
+def invalidate_identifiers(identifiers):
+    """Forget (possibly negative) entries, e.g. for clients that were just created."""
+    for identifier in identifiers:
+        store_client_cache.delete(identifier)
+
+
+def resolve_store_client(identifier):
+    """Returns (Store, StoreClient) for an active client identifier, or None."""
+    entry = store_client_cache.get(identifier, False)
+    if entry is not False:
+        return entry
+
+    StoreClient = apps.get_model("db", "StoreClient")
+    try:
+        store_client = StoreClient.objects.select_related("store").get(
+            identifier=identifier,
+            is_active=True
+        )
+    except StoreClient.DoesNotExist:
+        store_client_cache.set(identifier, None, ttl=UNKNOWN_CLIENT_CACHE_TTL)
+        return None
+
+    entry = (store_client.store, store_client)
+    store_client_cache.set(identifier, entry)
+    return entry
+
+
 class StoreMiddleware:
     def __init__(self, get_response):
         """
@@ -27,7 +70,6 @@ class StoreMiddleware:
 
 
     def __call__(self, request):
-        print("MIDDLEWARE PATH:", request.path)
         if any(request.path.startswith(p) for p in self.exempt_paths):
             return self.get_response(request)
         request.store = None
@@ -56,16 +98,8 @@ class StoreMiddleware:
             # 🚫 No identifier → public / health APIs
         if not identifier:
             return None
-        StoreClient = apps.get_model("db", "StoreClient")
-        try:
-            store_client = StoreClient.objects.select_related("store").get(
-                identifier=identifier,
-                is_active=True
-            )
-            request.store = store_client.store
-            request.store_client = store_client
-            request.client_type = client_type
-        except StoreClient.DoesNotExist:
+        entry = resolve_store_client(identifier)
+        if entry is None:
             return JsonResponse(
                 {
                     "success": False,
@@ -73,4 +107,7 @@ class StoreMiddleware:
                 },
                 status=401
             )
+
+        request.store, request.store_client = entry
+        request.client_type = client_type
         return self.get_response(request)
@@ -0,0 +1,109 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from db.models import OrderDailyRollup
+
+ROLLUP_AMOUNT_FIELDS = ("amount", "paid_online", "cash_on_delivery", "wallet_paid")
+
+_UPSERT_SQL = """
+    INSERT INTO order_daily_rollup
+        (store_id, day, status, order_count, amount, paid_online, cash_on_delivery, wallet_paid)
+    VALUES {values}
+    ON CONFLICT (store_id, day, status) DO UPDATE SET
+        order_count = order_daily_rollup.order_count + EXCLUDED.order_count,
+        amount = order_daily_rollup.amount + EXCLUDED.amount,
+        paid_online = order_daily_rollup.paid_online + EXCLUDED.paid_online,
+        cash_on_delivery = order_daily_rollup.cash_on_delivery + EXCLUDED.cash_on_delivery,
+        wallet_paid = order_daily_rollup.wallet_paid + EXCLUDED.wallet_paid
+"""
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def order_snapshot(order):
+    """The part of an order the rollup depends on; take it before mutating the order."""
+    return (
+        order.store_id,
+        timezone.localdate(order.created_at),
+        order.status,
+        *(_money(getattr(order, field)) for field in ROLLUP_AMOUNT_FIELDS),
+    )
+
+
+def rollup_orders(created=(), changed=()):
+    """
+    Apply order writes to order_daily_rollup with one upsert.
+    `created` are new orders; `changed` are (snapshot_before, order_after)
+    pairs. Must run inside the transaction that writes the orders.
+    """
+    deltas = defaultdict(lambda: [0] + [Decimal("0.00")] * len(ROLLUP_AMOUNT_FIELDS))
+
+    def add(snapshot, sign):
+        store_id, day, status, *amounts = snapshot
+        delta = deltas[(str(store_id), day, status)]
+        delta[0] += sign
+        for i, amount in enumerate(amounts, start=1):
+            delta[i] += sign * amount
+
+    for order in created:
+        add(order_snapshot(order), 1)
+
+    for before, order in changed:
+        after = order_snapshot(order)
+        if after != before:
+            add(before, -1)
+            add(after, 1)
+
+    # sorted keys: concurrent writers lock rollup rows in the same order
+    rows = [
+        (*key, *delta)
+        for key, delta in sorted(deltas.items())
+        if any(delta)
+    ]
+    if not rows:
+        return
+
+    placeholders = ", ".join(["(%s::uuid, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _UPSERT_SQL.format(values=placeholders),
+            [value for row in rows for value in row]
+        )
+
+
+def rollup_stats(store, from_date=None, to_date=None):
+    """Status counts and amount totals for a date range, read from the rollup."""
+    queryset = OrderDailyRollup.objects.filter(store=store)
+    if from_date:
+        queryset = queryset.filter(day__gte=from_date)
+    if to_date:
+        queryset = queryset.filter(day__lte=to_date)
+
+    by_status = queryset.values("status").annotate(
+        count=Sum("order_count"),
+        **{f"total_{field}": Sum(field) for field in ROLLUP_AMOUNT_FIELDS}
+    )
+
+    status_counts = {}
+    revenue = {field: Decimal("0.00") for field in ROLLUP_AMOUNT_FIELDS}
+    for row in by_status:
+        if row["count"]:
+            status_counts[row["status"]] = row["count"]
+        for field in ROLLUP_AMOUNT_FIELDS:
+            revenue[field] += row[f"total_{field}"]
+
+    return {
+        "status_counts": status_counts,
+        "revenue": {
+            "total_amount": revenue["amount"],
+            "paid_online": revenue["paid_online"],
+            "cash_on_delivery": revenue["cash_on_delivery"],
+            "wallet_paid": revenue["wallet_paid"],
+        }
+    }
@@ -0,0 +1,257 @@
+import hashlib
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from opentelemetry import metrics
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 3
+CREATE_ORDER_READ_TIMEOUT = 10
+GET_ORDER_READ_TIMEOUT = 5
+
+POOL_MAXSIZE = 10
+MAX_RETRIES = 2
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_CAP_SECONDS = 2.0
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_meter = metrics.get_meter("thesru.payment_gateway")
+
+
+class GatewayError(Exception):
+    def __init__(self, message, status_code=None, retryable=False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class CircuitOpenError(GatewayError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    CLOSED until `failure_threshold` consecutive failures, then OPEN (calls fail
+    fast) for `reset_timeout` seconds, then HALF_OPEN: one probe call decides
+    whether it closes again or re-opens.
+    """
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_SECONDS, clock=time.monotonic, on_open=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.on_open = on_open
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            # HALF_OPEN: a single probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                opened = self._state != self.OPEN
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._probing = False
+            else:
+                opened = False
+        if opened and self.on_open:
+            self.on_open()
+
+
+class PaymentGatewayClient:
+    """
+    Cashfree orders API client for one set of credentials: a keep-alive
+    connection pool, bounded retries with full jitter, per-call timeouts
+    and a circuit breaker. Thread-safe; share one per client_id.
+    """
+
+    def __init__(self, client_id, client_secret, orders_url, api_version=None,
+                 pool_maxsize=POOL_MAXSIZE, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_cap=BACKOFF_CAP_SECONDS,
+                 connect_timeout=CONNECT_TIMEOUT, breaker=None, meter=None, sleep=time.sleep):
+        self.client_id = client_id
+        self.orders_url = orders_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.connect_timeout = connect_timeout
+        self.sleep = sleep
+
+        meter = meter or _meter
+        self._duration = meter.create_histogram(
+            "payment_gateway.request.duration", unit="s",
+            description="Cashfree request latency per attempt"
+        )
+        self._errors = meter.create_counter(
+            "payment_gateway.request.errors",
+            description="Failed Cashfree request attempts"
+        )
+        self._circuit_opened = meter.create_counter(
+            "payment_gateway.circuit.opened",
+            description="Times the Cashfree circuit breaker opened"
+        )
+        self.breaker = breaker or CircuitBreaker()
+        if self.breaker.on_open is None:
+            self.breaker.on_open = lambda: self._circuit_opened.add(1)
+
+        # retries are done here (with jitter and the breaker), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "x-api-version": api_version or settings.CASHFREE_API_VERSION,
+            "x-client-id": client_id,
+            "x-client-secret": client_secret,
+            "Content-Type": "application/json",
+        })
+
+    # ---------- API ----------
+
+    def create_order(self, payload, read_timeout=CREATE_ORDER_READ_TIMEOUT):
+        """
+        Creates the gateway order. Safe to retry: Cashfree rejects a second
+        create for the same order_id with 409, answered here by fetching it.
+        """
+        try:
+            data = self._request(
+                "create_order", "POST", self.orders_url, json=payload, read_timeout=read_timeout
+            )
+        except GatewayError as e:
+            if e.status_code != 409:
+                raise
+            data = self.get_order(payload["order_id"])
+
+        if not data.get("cf_order_id") or not data.get("payment_session_id"):
+            raise GatewayError("Could not found cf_order_id and payment_session_id")
+        return data
+
+    def get_order(self, order_id, read_timeout=GET_ORDER_READ_TIMEOUT):
+        return self._request(
+            "get_order", "GET", f"{self.orders_url}/{order_id}", read_timeout=read_timeout
+        )
+
+    def close(self):
+        self.session.close()
+
+    # ---------- Transport ----------
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _request(self, operation, method, url, read_timeout, **kwargs):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._errors.add(1, {"operation": operation, "error": "circuit_open"})
+                raise CircuitOpenError("Payment gateway unavailable, try again shortly")
+
+            try:
+                return self._attempt(operation, method, url, read_timeout, **kwargs)
+            except GatewayError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+            attempt += 1
+            self.sleep(self._backoff(attempt))
+
+    def _attempt(self, operation, method, url, read_timeout, **kwargs):
+        started = time.perf_counter()
+        attributes = {"operation": operation}
+        try:
+            response = self.session.request(
+                method, url, timeout=(self.connect_timeout, read_timeout), **kwargs
+            )
+        except requests.RequestException as e:
+            error = "timeout" if isinstance(e, requests.Timeout) else "connection"
+            self._duration.record(time.perf_counter() - started, {**attributes, "outcome": error})
+            self._errors.add(1, {**attributes, "error": error})
+            self.breaker.record_failure()
+            raise GatewayError(f"Cashfree {error} error: {e}", retryable=True) from e
+
+        status = response.status_code
+        self._duration.record(
+            time.perf_counter() - started, {**attributes, "outcome": str(status)}
+        )
+        if status == 200:
+            self.breaker.record_success()
+            return response.json()
+
+        retryable = status in RETRYABLE_STATUS_CODES
+        self._errors.add(1, {**attributes, "error": str(status)})
+        # 4xx are our request's fault, not a sign the gateway is down
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        raise GatewayError(
+            f"Cashfree response code {status}: {response.text[:500]}",
+            status_code=status,
+            retryable=retryable
+        )
+
+
+# ---------- Per-store clients ----------
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def gateway_orders_url(store):
+    return (settings.CASHFREE_BASE_URL_OVERRIDE or store.url).rstrip("/")
+
+
+def gateway_client(store):
+    """The process-wide client for the store's Cashfree credentials."""
+    url = gateway_orders_url(store)
+    fingerprint = hashlib.sha256(f"{store.client_secret}|{url}".encode()).hexdigest()
+
+    entry = _clients.get(store.client_id)
+    if entry is None or entry[0] != fingerprint:
+        with _clients_lock:
+            entry = _clients.get(store.client_id)
+            if entry is None or entry[0] != fingerprint:
+                entry = (fingerprint, PaymentGatewayClient(store.client_id, store.client_secret, url))
+                _clients[store.client_id] = entry
+    return entry[1]
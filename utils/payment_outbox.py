@@ -0,0 +1,199 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from db.models import Order, Payment, PaymentGatewayCall
+from enums.store import GatewayCallStatus, OrderStatus, PaymentStatus
+from utils.order_stats import order_snapshot, rollup_orders
+from utils.payment_gateway import gateway_client
+from utils.stock import release_reservations
+
+logger = logging.getLogger("default")
+
+CREATE_ORDER = "CREATE_ORDER"
+
+RETRY_BASE_SECONDS = 10
+DUE_BATCH_SIZE = 100
+# a dispatcher that died mid-call leaves IN_PROGRESS behind; take it over after this
+STALE_IN_PROGRESS = timedelta(minutes=2)
+
+_lock = threading.Lock()
+_executor = None
+
+
+# ---------- HTTP ----------
+
+def _send_create_order(call):
+    return gateway_client(call.store).create_order(call.request)
+
+
+# ---------- Outbox ----------
+
+def enqueue_create_order(order, payment, user):
+    """Outbox row for the gateway order; call inside the transaction creating the order."""
+    return PaymentGatewayCall.objects.create(
+        store_id=order.store_id,
+        order=order,
+        payment=payment,
+        operation=CREATE_ORDER,
+        request={
+            "order_currency": "INR",
+            "order_amount": float(payment.amount),
+            "order_id": str(order.order_number),
+            "customer_details": {
+                "customer_id": str(user.id),
+                "customer_phone": str(user.mobile),
+                "customer_name": str(user.username),
+            },
+            "order_meta": {
+                "notify_url": order.store.webhook,
+            },
+        },
+        next_attempt_at=timezone.now()
+    )
+
+
+def _due():
+    now = timezone.now()
+    return Q(status=GatewayCallStatus.PENDING, next_attempt_at__lte=now) | Q(
+        status=GatewayCallStatus.IN_PROGRESS, updated_at__lt=now - STALE_IN_PROGRESS
+    )
+
+
+def _claim(call_id):
+    """One conditional UPDATE, so a call is only ever sent by one dispatcher at a time."""
+    return PaymentGatewayCall.objects.filter(_due(), id=call_id).update(
+        status=GatewayCallStatus.IN_PROGRESS,
+        attempts=F("attempts") + 1,
+        updated_at=timezone.now()
+    ) == 1
+
+
+def fail_order_initiation(order_id, payment_id, updated_by="PAYMENT_GATEWAY"):
+    """The order can never be paid: fail it and its payment and give its stock back."""
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(id=order_id)
+        if order.status != OrderStatus.INITIATED:
+            return
+        before = order_snapshot(order)
+        release_reservations(order)
+        Payment.objects.filter(id=payment_id).update(status=PaymentStatus.FAILED)
+        order.status = OrderStatus.FAILED
+        order.updated_by = updated_by
+        order.save(update_fields=["status", "updated_by"])
+        rollup_orders(changed=[(before, order)])
+
+
+def _record_success(call, data):
+    with transaction.atomic():
+        Payment.objects.filter(id=call.payment_id).update(
+            session_id=data["payment_session_id"],
+            cf_order_id=data["cf_order_id"]
+        )
+        call.status = GatewayCallStatus.SUCCEEDED
+        call.response = {
+            "cf_order_id": data["cf_order_id"],
+            "payment_session_id": data["payment_session_id"],
+            "order_status": data.get("order_status"),
+        }
+        call.last_error = ""
+        call.save(update_fields=["status", "response", "last_error", "updated_at"])
+
+
+def _record_failure(call, error):
+    logger.warning(
+        "Gateway call %s for order %s failed (attempt %s): %s",
+        call.operation, call.request.get("order_id"), call.attempts, error
+    )
+    call.last_error = str(error)[:1000]
+
+    # a rejected request (4xx) fails the same way on every retry
+    if not getattr(error, "retryable", True) or call.attempts >= settings.PAYMENT_GATEWAY_MAX_ATTEMPTS:
+        call.status = GatewayCallStatus.FAILED
+        call.save(update_fields=["status", "last_error", "updated_at"])
+        fail_order_initiation(call.order_id, call.payment_id)
+        return
+
+    call.status = GatewayCallStatus.PENDING
+    call.next_attempt_at = timezone.now() + timedelta(
+        seconds=RETRY_BASE_SECONDS * 2 ** (call.attempts - 1)
+    )
+    call.save(update_fields=["status", "next_attempt_at", "last_error", "updated_at"])
+
+
+def dispatch_gateway_call(call_id):
+    """
+    Sends one outbox call if it is due and nobody else holds it.
+    Returns the call as it stands afterwards.
+    """
+    close_old_connections()
+    try:
+        if _claim(call_id):
+            call = PaymentGatewayCall.objects.select_related("store").get(id=call_id)
+            try:
+                data = _send_create_order(call)
+            except Exception as e:
+                _record_failure(call, e)
+            else:
+                _record_success(call, data)
+        return PaymentGatewayCall.objects.select_related("payment").get(id=call_id)
+    finally:
+        close_old_connections()
+
+
+def _dispatcher():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PAYMENT_DISPATCH_WORKERS,
+                    thread_name_prefix="payment-dispatch"
+                )
+    return _executor
+
+
+def submit_gateway_call(call_id):
+    """Dispatch on the worker's pool; the caller must have committed the outbox row."""
+    return _dispatcher().submit(dispatch_gateway_call, call_id)
+
+
+def dispatch_and_wait(call_id, timeout=None):
+    """
+    Dispatches the call and waits briefly for it. Returns the call, or None
+    when the gateway is slower than the wait (the client then polls).
+    """
+    future = submit_gateway_call(call_id)
+    try:
+        return future.result(
+            timeout=settings.PAYMENT_DISPATCH_WAIT_SECONDS if timeout is None else timeout
+        )
+    except FutureTimeout:
+        return None
+
+
+def dispatch_due_calls(batch_size=DUE_BATCH_SIZE):
+    """Retry pass for the cron: due PENDING calls and stale IN_PROGRESS ones."""
+    call_ids = list(
+        PaymentGatewayCall.objects.filter(_due()).order_by(
+            "next_attempt_at"
+        ).values_list("id", flat=True)[:batch_size]
+    )
+    return list(_dispatcher().map(dispatch_gateway_call, call_ids))
+
+
+def payment_session_data(call):
+    payment = call.payment
+    return {
+        "order_number": call.request.get("order_id"),
+        "status": call.status,
+        "payment_session_id": payment.session_id or None,
+        "cf_order_id": payment.cf_order_id or None,
+        "amount": str(payment.amount),
+    }
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+from decimal import Decimal
+
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from db.models import Cart, CouponUsage, Order, Payment, PaymentEvent
+from enums.store import OrderStatus, PaymentEventStatus, PaymentStatus
+from utils.badges import clear_cart_badges
+from utils.order_stats import order_snapshot, rollup_orders
+from utils.stock import convert_reservations, release_reservations
+
+logger = logging.getLogger("default")
+
+CASHFREE = "CASHFREE"
+EVENT_BATCH_SIZE = 100
+EVENT_MAX_ATTEMPTS = 5
+
+CASHFREE_ORDER_STATUS = {
+    "PAID": PaymentStatus.COMPLETED,
+    "ACTIVE": PaymentStatus.PENDING,
+    "FAILED": PaymentStatus.FAILED,
+    "CANCELLED": PaymentStatus.CANCELLED,
+    "EXPIRED": PaymentStatus.CANCELLED,
+    "TERMINATED": PaymentStatus.CANCELLED,
+}
+
+WEBHOOK_PAYMENT_STATUS = {
+    "PAYMENT_SUCCESS_WEBHOOK": PaymentStatus.COMPLETED,
+    "PAYMENT_FAILED_WEBHOOK": PaymentStatus.FAILED,
+    "PAYMENT_USER_DROPPED_WEBHOOK": PaymentStatus.CANCELLED,
+}
+
+
+# ---------- State transitions ----------
+
+def map_cashfree_status(cf_status):
+    return CASHFREE_ORDER_STATUS.get(cf_status, PaymentStatus.PENDING)
+
+
+def apply_payment_statuses(updates, updated_by=None):
+    """
+    Moves orders and their payments to gateway-reported payment statuses in
+    one transaction with bulk writes. updates = {order_id: (status, amount)};
+    amount (paid online) defaults to the payment amount.
+
+    Orders are locked in id order. A completed payment is final and a
+    failure only applies to an order still waiting for payment, so replays
+    and out-of-order deliveries are no-ops.
+    Returns {order_id: (order, payment, changed)}.
+    """
+    results = {}
+    with transaction.atomic():
+        orders = {
+            o.id: o for o in Order.objects.select_for_update().filter(
+                id__in=list(updates)
+            ).order_by("id")
+        }
+        payments = {}
+        for payment in Payment.objects.select_for_update().filter(
+            order_id__in=list(orders)
+        ).order_by("order_id", "-created_at"):
+            payments.setdefault(payment.order_id, payment)
+
+        changed_payments, changed_orders, snapshots = [], [], []
+        paid, closed = [], []
+
+        for order_id, (status, amount) in updates.items():
+            order = orders.get(order_id)
+            if order is None:
+                continue
+            payment = payments.get(order_id)
+            results[order_id] = (order, payment, False)
+
+            if payment is None or payment.status == PaymentStatus.COMPLETED:
+                continue
+
+            before = order_snapshot(order)
+
+            if status == PaymentStatus.COMPLETED:
+                order.status = OrderStatus.PLACED
+                order.paid_online = payment.amount if amount is None else Decimal(str(amount))
+                paid.append(order)
+            elif status in (PaymentStatus.FAILED, PaymentStatus.CANCELLED):
+                if order.status != OrderStatus.INITIATED:
+                    continue
+                order.status = OrderStatus.FAILED if status == PaymentStatus.FAILED else OrderStatus.CANCELLED
+                closed.append(order)
+            elif payment.status == status:
+                continue
+
+            payment.status = status
+            payment.updated_by = updated_by
+            changed_payments.append(payment)
+            if order.status != before[2] or status == PaymentStatus.COMPLETED:
+                order.updated_by = updated_by
+                changed_orders.append(order)
+                snapshots.append((before, order))
+            results[order_id] = (order, payment, True)
+
+        if changed_payments:
+            Payment.objects.bulk_update(changed_payments, ["status", "updated_by"])
+        if changed_orders:
+            Order.objects.bulk_update(changed_orders, ["status", "paid_online", "updated_by"])
+
+        if paid:
+            convert_reservations(*paid)
+            CouponUsage.objects.bulk_create([
+                CouponUsage(coupon_id=o.coupon_id, user_id=o.user_id, order=o)
+                for o in paid if o.coupon_id
+            ], ignore_conflicts=True)
+            carts = Q()
+            for o in paid:
+                carts |= Q(user_id=o.user_id, store_id=o.store_id)
+            Cart.objects.filter(carts).delete()
+            clear_cart_badges({o.user_id for o in paid})
+        if closed:
+            release_reservations(*closed)
+
+        rollup_orders(changed=snapshots)
+
+    return results
+
+
+def apply_payment_status(order, status, amount=None, updated_by=None):
+    """apply_payment_statuses for one order; returns (order, payment, changed)."""
+    return apply_payment_statuses({order.id: (status, amount)}, updated_by=updated_by)[order.id]
+
+
+# ---------- Webhook queue ----------
+
+def record_payment_event(gateway, body, headers):
+    """
+    Appends a webhook to payment_event with one INSERT ... ON CONFLICT DO
+    NOTHING; redeliveries of the same event are dropped by the unique key.
+    """
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        logger.warning("Discarding %s webhook with a non-JSON body", gateway)
+        return
+    if not isinstance(payload, dict):
+        payload = {}
+
+    order = (payload.get("data") or {}).get("order") or {}
+    PaymentEvent.objects.bulk_create([
+        PaymentEvent(
+            gateway=gateway,
+            event_id=headers.get("x-idempotency-key") or hashlib.sha256(body).hexdigest(),
+            event_type=str(payload.get("type") or "")[:50],
+            order_number=str(order.get("order_id") or "")[:50],
+            payload=payload
+        )
+    ], ignore_conflicts=True)
+
+
+def _apply_event(event):
+    status = WEBHOOK_PAYMENT_STATUS.get(event.event_type)
+    if status is None or not event.order_number:
+        return PaymentEventStatus.IGNORED
+
+    order = Order.objects.filter(order_number=event.order_number).first()
+    if not order:
+        return PaymentEventStatus.IGNORED
+
+    amount = None
+    if status == PaymentStatus.COMPLETED:
+        amount = ((event.payload.get("data") or {}).get("order") or {}).get("order_amount")
+
+    _, _, changed = apply_payment_status(order, status, amount=amount, updated_by=event.event_type)
+    return PaymentEventStatus.PROCESSED if changed else PaymentEventStatus.IGNORED
+
+
+def _process_event(event_id):
+    """One event, one transaction: its effect and its status commit together."""
+    with transaction.atomic():
+        event = PaymentEvent.objects.select_for_update(skip_locked=True).filter(
+            id=event_id,
+            status=PaymentEventStatus.PENDING
+        ).first()
+        if event is None:
+            return False
+
+        try:
+            with transaction.atomic():
+                event.status = _apply_event(event)
+            event.processed_at = timezone.now()
+        except Exception as e:
+            logger.exception("Payment event %s failed", event.id)
+            event.attempts += 1
+            event.last_error = str(e)[:1000]
+            if event.attempts >= EVENT_MAX_ATTEMPTS:
+                event.status = PaymentEventStatus.FAILED
+
+        event.save(update_fields=["status", "attempts", "last_error", "processed_at"])
+        return True
+
+
+def process_payment_events(batch_size=EVENT_BATCH_SIZE, shard=0, shards=1):
+    """
+    Drains pending events oldest first, one pass. Workers can run side by
+    side (SKIP LOCKED); `shards` splits the queue between threads of one
+    worker so they do not contend for the same rows.
+    Returns the number of events handled.
+    """
+    handled = 0
+    last_id = 0
+    while True:
+        queryset = PaymentEvent.objects.filter(
+            status=PaymentEventStatus.PENDING,
+            id__gt=last_id
+        )
+        if shards > 1:
+            queryset = queryset.alias(shard=F("id") % shards).filter(shard=shard)
+        event_ids = list(queryset.order_by("id").values_list("id", flat=True)[:batch_size])
+
+        for event_id in event_ids:
+            handled += _process_event(event_id)
+
+        if len(event_ids) < batch_size:
+            return handled
+        last_id = event_ids[-1]
+
+
+def run_payment_event_worker(shard=0, shards=1, batch_size=EVENT_BATCH_SIZE):
+    """One pass for a worker thread, with its own database connection."""
+    close_old_connections()
+    try:
+        return process_payment_events(batch_size=batch_size, shard=shard, shards=shards)
+    finally:
+        close_old_connections()
@@ -0,0 +1,195 @@
+"""
+In-memory pincode directory, loaded once per worker (see config/wsgi.py) and
+queried without touching the database.
+
+Rows live in parallel NumPy arrays sorted by (pin, area, city): a uint32 pin
+column plus uint32 codes into one list of interned strings, ~20 bytes a row.
+A pin's post offices are the slice found by binary search on the pin column.
+"""
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+from django.db import connections, transaction
+
+from db.models import PinCode
+from utils.dataset_versions import current_version
+from utils.pincodes import PINCODE_DATASET, bump_pincode_version
+
+logger = logging.getLogger("default")
+
+# how often a worker asks whether the import command bumped the dataset
+VERSION_CHECK_SECONDS = 60
+LOAD_CHUNK_SIZE = 10000
+
+
+class PincodeIndex:
+    __slots__ = ("version", "pins", "areas", "cities", "states", "countries", "strings")
+
+    def __init__(self, version, pins, areas, cities, states, countries, strings):
+        self.version = version
+        self.pins = pins
+        self.areas = areas
+        self.cities = cities
+        self.states = states
+        self.countries = countries
+        self.strings = strings
+
+    @classmethod
+    def build(cls, rows, version=0):
+        """rows: (pin, area, city, state, country) tuples, already in (pin, area, city) order."""
+        codes = {}
+        strings = []
+
+        def intern(value):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(strings)
+                strings.append(sys.intern(value))
+            return code
+
+        pins, areas, cities, states, countries = [], [], [], [], []
+        for pin, area, city, state, country in rows:
+            pins.append(pin)
+            areas.append(intern(area))
+            cities.append(intern(city))
+            states.append(intern(state))
+            countries.append(intern(country))
+
+        return cls(
+            version,
+            np.array(pins, dtype=np.uint32),
+            np.array(areas, dtype=np.uint32),
+            np.array(cities, dtype=np.uint32),
+            np.array(states, dtype=np.uint32),
+            np.array(countries, dtype=np.uint32),
+            strings,
+        )
+
+    def __len__(self):
+        return len(self.pins)
+
+    def _span(self, pin):
+        try:
+            pin = int(pin)
+        except (TypeError, ValueError):
+            return pin, 0, 0
+        if not 0 < pin < 2 ** 32:
+            return pin, 0, 0
+        # same dtype as the column, or searchsorted casts the whole array first
+        needle = np.uint32(pin)
+        return (
+            pin,
+            int(self.pins.searchsorted(needle, side="left")),
+            int(self.pins.searchsorted(needle, side="right")),
+        )
+
+    def contains(self, pin):
+        _, start, end = self._span(pin)
+        return end > start
+
+    def lookup(self, pin):
+        """Every post office of a pin, ordered by area and city; [] when unknown."""
+        pin, start, end = self._span(pin)
+        strings = self.strings
+        return [
+            {
+                "pin": pin,
+                "area": strings[area],
+                "city": strings[city],
+                "state": strings[state],
+                "country": strings[country],
+            }
+            for area, city, state, country in zip(
+                self.areas[start:end].tolist(),
+                self.cities[start:end].tolist(),
+                self.states[start:end].tolist(),
+                self.countries[start:end].tolist(),
+            )
+        ]
+
+
+def _current_version():
+    return current_version(PINCODE_DATASET)
+
+
+def load_index():
+    version = _current_version()
+    rows = PinCode.objects.order_by("pin", "area", "city").values_list(
+        "pin", "area", "city", "state", "country"
+    ).iterator(chunk_size=LOAD_CHUNK_SIZE)
+    return PincodeIndex.build(rows, version)
+
+
+class PincodeService:
+    """
+    The worker's current PincodeIndex. Every VERSION_CHECK_SECONDS one request
+    thread compares the DatasetVersion and swaps in a fresh index when it moved;
+    the other threads keep answering from the old one meanwhile.
+    """
+
+    def __init__(self, check_interval=VERSION_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._index = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        started = time.monotonic()
+        self._index = load_index()
+        self._checked_at = time.monotonic()
+        logger.info(
+            "Loaded %s pincodes (version %s) in %.2fs",
+            len(self._index), self._index.version, self._checked_at - started
+        )
+
+    def index(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._load()
+            return self._index
+
+        if time.monotonic() - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = time.monotonic()
+                if _current_version() != index.version:
+                    self._load()
+            except Exception:
+                logger.exception("Pincode version check failed; serving the loaded index")
+            finally:
+                self._lock.release()
+
+        return self._index
+
+    def expire(self):
+        """Check the version on the next lookup (after an edit in this worker)."""
+        self._checked_at = 0.0
+
+    def warm_up(self):
+        """Load at worker start; a failure is logged and retried on first use."""
+        try:
+            self.index()
+        except Exception:
+            logger.exception("Pincode warm-up failed")
+        finally:
+            # the loading thread is not a request thread; do not keep its connection
+            connections.close_all()
+
+    def lookup(self, pin):
+        return self.index().lookup(pin)
+
+    def is_serviceable(self, pin):
+        return self.index().contains(pin)
+
+
+pincode_service = PincodeService()
+
+
+def invalidate_pincodes():
+    """After a pincode edit: every worker reloads; this one checks on its next lookup."""
+    bump_pincode_version()
+    transaction.on_commit(pincode_service.expire)
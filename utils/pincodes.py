@@ -0,0 +1,143 @@
+import csv
+import re
+
+from django.db import connection, transaction
+
+from utils.dataset_versions import bump_version
+
+PINCODE_COUNTRY = "India"
+# created_by of imported rows; only these are ever removed by a refresh
+PINCODE_IMPORT_USER = "import_pincodes"
+# DatasetVersion row that utils.pincode_service reloads on
+PINCODE_DATASET = "pincode"
+
+# CSV header -> pincode column, as in the India Post directory export
+SOURCE_COLUMNS = {
+    "pincode": "pin",
+    "district": "area",
+    "officename": "city",
+    "statename": "state",
+}
+
+_STAGING_TABLE = "pincode_staging"
+_INCOMING_TABLE = "pincode_incoming"
+
+# trimmed, length-capped and deduplicated on the table's unique key
+_INCOMING_SQL = f"""
+    CREATE TEMP TABLE {_INCOMING_TABLE} ON COMMIT DROP AS
+    SELECT DISTINCT ON (pin, area, city) pin, area, city, state
+    FROM (
+        SELECT
+            btrim(pincode)::integer AS pin,
+            left(btrim(coalesce(district, '')), 100) AS area,
+            left(btrim(coalesce(officename, '')), 100) AS city,
+            left(btrim(coalesce(statename, '')), 50) AS state
+        FROM {_STAGING_TABLE}
+        WHERE btrim(pincode) ~ '^[0-9]{{6}}$'
+    ) AS rows
+    ORDER BY pin, area, city, state
+"""
+
+# rows loaded before imports were stamped (scripts/import_pincodes.py, created_by
+# NULL) are claimed by the first import that finds them in the file, so later
+# refreshes can remove them once India Post drops them
+_UPSERT_SQL = f"""
+    WITH upserted AS (
+        INSERT INTO pincode (id, pin, area, city, state, country, created_at, updated_at, created_by, updated_by)
+        SELECT gen_random_uuid(), pin, area, city, state, %(country)s, now(), now(), %(user)s, %(user)s
+        FROM {_INCOMING_TABLE}
+        ON CONFLICT (pin, area, city) DO UPDATE
+        SET state = EXCLUDED.state,
+            country = EXCLUDED.country,
+            updated_at = now(),
+            created_by = coalesce(pincode.created_by, EXCLUDED.created_by),
+            updated_by = EXCLUDED.updated_by
+        WHERE (pincode.state, pincode.country) IS DISTINCT FROM (EXCLUDED.state, EXCLUDED.country)
+           OR pincode.created_by IS NULL
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+    FROM upserted
+"""
+
+# rows admins added by hand, or of another country, are never touched
+_REMOVE_SQL = f"""
+    DELETE FROM pincode AS p
+    WHERE p.country = %(country)s
+      AND p.created_by = %(user)s
+      AND NOT EXISTS (
+        SELECT 1 FROM {_INCOMING_TABLE} AS i
+        WHERE (i.pin, i.area, i.city) = (p.pin, p.area, p.city)
+    )
+"""
+
+
+def bump_pincode_version():
+    """Makes every worker reload its pincode index; takes effect when the transaction commits."""
+    bump_version(PINCODE_DATASET)
+
+
+def _header(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    return [re.sub(r"[^a-z0-9_]", "_", column.strip().lower()) for column in header]
+
+
+def load_pincodes(path, remove_missing=False, country=PINCODE_COUNTRY, user=PINCODE_IMPORT_USER):
+    """
+    Full refresh of `pincode` from the India Post CSV in one transaction:
+    COPY into a staging table, dedupe on (pin, area, city), one upsert, and
+    with remove_missing=True delete the post offices a previous import of the
+    same country created or claimed that are no longer in the file.
+    Returns {"rows", "skipped", "duplicates", "inserted", "updated", "removed"}.
+    """
+    header = _header(path)
+    missing = [column for column in SOURCE_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    # every CSV column lands as text; only the four we map are read back
+    columns = ", ".join(f'"{column}" text' for column in header)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMP TABLE {_STAGING_TABLE} ({columns}) ON COMMIT DROP")
+        with open(path, encoding="utf-8-sig") as f:
+            cursor.copy_expert(
+                f"COPY {_STAGING_TABLE} FROM STDIN WITH (FORMAT csv, HEADER true)", f
+            )
+        cursor.execute(f"SELECT count(*) FROM {_STAGING_TABLE}")
+        rows = cursor.fetchone()[0]
+
+        cursor.execute(_INCOMING_SQL)
+        cursor.execute(f"ANALYZE {_INCOMING_TABLE}")
+        cursor.execute(f"SELECT count(*) FROM {_INCOMING_TABLE}")
+        unique_rows = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT count(*) FROM {_STAGING_TABLE} WHERE btrim(pincode) !~ '^[0-9]{{6}}$' OR pincode IS NULL"
+        )
+        skipped = cursor.fetchone()[0]
+        if not unique_rows:
+            # never let a truncated or wrong file empty the table
+            raise ValueError("No valid pincodes in file")
+
+        cursor.execute(_UPSERT_SQL, {"country": country, "user": user})
+        inserted, updated = cursor.fetchone()
+
+        removed = 0
+        if remove_missing:
+            # fresh stats after a bulk load, or the anti-join is planned as a nested loop
+            cursor.execute("ANALYZE pincode")
+            cursor.execute(_REMOVE_SQL, {"country": country, "user": user})
+            removed = cursor.rowcount
+
+        if inserted or updated or removed:
+            bump_pincode_version()
+
+    return {
+        "rows": rows,
+        "skipped": skipped,
+        "duplicates": rows - skipped - unique_rows,
+        "inserted": inserted,
+        "updated": updated,
+        "removed": removed,
+    }
@@ -0,0 +1,113 @@
+from db.models import Product, ProductCard
+
+# read from the product row on every request instead of the snapshot
+CARD_LIVE_FIELDS = ("current_stock", "rating", "total_rating", "number_of_reviews")
+
+
+def build_card(p):
+    """Storefront product dict; expects categories, tags and media prefetched."""
+    return {
+        "id": str(p.id),
+        "lsin": p.lsin,
+        "group_code": p.group_code,
+        "sku": p.sku,
+
+        "name": p.name,
+        "colour": p.colour,
+        "size": p.size,
+
+        "selling_price": str(p.selling_price),
+        "mrp": str(p.mrp),
+
+        "description": p.description,
+        "highlights": p.highlights,
+
+        "categories": [
+            {"id": str(c.id), "name": c.name}
+            for c in p.categories.all()
+        ],
+        "tags": [
+            {"id": str(t.id), "name": t.name}
+            for t in p.tags.all()
+        ],
+        "search_tags": p.search_tags,
+        "gst_percentage": float(p.gst_percentage) if p.gst_percentage is not None else None,
+        "gst_amount": float(p.gst_amount) if p.gst_amount is not None else None,
+        "images": [m.url for m in p.media.all()],
+        "is_active": p.is_active
+    }
+
+
+def refresh_product_cards(product_ids):
+    """
+    Rebuild the card of the given products with a single upsert.
+    Call it after any write that changes a product, its media, categories or tags.
+    Returns {product_id: card data}.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+
+    products = Product.objects.filter(
+        id__in=product_ids
+    ).prefetch_related(
+        "categories",
+        "tags",
+        "media"
+    )
+
+    cards = [
+        ProductCard(product_id=p.id, store_id=p.store_id, data=build_card(p))
+        for p in products
+    ]
+
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["data", "updated_at"]
+    )
+
+    return {card.product_id: card.data for card in cards}
+
+
+def card_values(prefix=""):
+    """
+    .values() names that fetch the card through a join, e.g. card_values("product__")
+    on a Cart queryset. Pair with cards_from_rows(rows, prefix).
+    """
+    return (
+        f"{prefix}id",
+        f"{prefix}card__data",
+        *(f"{prefix}{field}" for field in CARD_LIVE_FIELDS)
+    )
+
+
+def cards_from_rows(rows, prefix=""):
+    """
+    Turn .values(*card_values(prefix)) rows into storefront product dicts.
+    Products without a card yet (never written since the card table was added)
+    get one built here, so the first read also backfills. A product deleted
+    since the rows were read has no card and is left out.
+    """
+    rows = [row for row in rows if row[f"{prefix}id"] is not None]
+
+    missing = [
+        row[f"{prefix}id"] for row in rows
+        if row[f"{prefix}card__data"] is None
+    ]
+    built = refresh_product_cards(missing) if missing else {}
+
+    data = []
+    for row in rows:
+        card = row[f"{prefix}card__data"] or built.get(row[f"{prefix}id"])
+        if card is None:
+            continue
+        card = dict(card)
+        card["current_stock"] = row[f"{prefix}current_stock"]
+        card["rating"] = float(row[f"{prefix}rating"])
+        card["total_rating"] = row[f"{prefix}total_rating"]
+        card["number_of_reviews"] = row[f"{prefix}number_of_reviews"]
+        data.append(card)
+
+    return data
@@ -0,0 +1,80 @@
+from db.models import Product
+from utils.product_import import LIST_SEPARATOR
+from utils.streaming import csv_lines, ndjson_lines, xlsx_chunks
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "xlsx", "ndjson")
+
+# same names the importer reads, so an export can be edited and re-imported
+EXPORT_COLUMNS = (
+    "id", "lsin", "group_code", "sku", "name", "colour", "size",
+    "mrp", "selling_price", "gst_percentage", "gst_amount", "current_stock",
+    "description", "highlights", "categories", "tags", "search_tags", "images",
+    "is_active", "created_at",
+)
+
+
+def export_records(store):
+    """
+    Yields one dict per product of the store, oldest first, reading through a
+    server-side cursor; categories, tags and media are prefetched per chunk.
+    """
+    queryset = Product.objects.filter(
+        store=store
+    ).prefetch_related(
+        "categories",
+        "tags",
+        "media"
+    ).order_by("created_at", "id")
+
+    for p in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            "id": str(p.id),
+            "lsin": p.lsin,
+            "group_code": p.group_code,
+            "sku": p.sku,
+            "name": p.name,
+            "colour": p.colour,
+            "size": p.size,
+            "mrp": p.mrp,
+            "selling_price": p.selling_price,
+            "gst_percentage": p.gst_percentage,
+            "gst_amount": p.gst_amount,
+            "current_stock": p.current_stock,
+            "description": p.description,
+            "highlights": p.highlights,
+            "categories": [c.name for c in p.categories.all()],
+            "tags": [t.name for t in p.tags.all()],
+            "search_tags": p.search_tags or [],
+            "images": [m.url for m in p.media.all()],
+            "is_active": p.is_active,
+            "created_at": p.created_at,
+        }
+
+
+def _tabular(records, for_xlsx=False):
+    for record in records:
+        row = []
+        for column in EXPORT_COLUMNS:
+            value = record[column]
+            if isinstance(value, list):
+                value = LIST_SEPARATOR.join(value)
+            elif column == "created_at":
+                value = value.replace(tzinfo=None) if for_xlsx else value.isoformat()
+            elif for_xlsx and value is not None and column in (
+                "mrp", "selling_price", "gst_percentage", "gst_amount"
+            ):
+                value = float(value)
+            row.append(value)
+        yield row
+
+
+def export_chunks(store, file_format):
+    """Byte / str chunks of the catalog in the requested format, for StreamingHttpResponse."""
+    records = export_records(store)
+
+    if file_format == "ndjson":
+        return ndjson_lines(records)
+    if file_format == "xlsx":
+        return xlsx_chunks(EXPORT_COLUMNS, _tabular(records, for_xlsx=True), sheet_title="Products")
+    return csv_lines(EXPORT_COLUMNS, _tabular(records))
@@ -0,0 +1,408 @@
+import logging
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+import pandas as pd
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from db.models import Category, Product, ProductImportJob, ProductMedia, Tag
+from enums.store import ImportJobStatus
+from utils.product_card import refresh_product_cards
+from utils.search import refresh_search_vectors
+from utils.store import allocate_lsins
+
+logger = logging.getLogger("default")
+
+IMPORT_CHUNK_SIZE = 2000
+IMPORT_UPLOAD_DIR = "product_imports"
+# progress is saved after every chunk; a RUNNING job silent this long lost its worker
+IMPORT_STALE_AFTER = timedelta(minutes=15)
+LSIN_BRAND_CODE = "SRU"
+LIST_SEPARATOR = ","
+
+REQUIRED_COLUMNS = ("sku", "name", "mrp", "selling_price", "current_stock")
+OPTIONAL_COLUMNS = (
+    "group_code", "colour", "size", "gst_percentage", "description", "highlights",
+    "categories", "tags", "search_tags", "images", "is_active",
+)
+MAX_LENGTHS = {"sku": 30, "name": 150, "colour": 50, "size": 50, "group_code": 30}
+
+TRUE_VALUES = {"", "1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+
+
+# ---------- Reading ----------
+
+def _normalize_columns(columns):
+    return [str(c or "").strip().lower().replace(" ", "_") for c in columns]
+
+
+def read_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams a CSV or XLSX as DataFrames of `chunk_size` rows. Every cell is a
+    stripped string ("" when blank) so validation sees the sheet as typed.
+    """
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        chunks = _read_xlsx(path, chunk_size)
+    else:
+        chunks = pd.read_csv(
+            path,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_size
+        )
+
+    for chunk in chunks:
+        chunk.columns = _normalize_columns(chunk.columns)
+        yield chunk.apply(lambda col: col.str.strip())
+
+
+def _read_xlsx(path, chunk_size):
+    # read_only keeps memory flat: rows are parsed lazily from the zip stream
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        width = len(header)
+
+        # keep a running index across chunks, like read_csv does
+        batch, offset = [], 0
+        for row in rows:
+            cells = ["" if v is None else str(v) for v in row[:width]]
+            batch.append(cells + [""] * (width - len(cells)))
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header, index=range(offset, offset + len(batch)))
+                offset += len(batch)
+                batch = []
+
+        if batch:
+            yield pd.DataFrame(batch, columns=header, index=range(offset, offset + len(batch)))
+    finally:
+        workbook.close()
+
+
+def _split(series):
+    return series.map(
+        lambda value: [v.strip() for v in value.split(LIST_SEPARATOR) if v.strip()]
+    )
+
+
+# ---------- Validation ----------
+
+class _Lookup:
+    """Store categories / tags addressable by id, name or slug (case-insensitive)."""
+
+    def __init__(self, queryset):
+        self.by_key = {}
+        for obj in queryset:
+            for key in (str(obj.id), obj.name, obj.slug):
+                if key:
+                    self.by_key.setdefault(key.lower(), obj.id)
+
+    def resolve(self, values):
+        found, unknown = [], []
+        for value in values:
+            pk = self.by_key.get(value.lower())
+            if pk is None:
+                unknown.append(value)
+            elif pk not in found:
+                found.append(pk)
+        return found, unknown
+
+
+def validate_chunk(df, seen_skus, categories, tags):
+    """
+    Column-wise checks over a whole chunk. Returns (errors, parsed) where
+    errors maps a DataFrame index to its messages and parsed holds the typed
+    columns used to build rows.
+    """
+    errors = {}
+
+    def fail(mask, message):
+        for idx in df.index[mask]:
+            errors.setdefault(idx, []).append(message)
+
+    for column in REQUIRED_COLUMNS:
+        fail(df[column] == "", f"{column} is required")
+
+    for column, limit in MAX_LENGTHS.items():
+        fail(df[column].str.len() > limit, f"{column} must be at most {limit} characters")
+
+    parsed = {}
+    for column in ("mrp", "selling_price", "current_stock", "gst_percentage"):
+        values = pd.to_numeric(df[column], errors="coerce")
+        fail((df[column] != "") & values.isna(), f"{column} must be a number")
+        fail(values < 0, f"{column} cannot be negative")
+        parsed[column] = values
+
+    fail(parsed["selling_price"] > parsed["mrp"], "Selling price cannot be greater than MRP")
+    fail(parsed["current_stock"] % 1 > 0, "current_stock must be a whole number")
+    fail(parsed["gst_percentage"] > 100, "gst_percentage cannot exceed 100")
+
+    is_active = df["is_active"].str.lower()
+    fail(~is_active.isin(TRUE_VALUES | FALSE_VALUES), "is_active must be true or false")
+    parsed["is_active"] = is_active.isin(TRUE_VALUES)
+
+    # SKUs are unique across the whole catalog
+    fail(
+        (df["sku"] != "") & (df["sku"].duplicated(keep="first") | df["sku"].isin(seen_skus)),
+        "Duplicate SKU in file"
+    )
+    existing = set(
+        Product.objects.filter(sku__in=df["sku"].tolist()).values_list("sku", flat=True)
+    )
+    fail(df["sku"].isin(existing), "SKU already exists")
+
+    for column, limit in (("images", 300), ("search_tags", 50)):
+        parsed[column] = _split(df[column])
+        fail(
+            parsed[column].map(lambda values: any(len(v) > limit for v in values)),
+            f"{column} entries must be at most {limit} characters"
+        )
+
+    for column, lookup in (("categories", categories), ("tags", tags)):
+        resolved = _split(df[column]).map(lookup.resolve)
+        parsed[column] = resolved.map(lambda r: r[0])
+        for idx, (_, unknown) in resolved.items():
+            if unknown:
+                errors.setdefault(idx, []).append(f"Unknown {column}: {', '.join(unknown)}")
+
+    return errors, parsed
+
+
+# ---------- Writing ----------
+
+def _gst_amount(selling_price, gst_percentage):
+    if gst_percentage > 0:
+        product_cost = (selling_price * 100) / (100 + gst_percentage)
+        return selling_price - product_cost
+    return Decimal("0.00")
+
+
+def write_chunk(store, df, parsed, created_by):
+    """Inserts the valid rows of a chunk; returns the new product ids."""
+    lsins = allocate_lsins(store, LSIN_BRAND_CODE, len(df))
+
+    products, category_rows, tag_rows, media = [], [], [], []
+    CategoryLink = Product.categories.through
+    TagLink = Product.tags.through
+
+    for lsin, (idx, row) in zip(lsins, df.iterrows()):
+        selling_price = Decimal(row["selling_price"])
+        gst_percentage = Decimal(row["gst_percentage"] or 0)
+
+        product = Product(
+            store=store,
+            sku=row["sku"],
+            lsin=lsin,
+            group_code=row["group_code"],
+            name=row["name"],
+            size=row["size"] or None,
+            colour=row["colour"],
+            mrp=Decimal(row["mrp"]),
+            selling_price=selling_price,
+            gst_percentage=gst_percentage,
+            gst_amount=_gst_amount(selling_price, gst_percentage),
+            current_stock=int(parsed["current_stock"][idx]),
+            description=row["description"] or None,
+            highlights=row["highlights"] or None,
+            search_tags=parsed["search_tags"][idx] or None,
+            is_active=bool(parsed["is_active"][idx]),
+            created_by=created_by
+        )
+        products.append(product)
+
+        category_rows += [
+            CategoryLink(product_id=product.id, category_id=pk)
+            for pk in parsed["categories"][idx]
+        ]
+        tag_rows += [
+            TagLink(product_id=product.id, tag_id=pk)
+            for pk in parsed["tags"][idx]
+        ]
+        media += [
+            ProductMedia(
+                product_id=product.id,
+                url=url,
+                media_type=ProductMedia.IMAGE,
+                position=position,
+                created_by=created_by
+            )
+            for position, url in enumerate(parsed["images"][idx])
+        ]
+
+    with transaction.atomic():
+        Product.objects.bulk_create(products, batch_size=1000)
+        CategoryLink.objects.bulk_create(category_rows, batch_size=5000)
+        TagLink.objects.bulk_create(tag_rows, batch_size=5000)
+        ProductMedia.objects.bulk_create(media, batch_size=5000)
+
+        product_ids = [p.id for p in products]
+        refresh_search_vectors(product_ids)
+        refresh_product_cards(product_ids)
+
+    return product_ids
+
+
+# ---------- Job ----------
+
+def run_product_import(job_id, path, created_by=None):
+    """
+    Validates and imports a catalog file chunk by chunk, recording progress
+    and per-row errors on the ProductImportJob. Valid rows of a chunk are
+    committed even when other rows of the same file fail.
+    """
+    job = ProductImportJob.objects.select_related("store").get(id=job_id)
+    store = job.store
+
+    job.status = ImportJobStatus.RUNNING
+    job.save(update_fields=["status", "updated_at"])
+
+    categories = _Lookup(Category.objects.filter(store=store, is_active=True))
+    tags = _Lookup(Tag.objects.filter(store=store, is_active=True))
+    seen_skus = set()
+    errors = []
+
+    def row_error(idx, sku, messages):
+        # idx runs across chunks from 0; +2 for the 1-based header line
+        errors.append({"row": int(idx) + 2, "sku": sku, "errors": messages})
+
+    try:
+        for df in read_chunks(path):
+            missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            for column in OPTIONAL_COLUMNS:
+                if column not in df.columns:
+                    df[column] = ""
+
+            df = df[(df != "").any(axis=1)]
+
+            chunk_errors, parsed = validate_chunk(df, seen_skus, categories, tags)
+            seen_skus.update(df["sku"])
+
+            for idx, messages in chunk_errors.items():
+                row_error(idx, df.at[idx, "sku"], messages)
+
+            valid = df[~df.index.isin(list(chunk_errors))]
+            created = 0
+            if len(valid):
+                try:
+                    created = len(write_chunk(store, valid, parsed, created_by))
+                except Exception as e:
+                    # e.g. a SKU created concurrently: the whole chunk is rejected
+                    logger.exception("Product import chunk failed")
+                    for idx in valid.index:
+                        row_error(idx, df.at[idx, "sku"], [f"Could not be saved: {e}"])
+
+            job.total_rows += len(df)
+            job.created_count += created
+            job.failed_count += len(df) - created
+            job.errors = errors
+            job.save(update_fields=[
+                "total_rows", "created_count", "failed_count", "errors", "updated_at"
+            ])
+
+        job.status = ImportJobStatus.COMPLETED
+
+    except Exception as e:
+        logger.exception("Product import %s failed", job_id)
+        job.status = ImportJobStatus.FAILED
+        job.message = str(e)
+
+    job.errors = sorted(errors, key=lambda e: e["row"])
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def queue_product_import(store, file_obj, created_by=None):
+    """
+    Saves the upload to shared storage with a PENDING job; the
+    process_product_imports command (or its cron) runs it outside the web
+    workers, which are recycled long before a large catalog is through.
+    """
+    extension = os.path.splitext(file_obj.name)[1].lower()
+    job = ProductImportJob(store=store, file_name=file_obj.name, created_by=created_by)
+    job.file_path = default_storage.save(f"{IMPORT_UPLOAD_DIR}/{job.id}{extension}", file_obj)
+    job.save()
+    return job
+
+
+def fail_stale_imports():
+    """
+    RUNNING jobs whose worker died (no progress saved for IMPORT_STALE_AFTER)
+    are marked FAILED; the chunks counted on the job were already imported.
+    """
+    stale = ProductImportJob.objects.filter(
+        status=ImportJobStatus.RUNNING,
+        updated_at__lt=timezone.now() - IMPORT_STALE_AFTER
+    )
+    paths = [path for path in stale.values_list("file_path", flat=True) if path]
+    failed = stale.update(
+        status=ImportJobStatus.FAILED,
+        message="Import stopped before finishing; rows counted on this job were imported",
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+    for path in paths:
+        _delete_upload(path)
+    return failed
+
+
+def _claim_job():
+    """The oldest PENDING job, marked RUNNING; concurrent workers skip each other's claims."""
+    with transaction.atomic():
+        job = ProductImportJob.objects.select_for_update(skip_locked=True).filter(
+            status=ImportJobStatus.PENDING
+        ).order_by("created_at").first()
+        if job is None:
+            return None
+        job.status = ImportJobStatus.RUNNING
+        job.save(update_fields=["status", "updated_at"])
+    return job
+
+
+def _delete_upload(path):
+    try:
+        default_storage.delete(path)
+    except Exception:
+        logger.exception("Could not delete product import upload %s", path)
+
+
+def _run_claimed_job(job):
+    tmp = tempfile.NamedTemporaryFile(suffix=os.path.splitext(job.file_path or "")[1], delete=False)
+    try:
+        with tmp, default_storage.open(job.file_path, "rb") as upload:
+            shutil.copyfileobj(upload, tmp)
+        run_product_import(job.id, tmp.name, job.created_by)
+    except Exception as e:
+        logger.exception("Product import %s could not be run", job.id)
+        ProductImportJob.objects.filter(id=job.id).update(
+            status=ImportJobStatus.FAILED,
+            message=str(e),
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+    finally:
+        os.remove(tmp.name)
+        _delete_upload(job.file_path)
+
+
+def process_product_imports():
+    """Fails stale jobs, then runs PENDING jobs one by one until none is left. Returns the number run."""
+    fail_stale_imports()
+
+    handled = 0
+    while True:
+        job = _claim_job()
+        if job is None:
+            return handled
+        _run_claimed_job(job)
+        handled += 1
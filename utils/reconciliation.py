@@ -0,0 +1,96 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from db.models import JobCheckpoint, Payment
+from enums.store import PaymentStatus
+from utils.payment_gateway import GatewayError, gateway_client
+from utils.payments import apply_payment_statuses, map_cashfree_status
+
+logger = logging.getLogger("default")
+
+RECONCILE_JOB = "payment_reconciliation"
+RECONCILE_STATUSES = (PaymentStatus.INITIATED, PaymentStatus.PENDING)
+# younger payments are still in the customer's hands (and covered by webhooks)
+STALE_AFTER = timedelta(minutes=30)
+RECONCILE_MAX_PAYMENTS = 50000
+RECONCILE_BATCH_SIZE = 200
+RECONCILE_WORKERS = 8
+
+
+def _load_cursor():
+    checkpoint = JobCheckpoint.objects.filter(name=RECONCILE_JOB).first()
+    cursor = checkpoint.cursor if checkpoint else {}
+    if not cursor:
+        return None
+    return parse_datetime(cursor["created_at"]), cursor["id"]
+
+
+def _save_cursor(cursor):
+    JobCheckpoint.objects.update_or_create(
+        name=RECONCILE_JOB,
+        defaults={"cursor": {
+            "created_at": cursor[0].isoformat(),
+            "id": str(cursor[1]),
+        } if cursor else {}}
+    )
+
+
+def _gateway_status(payment):
+    """(order_id, status) from Cashfree, or None when it could not be fetched."""
+    try:
+        data = gateway_client(payment.store).get_order(payment.order.order_number)
+    except GatewayError as e:
+        logger.warning("Reconciliation: %s for order %s", e, payment.order.order_number)
+        return None
+    return payment.order_id, map_cashfree_status(data.get("order_status"))
+
+
+def reconcile_stale_payments(max_payments=RECONCILE_MAX_PAYMENTS, batch_size=RECONCILE_BATCH_SIZE,
+                             workers=RECONCILE_WORKERS):
+    """
+    Asks Cashfree for the status of INITIATED / PENDING payments older than
+    STALE_AFTER and applies the answers. Walks the payments in (created_at, id)
+    order from the saved checkpoint; each batch is fetched concurrently outside
+    any transaction, applied in one short transaction, then checkpointed.
+    After the last stale payment the cursor wraps to the start for the next run.
+    """
+    cursor = _load_cursor()
+    cutoff = timezone.now() - STALE_AFTER
+    stats = {"checked": 0, "updated": 0, "errors": 0}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        while stats["checked"] < max_payments:
+            queryset = Payment.objects.select_related("order", "store").filter(
+                status__in=RECONCILE_STATUSES,
+                created_at__lt=cutoff
+            ).exclude(cf_order_id="")
+            if cursor:
+                queryset = queryset.filter(
+                    Q(created_at__gt=cursor[0]) | Q(created_at=cursor[0], id__gt=cursor[1])
+                )
+            batch = list(queryset.order_by("created_at", "id")[:min(batch_size, max_payments - stats["checked"])])
+
+            if not batch:
+                cursor = None
+                _save_cursor(cursor)
+                break
+
+            answers = [answer for answer in pool.map(_gateway_status, batch) if answer]
+            results = apply_payment_statuses(
+                {order_id: (status, None) for order_id, status in answers},
+                updated_by="PAYMENT_RECONCILIATION"
+            )
+
+            stats["checked"] += len(batch)
+            stats["errors"] += len(batch) - len(answers)
+            stats["updated"] += sum(1 for _, _, changed in results.values() if changed)
+
+            cursor = (batch[-1].created_at, batch[-1].id)
+            _save_cursor(cursor)
+
+    return stats
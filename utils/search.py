@@ -0,0 +1,145 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from db.models import Category, Product, Tag
+
+SEARCH_CONFIG = "english"
+
+# autocomplete
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_TIMEOUT_MS = 20
+SUGGEST_SIMILARITY_THRESHOLD = 0.4
+
+# name / search_tags rank highest, then category & tag names, then highlights, then description
+SEARCH_VECTOR_SQL = f"""
+    UPDATE products AS p
+    SET search_vector =
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(p.name, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', array_to_string(coalesce(p.search_tags, '{{}}'), ' ')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+            SELECT string_agg(c.name, ' ')
+            FROM products_categories pc
+            JOIN categories c ON c.id = pc.category_id
+            WHERE pc.product_id = p.id AND c.is_active
+        ), '')), 'B')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+            SELECT string_agg(t.name, ' ')
+            FROM products_tags pt
+            JOIN tags t ON t.id = pt.tag_id
+            WHERE pt.product_id = p.id AND t.is_active
+        ), '')), 'B')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(p.highlights, '')), 'C')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(p.description, '')), 'D')
+"""
+
+
+def refresh_search_vectors(product_ids):
+    """
+    Rebuild the search document of the given products in one set-based UPDATE.
+    Call it after any write that changes a product's text, categories or tags.
+    """
+    product_ids = [str(pid) for pid in product_ids]
+    if not product_ids:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_VECTOR_SQL + " WHERE p.id = ANY(%s::uuid[])",
+            [product_ids]
+        )
+
+
+def build_search_query(text):
+    """
+    Turns free text into a prefix-matching tsquery ("red sh" -> red:* & sh:*)
+    so partially typed words still match. Returns None when nothing is searchable.
+    """
+    terms = re.findall(r"\w+", (text or "").lower())
+    if not terms:
+        return None
+
+    return SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        config=SEARCH_CONFIG,
+        search_type="raw"
+    )
+
+
+def search_products(queryset, text):
+    """
+    Filters a Product queryset through the GIN-indexed search document and
+    orders it by ts_rank (newest first on ties, then id, as the search cursor
+    in mixins.pagination.ranked_keyset_paginate expects).
+    """
+    query = build_search_query(text)
+    if query is None:
+        return queryset.none()
+
+    return queryset.filter(
+        search_vector=query
+    ).annotate(
+        # float8 round-trips exactly through a cursor; ts_rank's real does not
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+    ).order_by("-rank", "-created_at", "-id")
+
+
+def suggest(store, text, limit):
+    """
+    Typo-tolerant autocomplete over product, category and tag names of one store.
+    Every lookup uses the `%>` (word similarity) operator so it is served by the
+    gin_trgm_ops indexes, and runs under a statement timeout so a slow plan
+    fails fast (the caller gets OperationalError) instead of blocking typing.
+    """
+    similarity = TrigramWordSimilarity(text, "name")
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", [SUGGEST_TIMEOUT_MS])
+            cursor.execute(
+                "SET LOCAL pg_trgm.word_similarity_threshold = %s",
+                [SUGGEST_SIMILARITY_THRESHOLD]
+            )
+
+        products = Product.objects.filter(
+            store=store,
+            is_active=True,
+            name__trigram_word_similar=text
+        ).annotate(
+            similarity=similarity
+        ).order_by("-similarity", "name").values("id", "name", "lsin")[:limit]
+
+        categories = Category.objects.filter(
+            store=store,
+            is_active=True,
+            name__trigram_word_similar=text
+        ).annotate(
+            similarity=similarity
+        ).order_by("-similarity", "name").values("id", "name", "slug")[:limit]
+
+        tags = Tag.objects.filter(
+            store=store,
+            is_active=True,
+            name__trigram_word_similar=text
+        ).annotate(
+            similarity=similarity
+        ).order_by("-similarity", "name").values("id", "name", "slug")[:limit]
+
+        return {
+            "products": [
+                {"id": str(p["id"]), "name": p["name"], "lsin": p["lsin"]}
+                for p in products
+            ],
+            "categories": [
+                {"id": str(c["id"]), "name": c["name"], "slug": c["slug"]}
+                for c in categories
+            ],
+            "tags": [
+                {"id": str(t["id"]), "name": t["name"], "slug": t["slug"]}
+                for t in tags
+            ],
+        }
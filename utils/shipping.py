@@ -0,0 +1,155 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from db.models import ShippingZone
+from utils.dataset_versions import StoreVersionedCache
+from utils.pincode_service import pincode_service
+
+SHIPPING_INDEX_TTL = 300
+SHIPPING_DATASET = "shipping"
+
+
+class RateCard:
+    """A ShippingRateCard's pricing, detached from the ORM."""
+    __slots__ = (
+        "id", "base_weight_grams", "base_charge", "slab_weight_grams", "slab_charge",
+        "free_shipping_threshold", "cod_surcharge",
+    )
+
+    def __init__(self, card):
+        self.id = card.id
+        self.base_weight_grams = card.base_weight_grams
+        self.base_charge = card.base_charge
+        self.slab_weight_grams = card.slab_weight_grams
+        self.slab_charge = card.slab_charge
+        self.free_shipping_threshold = card.free_shipping_threshold
+        self.cod_surcharge = card.cod_surcharge
+
+    def charge(self, order_value, weight_grams, cod=False):
+        if self.free_shipping_threshold is not None and order_value >= self.free_shipping_threshold:
+            charge = Decimal("0.00")
+        else:
+            extra = max(weight_grams - self.base_weight_grams, 0)
+            slabs = -(-extra // self.slab_weight_grams) if self.slab_weight_grams else 0
+            charge = self.base_charge + self.slab_charge * slabs
+
+        if cod:
+            charge += self.cod_surcharge
+        return charge.quantize(Decimal("0.01"))
+
+
+class ShippingIndex:
+    """
+    A store's active zones compiled for lookup. Pincode ranges are flattened
+    into disjoint intervals, each owned by the lowest-priority zone covering
+    it, and searched with bisect. States map straight to a card. A pin range
+    beats a state, which beats the store-wide default zone.
+    """
+    __slots__ = ("starts", "ends", "cards", "states", "default", "has_zones")
+
+    def __init__(self, zones):
+        zones = sorted(zones, key=lambda z: (z.priority, z.created_at))
+        cards = {}
+
+        def card_of(zone):
+            if zone.rate_card_id not in cards:
+                cards[zone.rate_card_id] = RateCard(zone.rate_card)
+            return cards[zone.rate_card_id]
+
+        self.has_zones = bool(zones)
+        self.states = {}
+        self.default = None
+        ranges = []
+        for zone in zones:
+            if zone.pin_from is not None and zone.pin_to is not None:
+                ranges.append((zone.pin_from, zone.pin_to, card_of(zone)))
+            elif zone.state:
+                self.states.setdefault(zone.state.strip().lower(), card_of(zone))
+            elif self.default is None:
+                self.default = card_of(zone)
+
+        self.starts, self.ends, self.cards = [], [], []
+        bounds = sorted({b for lo, hi, _ in ranges for b in (lo, hi + 1)})
+        for lo, next_lo in zip(bounds, bounds[1:]):
+            # ranges are in priority order: the first one covering lo owns the interval
+            card = next((c for start, end, c in ranges if start <= lo <= end), None)
+            if card is None:
+                continue
+            if self.cards and self.cards[-1] is card and self.ends[-1] == lo - 1:
+                self.ends[-1] = next_lo - 1
+            else:
+                self.starts.append(lo)
+                self.ends.append(next_lo - 1)
+                self.cards.append(card)
+
+    def resolve(self, pin=None, state=None):
+        """The RateCard for a destination, or None when no zone covers it."""
+        if pin is not None:
+            i = bisect_right(self.starts, pin) - 1
+            if i >= 0 and pin <= self.ends[i]:
+                return self.cards[i]
+        if state:
+            card = self.states.get(state.strip().lower())
+            if card is not None:
+                return card
+        return self.default
+
+
+def build_shipping_index(store_id):
+    return ShippingIndex(
+        ShippingZone.objects.filter(
+            store_id=store_id,
+            is_active=True
+        ).select_related("rate_card")
+    )
+
+
+# store_id -> ShippingIndex; versioned per store, so a rate card edit reaches
+# every worker within the cache's version check interval
+shipping_index_cache = StoreVersionedCache(SHIPPING_DATASET, build_shipping_index, ttl=SHIPPING_INDEX_TTL)
+
+
+def get_shipping_index(store_id):
+    return shipping_index_cache.get(store_id)
+
+
+def invalidate_shipping_index(store_id):
+    """After the current transaction commits: this worker recompiles on next use, others at their next version check."""
+    shipping_index_cache.invalidate(store_id)
+
+
+def _destination(address):
+    """(pin, state) of an order address; the state falls back to the pincode directory."""
+    if not isinstance(address, dict):
+        return None, None
+
+    try:
+        pin = int(str(address.get("pin_code") or address.get("pincode") or "").strip())
+    except ValueError:
+        pin = None
+
+    state = address.get("state")
+    if not state and pin is not None:
+        offices = pincode_service.lookup(pin)
+        state = offices[0]["state"] if offices else None
+    return pin, state
+
+
+def quote_shipping(store, lines, address, order_value, cod=False):
+    """
+    Shipping charge for checkout lines (utils.checkout.load_checkout_lines) to
+    an order address, from the cached zone index and the lines' products:
+    no queries once the store's index is warm. A store without zones ships
+    free. Raises Exception when zones exist but none covers the address.
+    """
+    index = get_shipping_index(store.id)
+    if not index.has_zones:
+        return Decimal("0.00")
+
+    pin, state = _destination(address)
+    card = index.resolve(pin, state)
+    if card is None:
+        raise Exception("Delivery is not available for this pincode")
+
+    weight = sum(line["product"].weight_grams * line["qty"] for line in lines)
+    return card.charge(order_value, weight, cod=cod)
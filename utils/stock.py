@@ -0,0 +1,322 @@
+import csv
+import io
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from db.models import Inventory, InventoryStock, Product, StockReservation
+from enums.store import InventoryType, ReservationStatus
+
+logger = logging.getLogger("default")
+
+SWEEP_BATCH_SIZE = 500
+LEDGER_BATCH_SIZE = 2000
+
+# all-or-nothing hold: every line must fit in current_stock - reserved_stock
+_RESERVE_SQL = """
+    UPDATE products AS p
+    SET reserved_stock = p.reserved_stock + v.qty
+    FROM (VALUES {values}) AS v(id, qty)
+    WHERE p.id = v.id AND p.current_stock - p.reserved_stock >= v.qty
+"""
+
+_RELEASE_SQL = """
+    UPDATE products AS p
+    SET reserved_stock = GREATEST(p.reserved_stock - v.qty, 0)
+    FROM (VALUES {values}) AS v(id, qty)
+    WHERE p.id = v.id
+"""
+
+# products without a snapshot yet start from the stock the storefront sells against
+_SEED_STOCK_SQL = """
+    INSERT INTO inventory_stock (product_id, store_id, quantity, updated_at)
+    SELECT id, store_id, current_stock, now() FROM products WHERE id = ANY(%s::uuid[])
+    ON CONFLICT (product_id) DO NOTHING
+"""
+
+_SNAPSHOT_SQL = """
+    UPDATE inventory_stock AS s
+    SET quantity = v.qty, updated_at = now()
+    FROM (VALUES {values}) AS v(id, qty)
+    WHERE s.product_id = v.id
+"""
+
+_MIRROR_SQL = """
+    UPDATE products AS p
+    SET current_stock = v.qty
+    FROM (VALUES {values}) AS v(id, qty)
+    WHERE p.id = v.id
+"""
+
+INBOUND_TYPES = (InventoryType.PURCHASE, InventoryType.SaleReturn)
+OUTBOUND_TYPES = (InventoryType.SELL, InventoryType.PurchaseReturn)
+
+
+def _execute_values(sql, rows):
+    """
+    Runs an UPDATE ... FROM (VALUES ...) over (product_id, int, ...) rows, sorted
+    by id, LEDGER_BATCH_SIZE rows per statement. Returns the rows updated.
+    """
+    rows = sorted(rows)
+    width = len(rows[0])
+    row_sql = "(%s::uuid" + ", %s::integer" * (width - 1) + ")"
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), LEDGER_BATCH_SIZE):
+            batch = rows[start:start + LEDGER_BATCH_SIZE]
+            cursor.execute(
+                sql.format(values=", ".join([row_sql] * len(batch))),
+                [str(v) if i == 0 else v for row in batch for i, v in enumerate(row)]
+            )
+            updated += cursor.rowcount
+    return updated
+
+
+# ---------- Inventory ledger ----------
+
+def _copy_ledger(rows):
+    """
+    Writes Inventory rows with COPY ... FROM STDIN; at upload sizes bulk_create
+    spends most of its time compiling the INSERT.
+    """
+    fields = Inventory._meta.concrete_fields
+    now = timezone.now()
+    buffer = io.StringIO()
+    # unquoted empty is NULL in COPY csv, so only None goes out unquoted
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+    for row in rows:
+        row.created_at = row.updated_at = now
+        writer.writerow([getattr(row, field.attname) for field in fields])
+    buffer.seek(0)
+
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Inventory._meta.db_table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+
+def apply_stock_movements(movements, store=None, strict=True):
+    """
+    Appends stock movements to the inventory ledger and returns the Inventory rows.
+
+    Each product's InventoryStock row is locked (SELECT ... FOR UPDATE, product id
+    order), so quantity_before is exact under concurrent movements and the cost
+    does not grow with the ledger. The new levels are mirrored into
+    Product.current_stock. Call inside transaction.atomic().
+
+    movements = [{"product_id", "type", "quantity", "user", <optional ledger fields>}];
+    an ADJUSTMENT carries the counted level as "quantity_after" instead of a quantity.
+    strict=False clamps outbound movements at zero instead of raising (goods
+    already sold, e.g. a paid order whose hold had expired).
+    """
+    product_ids = sorted({uuid.UUID(str(m["product_id"])) for m in movements})
+
+    with connection.cursor() as cursor:
+        cursor.execute(_SEED_STOCK_SQL, [[str(pid) for pid in product_ids]])
+
+    queryset = InventoryStock.objects.select_for_update(of=("self",)).select_related(
+        "product"
+    ).only(
+        "quantity", "product__sku", "product__selling_price", "product__store_id"
+    ).filter(product_id__in=product_ids)
+    if store is not None:
+        queryset = queryset.filter(store=store)
+    stocks = {stock.product_id: stock for stock in queryset.order_by("product_id")}
+
+    now = timezone.now()
+    rows = []
+    for movement in movements:
+        stock = stocks.get(uuid.UUID(str(movement["product_id"])))
+        if stock is None:
+            raise Exception("Product not found")
+        product = stock.product
+        inv_type = movement["type"]
+        before = stock.quantity
+
+        if inv_type == InventoryType.ADJUSTMENT:
+            after = int(movement["quantity_after"])
+            if after < 0:
+                raise Exception("Stock cannot be negative")
+            quantity = abs(after - before)
+        elif inv_type in INBOUND_TYPES:
+            quantity = int(movement["quantity"])
+            after = before + quantity
+        elif inv_type in OUTBOUND_TYPES:
+            quantity = int(movement["quantity"])
+            if quantity > before:
+                if strict:
+                    raise Exception(f"Insufficient stock for {product.sku}")
+                logger.warning("Stock of %s went below zero; clamped", product.sku)
+            after = max(before - quantity, 0)
+        else:
+            raise Exception("Invalid inventory type")
+
+        stock.quantity = after
+        stock.updated_at = now
+
+        sale_rate = movement.get(
+            "sale_rate_per_item",
+            product.selling_price if inv_type == InventoryType.SELL else 0
+        )
+        rows.append(Inventory(
+            store_id=product.store_id,
+            product_id=product.id,
+            sku=movement.get("sku") or product.sku,
+            type=inv_type,
+            date=movement.get("date") or now,
+            user=movement["user"],
+            quantity=quantity,
+            quantity_before=before,
+            quantity_after=after,
+            purchase_rate_per_item=movement.get("purchase_rate_per_item", 0),
+            purchase_price=movement.get("purchase_price", 0),
+            sale_rate_per_item=sale_rate,
+            sale_price=movement.get("sale_price", sale_rate * quantity),
+            gst_input=movement.get("gst_input", 0),
+            gst_output=movement.get("gst_output", 0),
+            remarks=movement.get("remarks"),
+            created_by=movement.get("created_by") or str(movement["user"]),
+        ))
+
+    _copy_ledger(rows)
+    levels = [(pid, stock.quantity) for pid, stock in stocks.items()]
+    _execute_values(_SNAPSHOT_SQL, levels)
+    _execute_values(_MIRROR_SQL, levels)
+    return rows
+
+
+# ---------- Reservations ----------
+
+def _per_product(reservations, attr="qty"):
+    totals = defaultdict(int)
+    for r in reservations:
+        totals[r.product_id] += getattr(r, attr)
+    return totals
+
+
+def reserve_stock(order, lines, hold_minutes=None):
+    """
+    Hold stock for an unpaid order with one conditional UPDATE; no row locks
+    outlive the statement's own transaction. Raises Exception (the caller's
+    transaction rolls back) when any line is no longer available.
+    lines = [{"product": Product, "qty": int}]
+    """
+    quantities = defaultdict(int)
+    for line in lines:
+        quantities[line["product"].id] += line["qty"]
+
+    updated = _execute_values(_RESERVE_SQL, list(quantities.items()))
+    if updated != len(quantities):
+        short = Product.objects.filter(id__in=list(quantities)).values_list(
+            "id", "name", "current_stock", "reserved_stock"
+        )
+        for product_id, name, current_stock, reserved_stock in short:
+            if current_stock - reserved_stock < quantities[product_id]:
+                raise Exception(f"{name} is out of stock")
+        raise Exception("Product not found or inactive")
+
+    expires_at = timezone.now() + timedelta(
+        minutes=hold_minutes or settings.STOCK_HOLD_MINUTES
+    )
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            store_id=order.store_id,
+            order=order,
+            product_id=product_id,
+            qty=qty,
+            expires_at=expires_at
+        )
+        for product_id, qty in quantities.items()
+    ])
+
+
+def convert_reservations(*orders):
+    """
+    Payment succeeded: turn the orders' holds into a permanent stock decrement.
+    Holds the sweeper already released are still deducted from current_stock
+    (the goods are sold). Idempotent: converted holds are skipped.
+    """
+    reservations = list(
+        StockReservation.objects.select_for_update().filter(
+            order__in=orders
+        ).exclude(
+            status=ReservationStatus.CONVERTED
+        ).order_by("id")
+    )
+    if not reservations:
+        return
+
+    orders_by_id = {o.id: o for o in orders}
+    apply_stock_movements([
+        {
+            "product_id": r.product_id,
+            "type": InventoryType.SELL,
+            "quantity": r.qty,
+            "user": orders_by_id[r.order_id].user_id,
+            "remarks": f"Order {orders_by_id[r.order_id].order_number}",
+            "created_by": "ORDER_PAYMENT",
+        }
+        for r in reservations
+    ], strict=False)
+
+    held = _per_product(
+        [r for r in reservations if r.status == ReservationStatus.HELD]
+    )
+    if held:
+        _execute_values(_RELEASE_SQL, list(held.items()))
+
+    for order_id in {r.order_id for r in reservations if r.status == ReservationStatus.RELEASED}:
+        logger.warning(
+            "Order %s paid after its stock hold expired; stock may be oversold",
+            orders_by_id[order_id].order_number
+        )
+
+    StockReservation.objects.filter(
+        id__in=[r.id for r in reservations]
+    ).update(status=ReservationStatus.CONVERTED, updated_at=timezone.now())
+
+
+def release_reservations(*orders, reservations=None):
+    """Give held stock back (payment failed / dropped, or hold expired)."""
+    if reservations is None:
+        reservations = list(
+            StockReservation.objects.select_for_update().filter(
+                order__in=orders,
+                status=ReservationStatus.HELD
+            ).order_by("id")
+        )
+    if not reservations:
+        return 0
+
+    _execute_values(_RELEASE_SQL, list(_per_product(reservations).items()))
+    StockReservation.objects.filter(
+        id__in=[r.id for r in reservations]
+    ).update(status=ReservationStatus.RELEASED, updated_at=timezone.now())
+    return len(reservations)
+
+
+def release_expired_reservations(batch_size=SWEEP_BATCH_SIZE):
+    """
+    Sweeper: release holds past expires_at in batches. SKIP LOCKED lets it run
+    next to webhooks converting the same orders without waiting on them.
+    """
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True).filter(
+                    status=ReservationStatus.HELD,
+                    expires_at__lt=timezone.now()
+                ).order_by("expires_at")[:batch_size]
+            )
+            released += release_reservations(reservations=batch)
+
+        if len(batch) < batch_size:
+            return released
@@ -44,7 +44,7 @@ def time_ago(dt):
         return f"{years} year{'s' if years > 1 else ''} ago"
 
 
-from django.db import transaction
+from django.db import IntegrityError, connection, transaction
 
 def generate_lsin(store, brand_code):
     with transaction.atomic():
@@ -56,12 +56,61 @@ def generate_lsin(store, brand_code):
 
         return f"{brand_code}-{str(seq.last_lsin_number).zfill(6)}"
 
-def generate_order_number(store, prefix):
+def allocate_lsins(store, brand_code, count):
+    """Reserves `count` consecutive LSINs with a single row lock (bulk imports)."""
+    if count <= 0:
+        return []
+
     with transaction.atomic():
-        seq, _ = OrderSequence.objects.select_for_update().get_or_create(
+        seq, _ = StoreSequence.objects.select_for_update().get_or_create(
             store=store
         )
-        seq.order_number += 1
-        seq.save(update_fields=["order_number"])
+        first = seq.last_lsin_number + 1
+        seq.last_lsin_number += count
+        seq.save(update_fields=["last_lsin_number"])
+
+    return [
+        f"{brand_code}-{str(number).zfill(6)}"
+        for number in range(first, first + count)
+    ]
+
+# stores whose order-number sequence is known to exist (per process)
+_order_sequences = set()
+
+
+def order_sequence_name(store):
+    return f"order_number_seq_{store.id.hex}"
+
+def ensure_order_sequence(store):
+    """
+    Creates the store's order-number sequence if it is missing, continuing from
+    the legacy order_sequence counter. Safe when two checkouts race to create it.
+    """
+    start = OrderSequence.objects.filter(store=store).values_list(
+        "order_number", flat=True
+    ).first() or 0
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE SEQUENCE IF NOT EXISTS "{order_sequence_name(store)}" START WITH {int(start) + 1}'
+            )
+    except IntegrityError:
+        pass  # created by a concurrent transaction
+
+    # a rolled-back checkout also rolls the CREATE back
+    transaction.on_commit(lambda: _order_sequences.add(store.id))
+
+def generate_order_number(store, prefix):
+    """
+    Next order number from the store's Postgres sequence. nextval() takes no
+    row lock, so concurrent checkouts never queue behind each other; numbers
+    of rolled-back checkouts are skipped, not reused.
+    """
+    if store.id not in _order_sequences:
+        ensure_order_sequence(store)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval(%s)", [order_sequence_name(store)])
+        number = cursor.fetchone()[0]
 
-        return f"{prefix}-{store.id.hex[:4].upper()}-{seq.order_number:08d}"
\ No newline at end of file
+    return f"{prefix}-{store.id.hex[:4].upper()}-{number:08d}"